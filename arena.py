@@ -0,0 +1,183 @@
+"""
+Many-agent arena: hundreds of ghosts on a large generated board.
+
+Ghosts are built from the four behaviours in turn (Blinky, Pinky, Inky,
+Clyde) and dropped on random cells away from Pac-Man. Collisions go through
+the game's spatial hash (see spatial.py), so the per-tick collision test
+looks at the ghosts around Pac-Man rather than all of them, and ghost-ghost
+contacts are counted from the same buckets. Chasers share the flow field
+and other targets use HPA*, so planning stays affordable on big boards.
+Ghosts more than --wake tiles from Pac-Man walk on along their routes
+without replanning (see Game.track_ghosts), so the planning work per tick
+follows the crowd around him. When Pac-Man is caught he is put back on a
+quiet cell and the arena runs on.
+
+    python arena.py [--ghosts 200] [--rows 101 --cols 101] [--ticks 600] [--wake 15] [--seed 1]
+    python arena.py --check [--ghosts 200] [--ticks 300]
+
+reports ticks per second and how many ghosts the collision tests looked at;
+--check plays the same arena with the hash and with the plain list of
+ghosts and compares the state every tick.
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional
+
+import pacman
+from headless import RandomInput
+from mapbundle import MapBundle
+from mazegen import generate, level
+from pacman import SC, Blinky, Clyde, Game, Ghost, Inky, Pinky
+
+BEHAVIOURS = [Blinky, Pinky, Inky, Clyde]
+# Collision range of Game.update, per axis
+REACH = SC + 10
+
+
+def arena_map(rows: int, cols: int, seed: int, rooms: int = 0) -> MapBundle:
+    """A generated board with a ghost house in the middle (see mazegen.level)."""
+    board = generate(rows, cols, seed, rooms=rooms)
+    return MapBundle.compile(level(board, f"arena_{rows}x{cols}_{seed}"), "arena")
+
+
+def use_map(bundle: MapBundle, search: str = "hpa"):
+    """Make `bundle` the board for every Game created from now on."""
+    pacman.configure()
+    pacman.MAZE = bundle
+    pacman.MAP = bundle.grid
+    pacman.ROWS, pacman.COLS = bundle.rows, bundle.cols
+    pacman.WIDTH, pacman.HEIGHT = bundle.cols * pacman.SC, bundle.rows * pacman.SC
+    pacman.USE_FLOW_FIELD = True
+    pacman.USE_HPA = search == "hpa"
+
+
+def populate(game: Game, count: int, rng: random.Random, clearance: int = 10):
+    """Replace the ghosts with `count` of them, none within `clearance` tiles of Pac-Man."""
+    colors = [pacman.BLINKY_COLOR, pacman.PINKY_COLOR, pacman.INKY_COLOR, pacman.CLYDE_COLOR]
+    maze, start = game.maze, game.pacman
+    ghosts: List[Ghost] = []
+    while len(ghosts) < count:
+        i, j = rng.randrange(maze.rows), rng.randrange(maze.cols)
+        if maze.is_wall(i, j) or abs(i - start.i) + abs(j - start.j) < clearance:
+            continue
+        kind = len(ghosts) % len(BEHAVIOURS)
+        ghosts.append(BEHAVIOURS[kind](game, i, j, colors[kind]))
+    game.ghosts = ghosts
+    # Inky aims off the first Blinky
+    game.blinky, game.pinky, game.inky, game.clyde = ghosts[:4]
+
+
+def respawn(game: Game, rng: random.Random, clearance: int = 10, tries: int = 50):
+    """Put a caught Pac-Man back on the quietest of a few random cells."""
+    maze, player = game.maze, game.pacman
+    best, fewest = None, None
+    while tries > 0 and fewest != 0:
+        i, j = rng.randrange(maze.rows), rng.randrange(maze.cols)
+        if maze.is_wall(i, j):
+            continue
+        tries -= 1
+        reach = clearance * SC
+        nearby = (game.ghosts if game.spatial is None
+                  else game.spatial.near(j * SC, i * SC, reach))
+        crowd = sum(abs(g.x - j * SC) < reach and abs(g.y - i * SC) < reach for g in nearby)
+        if fewest is None or crowd < fewest:
+            best, fewest = (i, j), crowd
+    i, j = best
+    player.i, player.j = i, j
+    player.x, player.y = j * SC, i * SC
+    player.current_cell = game.array[i][j]
+    game.game_over = False
+    game.caught_by = None
+
+
+def new_arena(ghosts: int, seed: int, spatial: bool = True,
+              wake_radius: Optional[int] = None) -> Game:
+    random.seed(seed)
+    game = Game(headless=True, input_source=RandomInput(seed))
+    populate(game, ghosts, random.Random(seed))
+    if spatial:
+        game.track_ghosts(wake_radius)
+    return game
+
+
+def run(ghosts: int, ticks: int, seed: int, wake_radius: Optional[int] = None):
+    game = new_arena(ghosts, seed, wake_radius=wake_radius)
+    rng = random.Random(seed + 1)
+    catches = contacts = 0
+    collide_time = 0.0
+    t0 = time.perf_counter()
+    for _ in range(ticks):
+        game.step()
+        if game.game_over:
+            catches += 1
+            respawn(game, rng)
+        t1 = time.perf_counter()
+        contacts += len(game.spatial.pairs(REACH))
+        collide_time += time.perf_counter() - t1
+    elapsed = time.perf_counter() - t0 - collide_time
+
+    spatial = game.spatial
+    near = len(spatial.near(game.pacman.x, game.pacman.y, REACH))
+    print(f"{ghosts} ghosts on {game.maze.rows}x{game.maze.cols}, {ticks} ticks in {elapsed:.2f}s "
+          f"({ticks / elapsed:.0f} ticks/s, {elapsed / ticks * 1000:.2f} ms/tick)")
+    print(f"pac-man caught {catches} times; collision test looked at {near} of {ghosts} ghosts "
+          f"on the last tick")
+    print(f"ghost-ghost contacts: {contacts / ticks:.1f} per tick, "
+          f"{collide_time / ticks * 1e6:.0f} us/tick to find them; "
+          f"{spatial.moves / ticks:.1f} bucket moves per tick")
+    if wake_radius is not None:
+        print(f"ghosts beyond {wake_radius} tiles coasted on their routes in "
+              f"{game.coasted / ticks:.1f} of {ghosts} updates per tick")
+
+
+def check(ghosts: int, ticks: int, seed: int) -> bool:
+    """The same arena with and without the spatial hash must play out the same."""
+    from replay import state_digest
+
+    digests = []
+    for spatial in (False, True):
+        game = new_arena(ghosts, seed, spatial)
+        rng = random.Random(seed + 1)
+        trace = []
+        for _ in range(ticks):
+            game.step()
+            trace.append((game.caught_by, state_digest(game)))
+            if game.game_over:
+                respawn(game, rng)
+        digests.append(trace)
+    for tick, (plain, hashed) in enumerate(zip(*digests), 1):
+        if plain != hashed:
+            print(f"mismatch at tick {tick}: list {plain}, spatial hash {hashed}")
+            return False
+    catches = sum(caught is not None for caught, _ in digests[0])
+    print(f"spatial hash ok: {ghosts} ghosts, {ticks} ticks, {catches} catches")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ghosts", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=101)
+    parser.add_argument("--cols", type=int, default=101)
+    parser.add_argument("--rooms", type=int, default=20, help="open rooms carved into the maze")
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--search", choices=["hpa", "astar"], default="hpa",
+                        help="planner for targets other than Pac-Man's tile")
+    parser.add_argument("--wake", type=int, default=15,
+                        help="tiles around Pac-Man where ghosts replan every tile; 0 for all")
+    parser.add_argument("--check", action="store_true",
+                        help="compare against the plain ghost list instead of benchmarking")
+    args = parser.parse_args()
+
+    use_map(arena_map(args.rows, args.cols, args.seed, args.rooms), args.search)
+    if args.check:
+        sys.exit(0 if check(args.ghosts, args.ticks, args.seed) else 1)
+    run(args.ghosts, args.ticks, args.seed, args.wake or None)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,486 @@
+"""
+Batched game engine: steps thousands of games at once with NumPy.
+
+Every piece of per-entity state lives in an array shaped (n_games, ...) and
+one tick of all games is a short sequence of vectorized operations that
+mirrors Game.update. Ghosts steer with the precomputed routing table (see
+routing.py) instead of running A*, so the scalar game it matches is a
+Game with the routing table enabled. The only per-game Python work left is
+drawing random targets, which happens a few times per game per second and
+uses a per-game random.Random seeded exactly like the scalar game.
+
+    python batch_engine.py [--games 4096] [--ticks 2000] [--seed 1]
+    python batch_engine.py --parity [--games 32] [--ticks 3000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from mapbundle import STEP_BITS
+from pacman import (COLS, GHOST_SPEED, GHOST_WEAK_SPEED, MAP, MAZE, PACMAN_SPEED, ROWS, SC,
+                    Clyde, Game, Pinky, get_routing_table)
+from pellets import PelletStore
+from routing import DIRECTIONS, NO_DIRECTION, NO_ROUTE
+
+GHOST_NAMES = ["Blinky", "Pinky", "Inky", "Clyde"]
+GHOST_START = [MAZE.spawns[name.lower()] for name in GHOST_NAMES]
+PACMAN_START = MAZE.spawns['pacman']
+BLINKY, PINKY, INKY, CLYDE = range(4)
+
+# Pinky and Clyde retarget ahead of Pac-Man every few tiles
+LOOKAHEAD = {PINKY: Pinky.lookahead, CLYDE: Clyde.lookahead}
+SEARCH_INTERVAL = {PINKY: Pinky.search_interval, CLYDE: Clyde.search_interval}
+
+# Input codes, same order as headless.DIRECTIONS; -1 means no change
+INPUT_DIRECTIONS = np.array([(0, -1), (1, 0), (0, 1), (-1, 0)], dtype=np.int64)
+
+# Straight from the map bundle: wall bitmap, neighbour masks and tunnel pairs
+WALL = np.unpackbits(np.frombuffer(MAZE.walls, dtype=np.uint8),
+                     bitorder='little')[:ROWS * COLS].astype(bool).reshape(ROWS, COLS)
+MASK = np.frombuffer(MAZE.mask, dtype=np.uint8).reshape(ROWS, COLS)
+TUNNEL = np.zeros(ROWS * COLS, dtype=bool)
+TUNNEL[list(MAZE.teleports)] = True
+TUNNEL = TUNNEL.reshape(ROWS, COLS)
+# Mask bit of a (dx, dy) step, indexed [dy + 1, dx + 1]; standing still is always open
+STEP_BIT = np.zeros((3, 3), dtype=np.uint8)
+for (step_x, step_y), step_bit in STEP_BITS.items():
+    STEP_BIT[step_y + 1, step_x + 1] = step_bit
+HOUSE_CELLS = list(MAZE.house)
+
+
+def random_cell(rng: random.Random):
+    """Same draws as Ghost.get_random_cell."""
+    i, j = 0, 0
+    while MAZE.is_wall(i, j):
+        i = rng.randint(0, ROWS - 1)
+        j = rng.randint(0, COLS - 1)
+    return i, j
+
+
+def cell_in_front_of(rng: random.Random, pi: int, pj: int, dir_x: int, dir_y: int, n: int):
+    """Same draws as Ghost.get_cell_in_front_of."""
+    i, j = pi + dir_y, pj + dir_x
+    if not (0 <= i < ROWS and 0 <= j < COLS):
+        return random_cell(rng)
+
+    initial = (pi, pj)
+    root = (i, j)
+    for _ in range(n):
+        bits = MAZE.mask[root[0] * COLS + root[1]]
+        positions = [(root[0] + di, root[1] + dj)
+                     for d, (di, dj) in enumerate(DIRECTIONS) if bits & (1 << d)]
+        if initial in positions:
+            positions.remove(initial)
+        initial = root
+        if positions:
+            root = rng.choice(positions)
+        else:
+            return random_cell(rng)
+    return root
+
+
+class BatchEngine:
+    """Struct-of-arrays simulator for many independent games."""
+
+    def __init__(self, seeds: Sequence[int]):
+        n = len(seeds)
+        self.n = n
+        self.rngs = [random.Random(seed) for seed in seeds]
+
+        table = get_routing_table()
+        size = table.size
+        self.node = np.frombuffer(table.index, dtype=np.int16).astype(np.int64).reshape(ROWS, COLS)
+        self.dist = np.frombuffer(table.dist, dtype=np.uint16).reshape(size, size)
+        self.next_dir = np.frombuffer(table.next_dir, dtype=np.uint8).reshape(size, size)
+        self.step_di = np.array([d[0] for d in DIRECTIONS] + [0], dtype=np.int64)
+        self.step_dj = np.array([d[1] for d in DIRECTIONS] + [0], dtype=np.int64)
+
+        # Pellets, one flag per cell id (i * COLS + j), copied from the stores' buffers
+        food = PelletStore.from_map(MAP, '2')
+        bonus = PelletStore.from_map(MAP, '3')
+        self.food = np.tile(np.frombuffer(food.buffer, dtype=np.bool_), (n, 1))
+        self.bonus = np.tile(np.frombuffer(bonus.buffer, dtype=np.bool_), (n, 1))
+        self.food_left = self.food.sum(axis=1)
+        self.bonus_left = self.bonus.sum(axis=1)
+        self.pellets_total = self.food_left + self.bonus_left
+
+        # Pac-Man
+        self.px = np.full(n, float(PACMAN_START[1] * SC))
+        self.py = np.full(n, float(PACMAN_START[0] * SC))
+        self.pdx = np.full(n, -1, dtype=np.int64)
+        self.pdy = np.zeros(n, dtype=np.int64)
+        self.ndx = np.full(n, -1, dtype=np.int64)
+        self.ndy = np.zeros(n, dtype=np.int64)
+        self.pi = np.full(n, PACMAN_START[0], dtype=np.int64)
+        self.pj = np.full(n, PACMAN_START[1], dtype=np.int64)
+        self.invincible = np.zeros(n, dtype=bool)
+        self.countdown = np.full(n, 600, dtype=np.int64)
+
+        # Ghosts, column k is GHOST_NAMES[k]
+        self.gx = np.tile(np.array([j * SC for _, j in GHOST_START], dtype=float), (n, 1))
+        self.gy = np.tile(np.array([i * SC for i, _ in GHOST_START], dtype=float), (n, 1))
+        self.gi = np.tile(np.array([i for i, _ in GHOST_START]), (n, 1))
+        self.gj = np.tile(np.array([j for _, j in GHOST_START]), (n, 1))
+        self.gdx = np.ones((n, 4), dtype=np.int64)
+        self.gdy = np.zeros((n, 4), dtype=np.int64)
+        self.gspeed = np.full((n, 4), float(GHOST_SPEED))
+        self.ti = np.zeros((n, 4), dtype=np.int64)
+        self.tj = np.zeros((n, 4), dtype=np.int64)
+        self.route_length = np.zeros((n, 4), dtype=np.int64)
+        self.new_search = np.zeros((n, 4), dtype=np.int64)
+        self.new_search[:, PINKY] = SEARCH_INTERVAL[PINKY]
+        self.new_search[:, CLYDE] = SEARCH_INTERVAL[CLYDE]
+        self.weak = np.zeros((n, 4), dtype=bool)
+        self.recovering = np.zeros((n, 4), dtype=bool)
+        self.affected = np.zeros((n, 4), dtype=bool)
+        self.recovering_countdown = np.full((n, 4), 720, dtype=np.int64)
+
+        # Ghost constructors each draw a random cell to follow
+        for g, rng in enumerate(self.rngs):
+            for k in range(4):
+                self.ti[g, k], self.tj[g, k] = random_cell(rng)
+
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.won = np.zeros(n, dtype=bool)
+        self.caught_by = np.full(n, -1, dtype=np.int64)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _snap(x: np.ndarray, speed, mask: np.ndarray) -> np.ndarray:
+        r = np.abs(np.mod(x, SC))
+        near = mask & ((r < speed) | (r > SC - speed))
+        return np.where(near, np.round(x / SC) * SC, x)
+
+    def _route_nodes(self, i, j, ti, tj):
+        return self.node[i, j], self.node[ti, tj]
+
+    def _set_targets(self, games: np.ndarray, k: int, draw):
+        """Run a per-game random draw for ghost k on the selected games."""
+        for g in np.flatnonzero(games):
+            self.ti[g, k], self.tj[g, k] = draw(g)
+
+    def _random_target(self, g: int):
+        return random_cell(self.rngs[g])
+
+    def _house_target(self, g: int):
+        return self.rngs[g].choice(HOUSE_CELLS)
+
+    # ------------------------------------------------------------------
+    # Tick
+    # ------------------------------------------------------------------
+    def step(self, directions: Optional[np.ndarray] = None):
+        """Advance every game by one tick, like Game.step.
+
+        `directions` holds one input code per game (index into
+        INPUT_DIRECTIONS, or -1 for no change).
+        """
+        if directions is not None:
+            pressed = directions >= 0
+            codes = np.where(pressed, directions, 0)
+            self.ndx = np.where(pressed, INPUT_DIRECTIONS[codes, 0], self.ndx)
+            self.ndy = np.where(pressed, INPUT_DIRECTIONS[codes, 1], self.ndy)
+
+        active = ~self.game_over
+        self.tick += active
+        self._update_pacman(active)
+
+        # All pellets eaten
+        won = active & (self.food_left == 0) & (self.bonus_left == 0)
+        self.won |= won
+        self.game_over |= won
+        active &= ~won
+
+        self._update_power_state(active)
+        active &= ~self._check_collisions(active)
+
+        for k in range(4):
+            self._search(k, active)
+            self._update_ghost(k, active)
+
+    def _update_pacman(self, active: np.ndarray):
+        self.px = self._snap(self.px, PACMAN_SPEED, active)
+        self.py = self._snap(self.py, PACMAN_SPEED, active)
+
+        center = active & (np.mod(self.px, SC) == 0) & (np.mod(self.py, SC) == 0)
+        self.pi = np.where(center, self.py.astype(np.int64) // SC, self.pi)
+        self.pj = np.where(center, self.px.astype(np.int64) // SC, self.pj)
+        games = np.arange(self.n)
+        cell = self.pi * COLS + self.pj
+
+        # Eat food
+        eat = center & self.food[games, cell]
+        self.food[games[eat], cell[eat]] = False
+        self.food_left -= eat
+
+        # Bonus food makes every ghost vulnerable
+        bonus = center & self.bonus[games, cell]
+        self.bonus[games[bonus], cell[bonus]] = False
+        self.bonus_left -= bonus
+        self.affected |= bonus[:, None]
+        self.invincible |= bonus
+        self.countdown = np.where(bonus, 600, self.countdown)
+
+        # Teleport
+        tunnel = center & TUNNEL[self.pi, self.pj]
+        left, right = tunnel & (self.pj == 0), tunnel & (self.pj == COLS - 1)
+        self.px = np.where(left, (COLS - 1) * SC, np.where(right, 0, self.px))
+        self.pj = np.where(left, COLS - 1, np.where(right, 0, self.pj))
+
+        # Stop at walls, then take the queued turn if it is open
+        mask = MASK[self.pi, self.pj]
+        ni, nj = self.pi + self.pdy, self.pj + self.pdx
+        inside = (ni >= 0) & (ni < ROWS) & (nj >= 0) & (nj < COLS)
+        bit = STEP_BIT[self.pdy + 1, self.pdx + 1]
+        blocked = center & inside & (mask & bit != bit)
+        self.pdx = np.where(blocked, 0, self.pdx)
+        self.pdy = np.where(blocked, 0, self.pdy)
+
+        ni, nj = self.pi + self.ndy, self.pj + self.ndx
+        inside = (ni >= 0) & (ni < ROWS) & (nj >= 0) & (nj < COLS)
+        bit = STEP_BIT[self.ndy + 1, self.ndx + 1]
+        turn = center & inside & (mask & bit == bit)
+        self.pdx = np.where(turn, self.ndx, self.pdx)
+        self.pdy = np.where(turn, self.ndy, self.pdy)
+
+        # Invincibility countdown
+        ticking = active & self.invincible
+        self.invincible &= ~(ticking & (self.countdown <= 0))
+        self.countdown -= ticking & (self.countdown > 0)
+
+        self.px = np.where(active, self.px + self.pdx * PACMAN_SPEED, self.px)
+        self.py = np.where(active, self.py + self.pdy * PACMAN_SPEED, self.py)
+
+    def _update_power_state(self, active: np.ndarray):
+        powered = active & self.invincible
+        for k in range(4):
+            make_weak = powered & ~self.weak[:, k] & ~self.recovering[:, k] & self.affected[:, k]
+            self._set_targets(make_weak, k, self._random_target)
+            self.weak[:, k] |= make_weak
+
+        expired = (active & ~self.invincible)[:, None] & self.weak
+        self.weak &= ~expired
+        self.affected &= ~expired
+
+    def _check_collisions(self, active: np.ndarray) -> np.ndarray:
+        caught = np.zeros(self.n, dtype=bool)
+        for k in range(4):
+            close = (active & ~caught & (np.abs(self.px - self.gx[:, k]) < SC + 10)
+                     & (np.abs(self.py - self.gy[:, k]) < SC + 10))
+            eaten = close & self.invincible & self.affected[:, k]
+            retreat = eaten & ~self.recovering[:, k]
+            self._set_targets(retreat, k, self._house_target)
+            self.recovering[:, k] |= retreat
+            self.weak[:, k] &= ~retreat
+
+            hit = close & ~eaten
+            self.caught_by = np.where(hit, k, self.caught_by)
+            caught |= hit
+        self.game_over |= caught
+        return caught
+
+    def _search(self, k: int, active: np.ndarray):
+        """Retarget ghost k at its tile center, like Blinky/Pinky/Inky/Clyde.search."""
+        gx, gy = self.gx[:, k], self.gy[:, k]
+        center = active & (np.mod(gx, SC) == 0) & (np.mod(gy, SC) == 0)
+        i = np.where(center, gy.astype(np.int64) // SC, self.gi[:, k])
+        j = np.where(center, gx.astype(np.int64) // SC, self.gj[:, k])
+        center &= (i >= 0) & (i < ROWS) & (j >= 0) & (j < COLS)
+        self.gi[:, k], self.gj[:, k] = i, j
+
+        if k in SEARCH_INTERVAL:
+            self.new_search[:, k] -= center
+
+        frightened = (self.weak[:, k] | self.recovering[:, k]) & self.affected[:, k]
+        scared = center & frightened
+        if k in SEARCH_INTERVAL:
+            self.new_search[:, k] = np.where(scared, 1, self.new_search[:, k])
+        wander = scared & (self.route_length[:, k] <= 2)
+        self._set_targets(wander & self.weak[:, k], k, self._random_target)
+        self._set_targets(wander & ~self.weak[:, k], k, self._house_target)
+
+        chase = center & ~frightened
+        if k == BLINKY:
+            self.ti[:, k] = np.where(chase, self.pi, self.ti[:, k])
+            self.tj[:, k] = np.where(chase, self.pj, self.tj[:, k])
+        elif k == INKY:
+            mi = 2 * self.pi - self.gi[:, BLINKY]
+            mj = 2 * self.pj - self.gj[:, BLINKY]
+            inside = (mi >= 0) & (mi < ROWS) & (mj >= 0) & (mj < COLS)
+            valid = inside & ~WALL[np.clip(mi, 0, ROWS - 1), np.clip(mj, 0, COLS - 1)]
+            mirror = chase & valid
+            self.ti[:, k] = np.where(mirror, mi, self.ti[:, k])
+            self.tj[:, k] = np.where(mirror, mj, self.tj[:, k])
+            lost = chase & ~valid & (self.route_length[:, k] <= 2)
+            self._set_targets(lost, k, self._random_target)
+        else:
+            ahead = chase & (self.new_search[:, k] == 0)
+            n = LOOKAHEAD[k]
+            for g in np.flatnonzero(ahead):
+                self.ti[g, k], self.tj[g, k] = cell_in_front_of(
+                    self.rngs[g], int(self.pi[g]), int(self.pj[g]),
+                    int(self.pdx[g]), int(self.pdy[g]), n)
+            self.new_search[:, k] = np.where(ahead, SEARCH_INTERVAL[k], self.new_search[:, k])
+
+        # Plan: with the routing table this is just the route length
+        a, b = self._route_nodes(i, j, self.ti[:, k], self.tj[:, k])
+        length = np.where((a >= 0) & (b >= 0), self.dist[a, b], NO_ROUTE)
+        self.route_length[:, k] = np.where(center, length, self.route_length[:, k])
+
+    def _update_ghost(self, k: int, active: np.ndarray):
+        """Move ghost k, like Ghost.update with the routing table."""
+        gx = self._snap(self.gx[:, k], self.gspeed[:, k], active)
+        gy = self._snap(self.gy[:, k], self.gspeed[:, k], active)
+        center = active & (np.mod(gx, SC) == 0) & (np.mod(gy, SC) == 0)
+        i = np.where(center, gy.astype(np.int64) // SC, self.gi[:, k])
+        j = np.where(center, gx.astype(np.int64) // SC, self.gj[:, k])
+
+        outside = center & ~((i >= 0) & (i < ROWS) & (j >= 0) & (j < COLS))
+        center &= ~outside
+        i, j = np.clip(i, 0, ROWS - 1), np.clip(j, 0, COLS - 1)
+
+        dx, dy = self.gdx[:, k], self.gdy[:, k]
+        a, b = self._route_nodes(i, j, self.ti[:, k], self.tj[:, k])
+        routed = (a >= 0) & (b >= 0)
+        step = np.where(routed, self.next_dir[np.maximum(a, 0), np.maximum(b, 0)], NO_DIRECTION)
+        steer = center & (step != NO_DIRECTION)
+        step = np.where(steer, step, len(DIRECTIONS))
+        dx = np.where(steer, self.step_dj[step], dx)
+        dy = np.where(steer, self.step_di[step], dy)
+
+        # Teleport through the tunnel when the route leaves the board
+        wrap = center & TUNNEL[i, j] & ((j + dx < 0) | (j + dx >= COLS))
+        j = np.where(wrap, (j + dx) % COLS, j)
+        gx = np.where(wrap, j * SC, gx)
+
+        # Stop at walls or the board edge
+        ni, nj = i + dy, j + dx
+        inside = (ni >= 0) & (ni < ROWS) & (nj >= 0) & (nj < COLS)
+        bit = STEP_BIT[dy + 1, dx + 1]
+        blocked = center & (~inside | (MASK[i, j] & bit != bit))
+        dx = np.where(blocked | outside, 0, dx)
+        dy = np.where(blocked | outside, 0, dy)
+
+        self.gi[:, k] = np.where(center, i, self.gi[:, k])
+        self.gj[:, k] = np.where(center, j, self.gj[:, k])
+        self.gdx[:, k], self.gdy[:, k] = dx, dy
+
+        moving = active & ~outside
+        frightened = (self.weak[:, k] | self.recovering[:, k]) & self.affected[:, k]
+        self.gspeed[:, k] = np.where(moving, np.where(frightened, GHOST_WEAK_SPEED, GHOST_SPEED),
+                                     self.gspeed[:, k])
+
+        # Recovery countdown
+        ticking = moving & self.recovering[:, k]
+        done = ticking & (self.recovering_countdown[:, k] == 0)
+        self.recovering_countdown[:, k] -= ticking & ~done
+        self.recovering_countdown[:, k] = np.where(done, 720, self.recovering_countdown[:, k])
+        self.recovering[:, k] &= ~done
+        self.affected[:, k] &= ~done
+
+        self.gx[:, k] = np.where(moving, gx + dx * self.gspeed[:, k], gx)
+        self.gy[:, k] = np.where(moving, gy + dy * self.gspeed[:, k], gy)
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+    def results(self) -> List[dict]:
+        eaten = self.pellets_total - self.food_left - self.bonus_left
+        return [{
+            "ticks": int(self.tick[g]),
+            "pellets_eaten": int(eaten[g]),
+            "won": bool(self.won[g]),
+            "caught_by": GHOST_NAMES[self.caught_by[g]] if self.caught_by[g] >= 0 else None,
+        } for g in range(self.n)]
+
+
+def random_inputs(n_games: int, ticks: int, seed: int, interval: int = 40) -> np.ndarray:
+    """Input schedule (ticks, n_games): a random turn every `interval` ticks."""
+    rng = np.random.default_rng(seed)
+    schedule = np.full((ticks, n_games), -1, dtype=np.int64)
+    schedule[::interval] = rng.integers(0, 4, size=schedule[::interval].shape)
+    return schedule
+
+
+def parity_check(n_games: int, ticks: int, seed: int) -> bool:
+    """Run the batched and scalar engines side by side and compare every tick."""
+    from headless import ScriptedInput
+
+    seeds = [seed + g for g in range(n_games)]
+    schedule = random_inputs(n_games, ticks, seed)
+    batch = BatchEngine(seeds)
+
+    # The scalar games share the global random module, so each one keeps
+    # its own generator state and swaps it in around its step.
+    games, states = [], []
+    for g, game_seed in enumerate(seeds):
+        moves = {t: tuple(INPUT_DIRECTIONS[c]) for t, c in enumerate(schedule[:, g]) if c >= 0}
+        random.seed(game_seed)
+        game = Game(headless=True, input_source=ScriptedInput(moves))
+        game.routing = get_routing_table()
+        games.append(game)
+        states.append(random.getstate())
+
+    powered = np.zeros(n_games, dtype=bool)
+    for t in range(ticks):
+        batch.step(schedule[t])
+        powered |= batch.invincible
+        for g, game in enumerate(games):
+            if game.game_over:
+                continue
+            random.setstate(states[g])
+            game.step()
+            states[g] = random.getstate()
+            expected = [game.pacman.x, game.pacman.y] + [v for ghost in game.ghosts
+                                                         for v in (ghost.x, ghost.y)]
+            actual = [batch.px[g], batch.py[g]] + [v for k in range(4)
+                                                   for v in (batch.gx[g, k], batch.gy[g, k])]
+            if (expected != actual or game.game_over != batch.game_over[g]
+                    or len(game.food) != batch.food_left[g]):
+                print(f"mismatch in game {g} (seed {seeds[g]}) at tick {game.tick}")
+                print(f"  scalar:  {expected}")
+                print(f"  batched: {actual}")
+                return False
+
+    over = sum(game.game_over for game in games)
+    print(f"parity ok: {n_games} games x {ticks} ticks "
+          f"({over} finished, {int(powered.sum())} reached a power pellet)")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=4096, help="number of games in the batch")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks to simulate")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first game")
+    parser.add_argument("--parity", action="store_true",
+                        help="compare against the scalar engine instead of benchmarking")
+    args = parser.parse_args()
+
+    if args.parity:
+        sys.exit(0 if parity_check(args.games, args.ticks, args.seed) else 1)
+
+    schedule = random_inputs(args.games, args.ticks, args.seed)
+    engine = BatchEngine([args.seed + g for g in range(args.games)])
+    t0 = time.perf_counter()
+    for t in range(args.ticks):
+        if engine.game_over.all():
+            break
+        engine.step(schedule[t])
+    elapsed = time.perf_counter() - t0
+
+    game_ticks = int(engine.tick.sum())
+    print(f"{args.games} games, {game_ticks} game-ticks in {elapsed:.2f}s "
+          f"({game_ticks / elapsed:.0f} game-ticks/s)")
+    print(f"finished: {int(engine.game_over.sum())}, won: {int(engine.won.sum())}")
+
+
+if __name__ == "__main__":
+    main()
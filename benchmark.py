@@ -0,0 +1,443 @@
+"""
+Benchmark suite for pathfinding, simulation ticks and rendering.
+
+Each scenario replays a fixed-seed workload and records the latency of
+every single operation, reported as percentiles. Results can be saved as
+a baseline and later runs compared against it; the run fails when a
+scenario's median gets slower than the allowed threshold.
+
+    python benchmark.py                          # run every scenario
+    python benchmark.py --only a_star --repeat 2000
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json --threshold 0.25 [--metric p90]
+    python benchmark.py --legacy [--pairs 500]   # old list A* vs Game.a_star
+    python benchmark.py --cells                  # Cell memory and reset sweep cost
+    python benchmark.py --replay game.json       # also time a recorded game (see replay.py)
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import pygame
+
+import pacman
+import replay
+from headless import RandomInput
+from pacman import HEIGHT, WIDTH, Cell, Game
+
+
+def legacy_a_star(game: Game, start: Cell, end: Cell) -> int:
+    """The original min()/list.remove A*, kept as a reference.
+
+    Keeps f/g/h/parent in dicts (they used to live on Cell), fills game.path
+    exactly like Game.a_star and returns the number of expanded nodes.
+    """
+    open_list: List[Cell] = []
+    closed_list: List[Cell] = []
+    game.path = []
+    expanded = 0
+
+    f = {cell: float('inf') for row in game.array for cell in row}
+    g = dict.fromkeys(f, 0)
+    h = dict.fromkeys(f, 0)
+    parent = dict.fromkeys(f)
+
+    open_list.append(start)
+    f[start] = 0
+
+    while open_list:
+        q = min(open_list, key=lambda c: f[c])
+        open_list.remove(q)
+        expanded += 1
+
+        for s in game.get_successors(q):
+            if s not in closed_list:
+                if s == end:
+                    game.path.append(q)
+                    while parent[q] is not None:
+                        q = parent[q]
+                        game.path.append(q)
+                    return expanded
+
+                new_g = g[q] + 1
+                new_h = game.heuristic(s, end)
+                new_f = new_g + new_h
+
+                if f[s] == float('inf') or f[s] > new_f:
+                    open_list.append(s)
+                    f[s] = new_f
+                    g[s] = new_g
+                    h[s] = new_h
+                    parent[s] = q
+
+        closed_list.append(q)
+    return expanded
+
+
+def make_pairs(game: Game, count: int, seed: int):
+    """Pick reproducible start/goal pairs of distinct walkable cells."""
+    rng = random.Random(seed)
+    cells = [cell for row in game.array for cell in row if not cell.is_wall]
+    pairs = []
+    while len(pairs) < count:
+        a, b = rng.choice(cells), rng.choice(cells)
+        if a is not b:
+            pairs.append((a, b))
+    return pairs
+
+
+def run_legacy(game: Game, pairs):
+    expanded = 0
+    lengths = []
+    t0 = time.perf_counter()
+    for start, end in pairs:
+        expanded += legacy_a_star(game, start, end)
+        lengths.append(len(game.path))
+    return expanded, time.perf_counter() - t0, lengths
+
+
+def run_current(game: Game, pairs):
+    expanded = 0
+    lengths = []
+    t0 = time.perf_counter()
+    for start, end in pairs:
+        game.a_star(start, end)
+        expanded += game.expanded_nodes
+        lengths.append(len(game.path))
+    return expanded, time.perf_counter() - t0, lengths
+
+
+def compare_legacy(pairs_count: int, seed: int):
+    """Old list-based A* against Game.a_star on the same pairs."""
+    game = Game(headless=True)
+    pairs = make_pairs(game, pairs_count, seed)
+
+    old_expanded, old_time, old_lengths = run_legacy(game, pairs)
+    new_expanded, new_time, new_lengths = run_current(game, pairs)
+
+    print(f"A* on stock MAP ({pacman.ROWS}x{pacman.COLS}), {len(pairs)} pairs, seed {seed}")
+    print(f"{'':10}{'expanded':>12}{'per search':>12}{'total ms':>12}{'us/search':>12}")
+    for name, expanded, elapsed in (("legacy", old_expanded, old_time),
+                                    ("heap", new_expanded, new_time)):
+        print(f"{name:10}{expanded:12d}{expanded / len(pairs):12.1f}"
+              f"{elapsed * 1000:12.1f}{elapsed * 1e6 / len(pairs):12.1f}")
+    print(f"speedup: {old_time / new_time:.1f}x")
+
+    mismatches = sum(1 for a, b in zip(old_lengths, new_lengths) if a != b)
+    if mismatches:
+        print(f"WARNING: {mismatches} pairs returned a different path length")
+
+
+class LegacyCell:
+    """Cell as it was before search state moved to Game: a __dict__ per cell."""
+
+    def __init__(self, i: int, j: int):
+        self.i = i
+        self.j = j
+        self.f = float('inf')
+        self.g = 0
+        self.h = 0
+        self.parent = None
+        self.is_wall = False
+
+    def reset_cell(self):
+        self.f = float('inf')
+        self.g = 0
+        self.h = 0
+        self.parent = None
+
+
+def allocated_per_cell(make: Callable[[int, int], object]) -> float:
+    """Bytes allocated per object when building a full ROWS x COLS grid."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    grid = [[make(i, j) for j in range(pacman.COLS)] for i in range(pacman.ROWS)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Leave out the row lists themselves
+    rows = sum(sys.getsizeof(row) for row in grid) + sys.getsizeof(grid)
+    return (after - before - rows) / (pacman.ROWS * pacman.COLS)
+
+
+def compare_cells(pairs_count: int, seed: int):
+    """Memory per cell and the cost of the old per-search reset sweep."""
+    n = pacman.ROWS * pacman.COLS
+    game = Game(headless=True)
+    arrays = (game.stamp, game.closed_stamp, game.g_score, game.f_score, game.parent)
+    print(f"memory per cell ({n} cells)")
+    print(f"  legacy Cell with __dict__   {allocated_per_cell(LegacyCell):7.1f} bytes")
+    print(f"  Cell with __slots__         {allocated_per_cell(Cell):7.1f} bytes")
+    print(f"  + search arrays             {sum(map(sys.getsizeof, arrays)) / n:7.1f} bytes")
+
+    legacy_grid = [LegacyCell(i, j) for i in range(pacman.ROWS) for j in range(pacman.COLS)]
+
+    def sweep():
+        for cell in legacy_grid:
+            cell.reset_cell()
+
+    rounds = 2000
+    sweep_us = min(timed(sweep, rounds)) * 1e6
+    bump_us = min(timed(game.reset_parents, rounds)) * 1e6
+    pairs = make_pairs(game, pairs_count, seed)
+    _, elapsed, _ = run_current(game, pairs)
+    search_us = elapsed * 1e6 / len(pairs)
+    print("reset before each search")
+    print(f"  sweep over every cell       {sweep_us:7.1f} us")
+    print(f"  generation bump             {bump_us:7.1f} us")
+    print(f"  Game.a_star, mean           {search_us:7.1f} us per search "
+          f"(the sweep would add {sweep_us / search_us * 100:.0f}%)")
+
+
+# ==========================================
+# Scenarios
+# ==========================================
+def new_game(seed: int, warmup: int = 0) -> Game:
+    """Seeded headless game, optionally played forward a few ticks."""
+    random.seed(seed)
+    game = Game(headless=True, input_source=RandomInput(seed))
+    while game.tick < warmup and not game.game_over:
+        game.step()
+    return game
+
+
+def timed(op: Callable[[], None], count: int) -> List[float]:
+    samples = []
+    clock = time.perf_counter
+    for _ in range(count):
+        t0 = clock()
+        op()
+        samples.append(clock() - t0)
+    return samples
+
+
+def bench_a_star(count: int, seed: int) -> List[float]:
+    """Cold A* between random pairs of cells across the maze."""
+    game = new_game(seed)
+    pairs = make_pairs(game, count, seed)
+    it = iter(pairs)
+    return timed(lambda: game.a_star(*next(it)), count)
+
+
+def bench_junction_path(count: int, seed: int) -> List[float]:
+    """Junction-graph search plus expansion back to cells, same pairs as a_star."""
+    game = new_game(seed)
+    graph = pacman.get_junction_graph()
+    pairs = [((a.i, a.j), (b.i, b.j)) for a, b in make_pairs(game, count, seed)]
+    it = iter(pairs)
+    return timed(lambda: graph.path(*next(it)), count)
+
+
+def bench_hpa_path(count: int, seed: int) -> List[float]:
+    """HPA* search plus refinement back to cells, same pairs as a_star."""
+    game = new_game(seed)
+    graph = pacman.get_hpa_graph()
+    pairs = [((a.i, a.j), (b.i, b.j)) for a, b in make_pairs(game, count, seed)]
+    it = iter(pairs)
+    return timed(lambda: graph.path(*next(it)), count)
+
+
+def bench_get_successors(count: int, seed: int) -> List[float]:
+    game = new_game(seed)
+    cells = [cell for row in game.array for cell in row if not cell.is_wall]
+    rng = random.Random(seed)
+    picks = iter([rng.choice(cells) for _ in range(count)])
+    return timed(lambda: game.get_successors(next(picks)), count)
+
+
+def set_mode(game: Game, mode: str):
+    """Put every ghost into chase, weak or recovering mode."""
+    for ghost in game.ghosts:
+        ghost.is_weak = ghost.is_recovering = ghost.is_affected_by = False
+        ghost.recovering_countdown = 720
+        if mode != "chase":
+            ghost.is_affected_by = True
+            ghost.make_weak()
+            if mode == "recovering":
+                ghost.retreat()
+
+
+def chase_scenario(mode: str):
+    def bench(count: int, seed: int) -> List[float]:
+        """Ghost.search (plan + move) for all four ghosts, one at a time."""
+        game = new_game(seed, warmup=30)
+        ghosts = game.ghosts
+        samples = []
+        while len(samples) < count:
+            # Re-apply the mode before recovery timers can run out
+            set_mode(game, mode)
+            for k in range(min(400, count - len(samples))):
+                samples.extend(timed(ghosts[k % 4].search, 1))
+        return samples
+    return bench
+
+
+def bench_pacman_update(count: int, seed: int) -> List[float]:
+    game = new_game(seed)
+    return timed(game.pacman.update, count)
+
+
+def bench_game_update(count: int, seed: int) -> List[float]:
+    """One full frame of Game.update, restarting with a new seed on game over."""
+    samples = []
+    game_seed = seed
+    game = new_game(game_seed)
+    while len(samples) < count:
+        if game.game_over:
+            game_seed += 1
+            game = new_game(game_seed)
+        samples.extend(timed(game.step, 1))
+    return samples
+
+
+def bench_game_draw(count: int, seed: int) -> List[float]:
+    """A full Game.draw into an off-screen surface."""
+    pygame.font.init()
+    game = new_game(seed, warmup=60)
+    game.attach_screen(pygame.Surface((WIDTH, HEIGHT)))
+    return timed(game.draw, count)
+
+
+def replay_scenario(path: str):
+    recording = replay.load(path)
+    last_tick = recording["result"]["ticks"]
+
+    def bench(count: int, seed: int) -> List[float]:
+        """Game.step over a recorded game, started again from its seed when it ends."""
+        samples = []
+        game = replay.replay_game(recording)
+        while len(samples) < count:
+            if game.game_over or game.tick >= last_tick:
+                game = replay.replay_game(recording)
+            samples.extend(timed(game.step, 1))
+        return samples
+    return bench
+
+
+SCENARIOS: Dict[str, Callable[[int, int], List[float]]] = {
+    "a_star": bench_a_star,
+    "junction_path": bench_junction_path,
+    "hpa_path": bench_hpa_path,
+    "get_successors": bench_get_successors,
+    "ghost_search_chase": chase_scenario("chase"),
+    "ghost_search_weak": chase_scenario("weak"),
+    "ghost_search_recovering": chase_scenario("recovering"),
+    "pacman_update": bench_pacman_update,
+    "game_update": bench_game_update,
+    "game_draw": bench_game_draw,
+}
+
+# Operations per scenario unless --repeat is given; fewer for the slow ones
+REPEAT = 1000
+DEFAULT_REPEAT = {"game_draw": 300}
+
+
+def percentile(sorted_samples: List[float], q: float) -> float:
+    index = min(len(sorted_samples) - 1, int(round(q * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Latency statistics in microseconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean": sum(ordered) / len(ordered) * 1e6,
+        "p50": percentile(ordered, 0.50) * 1e6,
+        "p90": percentile(ordered, 0.90) * 1e6,
+        "p99": percentile(ordered, 0.99) * 1e6,
+        "max": ordered[-1] * 1e6,
+    }
+
+
+def check_regressions(results: Dict[str, Dict[str, float]], baseline_path: str,
+                      threshold: float, metric: str) -> List[str]:
+    """Scenarios whose `metric` got slower than the baseline by more than threshold."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)["results"]
+    failures = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name][metric], stats[metric]
+        change = (after - before) / before if before else 0.0
+        marker = "REGRESSION" if change > threshold else "ok"
+        print(f"{name:26}{before:10.1f}{after:10.1f}{change * 100:+9.1f}%  {marker}")
+        if change > threshold:
+            failures.append(name)
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS),
+                        help="run just this scenario (repeatable)")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help=f"operations per scenario (default {REPEAT}, fewer for slow ones)")
+    parser.add_argument("--seed", type=int, default=1, help="seed for every scenario")
+    parser.add_argument("--rounds", type=int, default=3,
+                        help="repeat each scenario and keep the best round (default 3)")
+    parser.add_argument("--save-baseline", metavar="FILE", help="write results as a baseline")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against a saved baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown before failing, as a fraction (default 0.25)")
+    parser.add_argument("--metric", choices=["mean", "p50", "p90", "p99"], default="p50",
+                        help="statistic compared against the baseline")
+    parser.add_argument("--legacy", action="store_true",
+                        help="compare the original list-based A* with Game.a_star")
+    parser.add_argument("--cells", action="store_true",
+                        help="memory per Cell and the cost of resetting search state")
+    parser.add_argument("--pairs", type=int, default=500,
+                        help="start/goal pairs for --legacy and --cells")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="add a 'replay' scenario stepping through this recording")
+    args = parser.parse_args()
+
+    if args.legacy:
+        compare_legacy(args.pairs, args.seed)
+        return
+    if args.cells:
+        compare_cells(args.pairs, args.seed)
+        return
+
+    if args.replay:
+        SCENARIOS["replay"] = replay_scenario(args.replay)
+        if args.only:
+            args.only.append("replay")
+
+    results = {}
+    print(f"{'scenario':26}{'n':>7}{'mean':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'max':>10}  (us)")
+    for name in args.only or SCENARIOS:
+        count = args.repeat if args.repeat is not None else DEFAULT_REPEAT.get(name, REPEAT)
+        # The fastest round is the least disturbed by other load on the machine
+        rounds = [summarize(SCENARIOS[name](count, args.seed)) for _ in range(args.rounds)]
+        stats = min(rounds, key=lambda r: r[args.metric])
+        results[name] = stats
+        print(f"{name:26}{stats['n']:7d}{stats['mean']:10.1f}{stats['p50']:10.1f}"
+              f"{stats['p90']:10.1f}{stats['p99']:10.1f}{stats['max']:10.1f}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "seed": args.seed,
+                "results": results,
+            }, f, indent=2)
+        print(f"baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        print(f"\n{'vs baseline (' + args.metric + ')':26}{'before':>10}{'after':>10}{'change':>10}")
+        failures = check_regressions(results, args.baseline, args.threshold, args.metric)
+        if failures:
+            print(f"{len(failures)} scenario(s) regressed more than {args.threshold * 100:.0f}%")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Flow field towards Pac-Man, shared by every ghost that chases him.
+
+One breadth-first search runs outward from Pac-Man's tile and records, for
+every walkable cell, its distance to him and the direction of a shortest
+step towards him. The search only reruns when Pac-Man enters a new tile, so
+any number of chasing ghosts read their next move in O(1) instead of each
+running its own A*. Targets other than Pac-Man's tile (Pinky's lookahead
+cell, scatter and retreat targets) keep using point-to-point search.
+
+Neighbours follow Game.get_successors: the '-' tunnel does not wrap, so
+distances equal the cell-level A*.
+"""
+
+from array import array
+from collections import deque
+from typing import List, Optional, Tuple
+
+from mapbundle import MapBundle
+from routing import DIRECTIONS, NO_DIRECTION, NO_ROUTE
+
+
+class FlowField:
+    def __init__(self, maze: MapBundle):
+        self.rows, self.cols = maze.rows, maze.cols
+        n = self.rows * self.cols
+        # (direction index, neighbour id) for every walkable cell, off the neighbour masks
+        offsets = [di * self.cols + dj for di, dj in DIRECTIONS]
+        self.successors: List[List[Tuple[int, int]]] = [
+            [] if maze.is_wall(*divmod(v, self.cols)) else
+            [(d, v + offsets[d]) for d in range(len(DIRECTIONS)) if bits & (1 << d)]
+            for v, bits in enumerate(maze.mask)]
+
+        self.dist = array('H', [NO_ROUTE]) * n  # steps to the target
+        self.direction = bytearray([NO_DIRECTION]) * n  # index into DIRECTIONS
+        self._unset_dist = self.dist[:]
+        self._unset_direction = self.direction[:]
+        self.target: Optional[Tuple[int, int]] = None
+        self.builds = 0
+
+    def update(self, i: int, j: int):
+        """Point the field at (i, j); only searches when the target moved."""
+        if self.target == (i, j):
+            return
+        self.target = (i, j)
+        self.builds += 1
+
+        dist, direction, successors = self.dist, self.direction, self.successors
+        dist[:] = self._unset_dist
+        direction[:] = self._unset_direction
+        source = i * self.cols + j
+        dist[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            step = dist[u] + 1
+            for d, v in successors[u]:
+                if dist[v] == NO_ROUTE:
+                    dist[v] = step
+                    # Opposite of the way we came: (d + 2) % 4 in DIRECTIONS order
+                    direction[v] = (d + 2) % 4
+                    queue.append(v)
+
+    def distance(self, i: int, j: int) -> int:
+        return self.dist[i * self.cols + j]
+
+    def next_direction(self, i: int, j: int) -> Optional[Tuple[int, int]]:
+        """(di, dj) of a shortest step from (i, j) towards the target, None if there."""
+        d = self.direction[i * self.cols + j]
+        return None if d == NO_DIRECTION else DIRECTIONS[d]
+
+    def path(self, i: int, j: int) -> List[Tuple[int, int]]:
+        """Cells from (i, j) up to (not including) the target, goal-side first."""
+        cells = []
+        step = self.next_direction(i, j)
+        while step is not None:
+            cells.append((i, j))
+            i, j = i + step[0], j + step[1]
+            step = self.next_direction(i, j)
+        cells.reverse()
+        return cells
@@ -0,0 +1,113 @@
+"""
+Headless simulation: game logic only, with no window, audio or frame cap.
+
+Builds the grid, Pac-Man and the ghosts without touching the display and
+steps Game.update as fast as the CPU allows.
+
+    python headless.py [--games 100] [--ticks 5000] [--seed 1] [--input random] [--events]
+"""
+
+import argparse
+import bisect
+import random
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from pacman import Game, InputSource
+
+DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]  # up, right, down, left
+
+
+class RandomInput(InputSource):
+    """Turns to a random direction every `interval` ticks.
+
+    Uses its own RNG so the game's random stream is not disturbed.
+    """
+
+    def __init__(self, seed: Optional[int] = None, interval: int = 40):
+        self.rng = random.Random(seed)
+        self.interval = interval
+
+    def next_direction(self, game: Game) -> Optional[Tuple[int, int]]:
+        if game.tick % self.interval == 0:
+            return self.rng.choice(DIRECTIONS)
+        return None
+
+    def next_input_tick(self, game: Game) -> Optional[int]:
+        return -(-game.tick // self.interval) * self.interval
+
+
+class ScriptedInput(InputSource):
+    """Plays back a fixed {tick: (dir_x, dir_y)} schedule."""
+
+    def __init__(self, moves: Dict[int, Tuple[int, int]]):
+        self.moves = moves
+        self.ticks = sorted(moves)
+
+    def next_direction(self, game: Game) -> Optional[Tuple[int, int]]:
+        return self.moves.get(game.tick)
+
+    def next_input_tick(self, game: Game) -> Optional[int]:
+        k = bisect.bisect_left(self.ticks, game.tick)
+        return self.ticks[k] if k < len(self.ticks) else None
+
+
+def play(seed: int, max_ticks: int, input_source: Optional[InputSource] = None,
+         setup: Optional[Callable[[Game], None]] = None, events: bool = False) -> dict:
+    """Play one headless game until game over or max_ticks; return its result.
+
+    `setup` is called on the fresh game before the first tick, e.g. to
+    override ghost parameters. With `events` the game is stepped by the
+    event engine (event_engine.py), which ends in the same state.
+    """
+    random.seed(seed)
+    game = Game(headless=True, input_source=input_source)
+    if setup is not None:
+        setup(game)
+    pellets = len(game.food) + len(game.bonus_food)
+
+    if events:
+        from event_engine import EventEngine
+        EventEngine(game).run(max_ticks)
+    else:
+        while not game.game_over and game.tick < max_ticks:
+            game.step()
+
+    return {
+        "seed": seed,
+        "ticks": game.tick,
+        "pellets_eaten": pellets - len(game.food) - len(game.bonus_food),
+        "won": game.won,
+        "caught_by": game.caught_by,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=100, help="number of games to play")
+    parser.add_argument("--ticks", type=int, default=5000, help="tick limit per game")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first game")
+    parser.add_argument("--input", choices=["random", "idle"], default="random",
+                        help="Pac-Man input: random turns or no input at all")
+    parser.add_argument("--events", action="store_true",
+                        help="jump between events instead of stepping every tick")
+    args = parser.parse_args()
+
+    total_ticks = 0
+    caught = 0
+    t0 = time.perf_counter()
+    for k in range(args.games):
+        seed = args.seed + k
+        source = RandomInput(seed) if args.input == "random" else InputSource()
+        result = play(seed, args.ticks, source, events=args.events)
+        total_ticks += result["ticks"]
+        caught += result["caught_by"] is not None
+    elapsed = time.perf_counter() - t0
+
+    print(f"{args.games} games, {total_ticks} ticks in {elapsed:.2f}s")
+    print(f"{total_ticks / elapsed:.0f} ticks/s, {args.games / elapsed * 60:.0f} games/min")
+    print(f"caught: {caught}, survived to tick limit or won: {args.games - caught}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,455 @@
+"""
+Hierarchical pathfinding (HPA*, Botea, Müller & Schaeffer) for large boards.
+
+The grid is cut into square clusters. Wherever walkable cells face each other
+across a cluster border, the facing pairs become transitions: abstract nodes
+joined by a one-step edge. Inside every cluster the transitions are joined by
+edges weighted with their distance within the cluster, computed once up front
+(a transition that is only reached through another one gets no edge of its
+own), and the cells along every such edge are walked out once, at build
+time. A query links the start and goal into their clusters, runs A* over
+this small abstract graph and then strings the cached cell paths together.
+
+Manhattan distance is a poor guide through a maze, so the abstract search
+also uses landmarks (ALT): abstract distances from a few far-apart
+transitions to every transition are cached at build time, and
+|d(L, goal) - d(L, v)| bounds what is left from v. On a 513x513 generated
+board this cuts a random query from about 3800 expanded transitions to 380.
+
+Bound: facing cells along a border form runs, and a transition is placed at
+most `spacing // 2` cells from every cell of a run. An optimal path that
+crosses a border elsewhere can be bent along the run to the nearest
+transition and back, so
+
+    length <= optimal + 2 * (spacing // 2) * (cluster borders it crosses)
+
+With spacing=1 every facing pair is a transition and paths are optimal; the
+default spacing=3 allows 2 extra steps per border crossed and thins out the
+transitions along open rooms. On mazes with one-cell corridors almost every
+run is a single cell anyway.
+
+Only queries within about 20 cells (--radius 20) are sub-millisecond, at
+about 0.5 ms, which is half of what BFS takes for them. Random pairs anywhere
+on the board, with paths of hundreds or thousands of cells, cost about
+1.2 ms on a 201x201 board and 6 ms on 513x513 (BFS: 13 and 107 ms).
+
+Neighbours follow Game.get_successors: the '-' tunnel does not wrap.
+
+    python hpa.py [--rows 513 --cols 513] [--cluster 16] [--spacing 3] [--radius 20]
+    python hpa.py --stock --cluster 8
+
+generates a board (or takes MAP), builds the graph and checks path lengths
+and the bound against BFS on random pairs.
+"""
+
+import heapq
+import itertools
+from collections import deque
+from operator import sub
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Pos = Tuple[int, int]
+
+# Landmark distance to a transition it cannot reach
+UNREACHABLE = 1 << 30
+
+
+class HierarchicalGraph:
+    """Clusters, transitions and cached intra-cluster distances for a map of '1' walls."""
+
+    def __init__(self, grid: Sequence[Sequence[str]], cluster_size: int = 16, spacing: int = 3,
+                 landmarks: int = 16):
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.cluster_size = cluster_size
+        self.spacing = spacing
+        self.walkable = bytearray(ch != '1' for row in grid for ch in row)
+        self.cluster_cols = -(-self.cols // cluster_size)
+        # cell id -> {cell id: cost}; transitions only
+        self.edges: Dict[int, Dict[int, int]] = {}
+        # cluster index -> transition cell ids inside it
+        self.transitions: Dict[int, List[int]] = {}
+        self.expanded_nodes = 0
+        # (transition, transition) in one cluster -> cells after the first, up to the second
+        self.segments: Dict[Tuple[int, int], List[int]] = {}
+        self.start_tree: Dict[int, int] = {}
+        self.goal_tree: Dict[int, int] = {}
+
+        self._add_transitions()
+        for cluster, cells in self.transitions.items():
+            for v in cells:
+                dist, parent = self._cluster_bfs(v, cluster, stop=self.edges)
+                for w in cells:
+                    if w != v and w in dist:
+                        self.edges[v][w] = dist[w]
+                        self.segments[v, w] = self._walk(parent, v, w)
+        # landmark transitions, and transition -> distances from each of them
+        self.landmarks: List[int] = []
+        self.landmark_dist: Dict[int, Tuple[int, ...]] = {}
+        self._add_landmarks(landmarks)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+    def cluster_of(self, v: int) -> int:
+        i, j = divmod(v, self.cols)
+        return (i // self.cluster_size) * self.cluster_cols + j // self.cluster_size
+
+    def _add_transitions(self):
+        size, rows, cols = self.cluster_size, self.rows, self.cols
+        # Horizontal borders: row i faces row i + 1; then vertical: column j faces j + 1
+        for i in range(size - 1, rows - 1, size):
+            self._scan_border([(i * cols + j, (i + 1) * cols + j) for j in range(cols)])
+        for j in range(size - 1, cols - 1, size):
+            self._scan_border([(i * cols + j, i * cols + j + 1) for i in range(rows)])
+
+    def _scan_border(self, pairs: List[Tuple[int, int]]):
+        """Split a border into runs of facing walkable cells and place transitions."""
+        size, walkable = self.cluster_size, self.walkable
+        run: List[Tuple[int, int]] = []
+        for k, (a, b) in enumerate(pairs):
+            # A run also ends where the clusters along the border change
+            if run and (not (walkable[a] and walkable[b]) or k % size == 0):
+                self._place(run)
+                run = []
+            if walkable[a] and walkable[b]:
+                run.append((a, b))
+        if run:
+            self._place(run)
+
+    def _place(self, run: List[Tuple[int, int]]):
+        half = self.spacing // 2
+        picks = list(range(half, len(run), self.spacing))
+        if not picks or len(run) - 1 - picks[-1] > half:
+            picks.append(len(run) - 1)
+        for k in picks:
+            a, b = run[k]
+            for v, w in ((a, b), (b, a)):
+                if v not in self.edges:
+                    self.edges[v] = {}
+                    self.transitions.setdefault(self.cluster_of(v), []).append(v)
+                self.edges[v][w] = 1
+
+    @staticmethod
+    def _walk(parent: Dict[int, int], a: int, b: int) -> List[int]:
+        """Cells after `a` up to and including `b`, following BFS parents from `b`."""
+        cells = []
+        while b != a:
+            cells.append(b)
+            b = parent[b]
+        cells.reverse()
+        return cells
+
+    def _cluster_bfs(self, source: int, cluster: int,
+                     stop=()) -> Tuple[Dict[int, int], Dict[int, int]]:
+        """Distances and parents from `source` without leaving `cluster`.
+
+        Cells in `stop` (the transitions) are reached but not searched past:
+        whatever lies behind one is reached through its own edges, which
+        keeps the abstract graph sparse without losing any shortest path.
+        """
+        size, cols, rows, walkable = self.cluster_size, self.cols, self.rows, self.walkable
+        top = (cluster // self.cluster_cols) * size
+        left = (cluster % self.cluster_cols) * size
+        bottom, right = min(top + size, rows), min(left + size, cols)
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            if u in stop and u != source:
+                continue
+            i, j = divmod(u, cols)
+            step = dist[u] + 1
+            # Same order as Game.get_successors: up, left, down, right
+            for v, ok in ((u - cols, i > top), (u - 1, j > left),
+                          (u + cols, i + 1 < bottom), (u + 1, j + 1 < right)):
+                if ok and walkable[v] and v not in dist:
+                    dist[v] = step
+                    parent[v] = u
+                    queue.append(v)
+        return dist, parent
+
+    def _distances(self, source: int) -> Dict[int, int]:
+        """Dijkstra over the abstract graph from a transition."""
+        edges = self.edges
+        dist = {source: 0}
+        heap = [(0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, cost in edges[u].items():
+                nd = d + cost
+                if nd < dist.get(v, UNREACHABLE):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        return dist
+
+    def _add_landmarks(self, count: int):
+        """Cache abstract distances from a few far-apart transitions to all of them.
+
+        A query turns them into a lower bound (ALT: |d(L, t) - d(L, v)| for
+        every landmark L) that is much tighter than Manhattan distance in a
+        maze, where the way to a nearby cell often winds far around.
+        """
+        nodes = list(self.edges)
+        if not nodes or count <= 0:
+            return
+        # Farthest-point picks: each landmark is the transition farthest from
+        # the ones before (one in every unconnected part first)
+        nearest = dict.fromkeys(nodes, UNREACHABLE)
+        first = self._distances(nodes[0])
+        pick = max(nodes, key=lambda v: first.get(v, -1))
+        tables = []
+        while len(tables) < min(count, len(nodes)):
+            dist = self._distances(pick)
+            self.landmarks.append(pick)
+            tables.append(dist)
+            for v in nodes:
+                d = dist.get(v, UNREACHABLE)
+                if d < nearest[v]:
+                    nearest[v] = d
+            pick = max(nodes, key=nearest.__getitem__)
+            if nearest[pick] == 0:
+                break
+        self.landmark_dist = {v: tuple(dist.get(v, UNREACHABLE) for dist in tables)
+                              for v in nodes}
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def search(self, start: Pos, goal: Pos) -> Optional[List[int]]:
+        """A* over the abstract graph; the cell ids it passes, start to goal.
+
+        Consecutive entries are either the two sides of a transition or two
+        points of one cluster joined by a path inside it. None if unreachable.
+        """
+        self.expanded_nodes = 0
+        cols, edges = self.cols, self.edges
+        s, t = start[0] * cols + start[1], goal[0] * cols + goal[1]
+        if not (self.walkable[s] and self.walkable[t]):
+            return None
+        if s == t:
+            return [s]
+
+        # Link the start and goal to the transitions of their clusters; the
+        # search trees are kept to walk the first and last leg back out
+        start_cluster, goal_cluster = self.cluster_of(s), self.cluster_of(t)
+        start_dist, self.start_tree = self._cluster_bfs(s, start_cluster, stop=edges)
+        goal_dist, self.goal_tree = self._cluster_bfs(t, goal_cluster, stop=edges)
+        start_links = [(v, start_dist[v]) for v in self.transitions.get(start_cluster, ())
+                       if v in start_dist and v != s]
+        if start_cluster == goal_cluster and t in start_dist:
+            start_links.append((t, start_dist[t]))
+        if s in edges:
+            # A start on a transition can also cross straight over
+            start_links += [(v, 1) for v, cost in edges[s].items()
+                            if cost == 1 and self.cluster_of(v) != start_cluster]
+        goal_links = {v: goal_dist[v] for v in self.transitions.get(goal_cluster, ())
+                      if v in goal_dist}
+        if not goal_links and t not in start_dist:
+            return None
+
+        # Landmark distances to the goal: every abstract path to it ends on a goal link
+        landmark_dist = self.landmark_dist
+        to_goal = None
+        if landmark_dist and goal_links:
+            to_goal = [min(landmark_dist[b][k] + d for b, d in goal_links.items())
+                       for k in range(len(self.landmarks))]
+
+        gi, gj = goal
+        counter = itertools.count()
+        g = {s: 0}
+        parent = {s: -1}
+        heuristic: Dict[int, int] = {}
+        open_heap = [(0, 0, next(counter), s)]
+        closed = set()
+        while open_heap:
+            _, _, _, q = heapq.heappop(open_heap)
+            if q in closed:
+                continue
+            if q == t:
+                route = []
+                while q != -1:
+                    route.append(q)
+                    q = parent[q]
+                route.reverse()
+                return route
+            closed.add(q)
+            self.expanded_nodes += 1
+
+            neighbours = start_links if q == s else edges[q].items()
+            if q in goal_links:
+                neighbours = itertools.chain(neighbours, ((t, goal_links[q]),))
+            gq = g[q]
+            for v, cost in neighbours:
+                new_g = gq + cost
+                if v not in closed and new_g < g.get(v, new_g + 1):
+                    g[v] = new_g
+                    parent[v] = q
+                    h = heuristic.get(v)
+                    if h is None:
+                        i, j = divmod(v, cols)
+                        h = abs(i - gi) + abs(j - gj)  # Manhattan: 4-connected grid
+                        if to_goal is not None and v != t:
+                            h = max(h, max(map(abs, map(sub, landmark_dist[v], to_goal))))
+                        heuristic[v] = h
+                    heapq.heappush(open_heap, (new_g + h, h, next(counter), v))
+        return None
+
+    def _refine(self, a: int, b: int, start: int, goal: int) -> List[int]:
+        """Cells after `a` up to and including `b` along one abstract edge."""
+        if self.cluster_of(a) != self.cluster_of(b):
+            return [b]  # across a transition
+        cells = []
+        if a == start:
+            return self._walk(self.start_tree, a, b)
+        if b == goal:
+            while a != b:
+                a = self.goal_tree[a]
+                cells.append(a)
+            return cells
+        # Between two transitions: walked out when the graph was built
+        return self.segments[a, b]
+
+    def path(self, start: Pos, goal: Pos) -> List[Pos]:
+        """Cells from start up to (not including) goal, goal-side first like Game.path."""
+        route = self.search(start, goal)
+        if route is None or len(route) < 2:
+            return []
+        s, t = route[0], route[-1]
+        cells = [s]
+        for a, b in zip(route, route[1:]):
+            cells.extend(self._refine(a, b, s, t))
+        cells.pop()
+        cells.reverse()
+        return [divmod(v, self.cols) for v in cells]
+
+    def stats(self) -> dict:
+        return {
+            'cells': sum(self.walkable),
+            'clusters': len(self.transitions),
+            'transitions': len(self.edges),
+            'edges': sum(len(adj) for adj in self.edges.values()) // 2,
+        }
+
+
+def bfs_distance(walkable: bytearray, rows: int, cols: int, s: int, t: int) -> Tuple[int, List[int]]:
+    """Optimal distance from s to t and one shortest path (s first), by BFS."""
+    parent = {s: -1}
+    queue = deque([s])
+    while queue:
+        u = queue.popleft()
+        if u == t:
+            break
+        i, j = divmod(u, cols)
+        for v, ok in ((u - cols, i > 0), (u - 1, j > 0), (u + cols, i + 1 < rows), (u + 1, j + 1 < cols)):
+            if ok and walkable[v] and v not in parent:
+                parent[v] = u
+                queue.append(v)
+    if t not in parent:
+        return -1, []
+    cells = []
+    while t != -1:
+        cells.append(t)
+        t = parent[t]
+    cells.reverse()
+    return len(cells) - 1, cells
+
+
+def check(grid: Sequence[Sequence[str]], cluster_size: int, spacing: int, pairs: int,
+          seed: int, radius: int = 0) -> bool:
+    """Compare paths on random pairs with BFS: lengths, the stated bound and time.
+
+    With `radius`, goals are picked within that many rows and columns of the
+    start, like a ghost chasing something nearby.
+    """
+    import random
+    import time
+
+    clock = time.perf_counter
+    t0 = clock()
+    graph = HierarchicalGraph(grid, cluster_size, spacing)
+    built = clock() - t0
+    stats = graph.stats()
+    print(f"{graph.rows}x{graph.cols}: {stats['cells']} walkable cells -> {stats['transitions']} "
+          f"transitions, {stats['edges']} edges in {stats['clusters']} clusters ({built:.2f}s)")
+
+    rng = random.Random(seed)
+    cells = [v for v, ok in enumerate(graph.walkable) if ok]
+    rows, cols = graph.rows, graph.cols
+    done = extra = worst = failures = expanded = 0
+    elapsed = flat = 0.0
+    while done < pairs:
+        s, t = rng.choice(cells), rng.choice(cells)
+        start, goal = divmod(s, cols), divmod(t, cols)
+        if radius and (abs(start[0] - goal[0]) > radius or abs(start[1] - goal[1]) > radius):
+            # Redraw the goal near the start
+            goal = (min(rows - 1, max(0, start[0] + rng.randint(-radius, radius))),
+                    min(cols - 1, max(0, start[1] + rng.randint(-radius, radius))))
+            t = goal[0] * cols + goal[1]
+        t0 = clock()
+        optimal, cells_on_optimal = bfs_distance(graph.walkable, rows, cols, s, t)
+        t1 = clock()
+        path = graph.path(start, goal)
+        t2 = clock()
+        if optimal <= 0:
+            continue  # wall, unreachable or start == goal
+        done += 1
+        flat += t1 - t0
+        elapsed += t2 - t1
+        expanded += graph.expanded_nodes
+
+        crossings = sum(graph.cluster_of(a) != graph.cluster_of(b)
+                        for a, b in zip(cells_on_optimal, cells_on_optimal[1:]))
+        bound = optimal + 2 * (spacing // 2) * crossings
+        steps = path[::-1] + [goal]
+        walkable = steps[0] == start and all(
+            abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 and graph.walkable[b[0] * cols + b[1]]
+            for a, b in zip(steps, steps[1:]))
+        if not (optimal <= len(path) <= bound) or not walkable:
+            failures += 1
+        extra += len(path) - optimal
+        worst = max(worst, len(path) - optimal)
+
+    print(f"{pairs} pairs{f' within {radius}' if radius else ''}: {elapsed / pairs * 1e6:.0f} us "
+          f"per path ({flat / pairs * 1e6:.0f} us for BFS on the full grid), "
+          f"{expanded / pairs:.1f} abstract nodes expanded, "
+          f"{extra / pairs:.2f} extra steps on average, {worst} at worst")
+    if failures:
+        print(f"{failures} paths break the bound or are not walkable")
+        return False
+    print(f"all paths within optimal + {2 * (spacing // 2)} per cluster border crossed")
+    return True
+
+
+def main():
+    import argparse
+    import sys
+
+    from mazegen import generate
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=513)
+    parser.add_argument("--cols", type=int, default=513)
+    parser.add_argument("--rooms", type=int, default=40, help="open rooms in the generated board")
+    parser.add_argument("--stock", action="store_true", help="use the stock MAP instead")
+    parser.add_argument("--cluster", type=int, default=16, help="cluster size in cells")
+    parser.add_argument("--spacing", type=int, default=3, help="cells between transitions on a border")
+    parser.add_argument("--pairs", type=int, default=300, help="random start/goal pairs")
+    parser.add_argument("--radius", type=int, default=0,
+                        help="pick goals within this many rows/columns of the start")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.stock:
+        from pacman import MAP
+        grid = MAP
+    else:
+        grid = generate(args.rows, args.cols, args.seed, rooms=args.rooms)
+    if not check(grid, args.cluster, args.spacing, args.pairs, args.seed, args.radius):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
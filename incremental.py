@@ -0,0 +1,234 @@
+"""
+Incremental A* for ghosts that replan every tile towards a moving target.
+
+Blinky and Inky plan from the tile they just reached to a target that has
+usually moved by a tile or two. Walls never change, so instead of the edge
+cost repair of LPA*/D* Lite this uses fringe retrieval (G-FRA*, Sun, Yeoh &
+Koenig): the closed cells of the previous search form a shortest-path tree
+rooted at the old start. When the ghost moves to a cell of that tree, the
+subtree below it keeps exact distances and is reused; its fringe becomes the
+new open list and A* carries on towards the new target. If the target is
+already inside the tree no cell is expanded at all.
+
+    python incremental.py [--games 50] [--ticks 3000] [--seed 1]
+
+plays headless games with the planner and checks every plan against a full
+Game.a_star, reporting expansions side by side.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Dict, List, Sequence
+
+# Same successor order as Game.get_successors: up, left, down, right
+DIRECTIONS = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+
+
+class IncrementalPlanner:
+    """One ghost's search state, kept between plans.
+
+    Works on the game's Cell grid and returns paths shaped like Game.path:
+    the cell next to the goal first, back to the start, goal excluded.
+    """
+
+    def __init__(self, grid: Sequence[Sequence]):
+        self.rows, self.cols = len(grid), len(grid[0])
+        self.cells = [cell for row in grid for cell in row]
+        self.successors: List[List[int]] = [[] for _ in self.cells]
+        for cell in self.cells:
+            if cell.is_wall:
+                continue
+            for di, dj in DIRECTIONS:
+                ni, nj = cell.i + di, cell.j + dj
+                if 0 <= ni < self.rows and 0 <= nj < self.cols and not grid[ni][nj].is_wall:
+                    self.successors[cell.i * self.cols + cell.j].append(ni * self.cols + nj)
+
+        n = len(self.cells)
+        self.g = [0] * n
+        self.parent = [-1] * n
+        self.closed = bytearray(n)
+        self.tree: List[int] = []  # closed cell ids, parents before children
+        self.start = -1
+
+        # Counters: totals over every plan, plus the last plan on its own
+        self.searches = 0
+        self.restarts = 0
+        self.total_expanded = 0
+        self.total_reused = 0
+        self.expanded = 0
+        self.reused = 0
+
+    def plan(self, start, goal) -> List:
+        """Shortest path from start to goal, reusing the previous search."""
+        s = start.i * self.cols + start.j
+        t = goal.i * self.cols + goal.j
+        self.searches += 1
+        self.expanded = 0
+        if s == t:
+            self.reused = 0
+            return []
+
+        if self.start == -1 or not self.closed[s]:
+            self.reset(s)
+        elif s != self.start:
+            self.retrieve(s)
+        self.reused = len(self.tree)
+        self.total_reused += self.reused
+
+        if not self.closed[t] and not self.search(t):
+            return []
+
+        path = []
+        v = self.parent[t]
+        while v != -1:
+            path.append(self.cells[v])
+            v = self.parent[v]
+        return path
+
+    def reset(self, start: int):
+        """Forget the previous search and start a new tree at `start`."""
+        for v in self.tree:
+            self.closed[v] = 0
+        self.tree = []
+        self.start = start
+        self.g[start] = 0
+        self.parent[start] = -1
+        self.restarts += 1
+
+    def retrieve(self, start: int):
+        """Keep only the subtree below `start`, with distances measured from it."""
+        children: Dict[int, List[int]] = {}
+        for v in self.tree:
+            if v != self.start:
+                children.setdefault(self.parent[v], []).append(v)
+        keep = [start]
+        k = 0
+        while k < len(keep):
+            keep.extend(children.get(keep[k], ()))
+            k += 1
+
+        for v in self.tree:
+            self.closed[v] = 0
+        offset = self.g[start]
+        for v in keep:
+            self.closed[v] = 1
+            self.g[v] -= offset
+        self.parent[start] = -1
+        self.tree = keep
+        self.start = start
+
+    def search(self, goal: int) -> bool:
+        """A* from the fringe of the kept tree; False if the goal is unreachable."""
+        g, parent, closed, successors = self.g, self.parent, self.closed, self.successors
+        cols = self.cols
+        gi, gj = divmod(goal, cols)
+
+        def heuristic(v: int) -> float:
+            i, j = divmod(v, cols)
+            return math.sqrt((j - gj) ** 2 + (i - gi) ** 2)
+
+        # Open list: the start on its own, or every cell next to the tree
+        frontier: Dict[int, int] = {}
+        if not self.tree:
+            frontier[self.start] = 0
+        for u in self.tree:
+            new_g = g[u] + 1
+            for v in successors[u]:
+                if not closed[v] and (v not in frontier or new_g < frontier[v]):
+                    frontier[v] = new_g
+                    parent[v] = u
+
+        counter = itertools.count()
+        open_heap = []
+        for v, gv in frontier.items():
+            h = heuristic(v)
+            open_heap.append((gv + h, h, next(counter), v))
+        heapq.heapify(open_heap)
+
+        while open_heap:
+            f, h, _, q = heapq.heappop(open_heap)
+            # Skip stale entries left behind when a cell was re-pushed
+            if closed[q] or f > frontier[q] + h:
+                continue
+            if q == goal:
+                return True
+            g[q] = frontier[q]
+            closed[q] = 1
+            self.tree.append(q)
+            self.expanded += 1
+            self.total_expanded += 1
+
+            new_g = g[q] + 1
+            for s in successors[q]:
+                if s == goal:
+                    parent[s] = q
+                    return True
+                if closed[s] or (s in frontier and new_g >= frontier[s]):
+                    continue
+                frontier[s] = new_g
+                parent[s] = q
+                h = heuristic(s)
+                heapq.heappush(open_heap, (new_g + h, h, next(counter), s))
+        return False
+
+
+def check(games: int, ticks: int, seed: int) -> bool:
+    """Play games with the planner and compare every plan with Game.a_star."""
+    import random
+
+    from headless import RandomInput
+    from pacman import Game
+
+    totals: Dict[str, List[int]] = {}
+    mismatches = 0
+    for k in range(games):
+        random.seed(seed + k)
+        game = Game(headless=True, input_source=RandomInput(seed + k))
+        for ghost in game.ghosts:
+            if ghost.incremental:
+                ghost.planner = IncrementalPlanner(game.array)
+        while not game.game_over and game.tick < ticks:
+            # Ghosts replan at tile centers, before their own move
+            starts = [(ghost, ghost.planner.searches) for ghost in game.ghosts if ghost.planner]
+            game.step()
+            for ghost, before in starts:
+                if ghost.planner.searches == before:
+                    continue
+                game.a_star(ghost.current_cell, ghost.cell_to_follow)
+                row = totals.setdefault(type(ghost).__name__, [0, 0, 0, 0])
+                row[0] += 1
+                row[1] += ghost.planner.expanded
+                row[2] += game.expanded_nodes
+                if len(game.path) != ghost.route_length:
+                    mismatches += 1
+        for ghost in game.ghosts:
+            if ghost.planner:
+                totals[type(ghost).__name__][3] += ghost.planner.restarts
+
+    print(f"{'ghost':8}{'plans':>8}{'expanded':>10}{'full A*':>10}{'ratio':>8}{'restarts':>10}")
+    for name, (plans, expanded, full, restarts) in sorted(totals.items()):
+        print(f"{name:8}{plans:8d}{expanded:10d}{full:10d}"
+              f"{expanded / max(full, 1):8.2f}{restarts:10d}")
+    if mismatches:
+        print(f"{mismatches} plans differ in length from Game.a_star")
+        return False
+    print("all path lengths match Game.a_star")
+    return True
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--games", type=int, default=50, help="number of games to play")
+    parser.add_argument("--ticks", type=int, default=3000, help="tick limit per game")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first game")
+    args = parser.parse_args()
+    if not check(args.games, args.ticks, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Junction graph: the maze compressed to junctions, dead ends and corridors.
+
+Most walkable cells have exactly two walkable neighbours and only lead on
+down a corridor. Compiling the grid keeps the other cells (junctions and dead
+ends) as nodes and turns each corridor between them into one weighted edge
+that remembers the cells it runs through. A query places the start and goal
+on their corridor (or node), searches the small graph and only walks the
+corridors back out to cells for the final path.
+
+Neighbours follow Game.get_successors, so the '-' tunnel does not wrap and
+distances equal the cell-level A*.
+
+    python junctions.py [--pairs 2000] [--seed 1]
+
+prints the size of the compiled graph and checks path lengths and expansion
+counts against Game.a_star on random start/goal pairs.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Dict, List, Optional, Tuple
+
+from mapbundle import MapBundle
+
+# Same successor order as Game.get_successors: up, left, down, right
+DIRECTIONS = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+
+Pos = Tuple[int, int]
+
+
+class JunctionGraph:
+    """Nodes and corridor edges compiled from a map's neighbour masks."""
+
+    def __init__(self, maze: MapBundle):
+        self.rows, self.cols = maze.rows, maze.cols
+        self.neighbours: Dict[Pos, List[Pos]] = {}
+        for i in range(self.rows):
+            for j in range(self.cols):
+                if maze.is_wall(i, j):
+                    continue
+                bits = maze.mask[i * self.cols + j]
+                self.neighbours[(i, j)] = [(i + di, j + dj) for d, (di, dj) in enumerate(DIRECTIONS)
+                                           if bits & (1 << d)]
+
+        # Anything that is not a plain corridor cell is a node
+        self.nodes = {pos for pos, adj in self.neighbours.items() if len(adj) != 2}
+        # edges[k] = (a, b, cells strictly between a and b, in order from a)
+        self.edges: List[Tuple[Pos, Pos, List[Pos]]] = []
+        self.adjacent: Dict[Pos, List[Tuple[Pos, int, int]]] = {n: [] for n in self.nodes}
+        # corridor cell -> (edge index, position along the edge's cells)
+        self.corridor: Dict[Pos, Tuple[int, int]] = {}
+        self.expanded_nodes = 0
+
+        self._compile()
+
+    def _compile(self):
+        used = set()
+        pending = sorted(self.nodes)
+        while True:
+            for a in pending:
+                for first in self.neighbours[a]:
+                    if (a, first) not in used:
+                        self._walk(a, first, used)
+            # A ring of corridor cells with no junction: promote one cell
+            loose = sorted(pos for pos in self.neighbours
+                           if pos not in self.nodes and pos not in self.corridor)
+            if not loose:
+                break
+            self.nodes.add(loose[0])
+            self.adjacent[loose[0]] = []
+            pending = [loose[0]]
+
+    def _walk(self, a: Pos, first: Pos, used: set):
+        """Follow the corridor leaving `a` through `first` up to the next node."""
+        cells: List[Pos] = []
+        previous, current = a, first
+        while current not in self.nodes:
+            cells.append(current)
+            step = self.neighbours[current]
+            previous, current = current, step[0] if step[1] == previous else step[1]
+        b = current
+        used.add((a, first))
+        used.add((b, previous))
+
+        k = len(self.edges)
+        self.edges.append((a, b, cells))
+        for index, pos in enumerate(cells):
+            self.corridor[pos] = (k, index)
+        weight = len(cells) + 1
+        self.adjacent[a].append((b, weight, k))
+        if b != a:
+            self.adjacent[b].append((a, weight, k))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def _anchors(self, pos: Pos) -> List[Tuple[Pos, int]]:
+        """Nodes reachable straight from `pos` along its corridor, with distances."""
+        if pos in self.nodes:
+            return [(pos, 0)]
+        k, index = self.corridor[pos]
+        a, b, cells = self.edges[k]
+        return [(a, index + 1), (b, len(cells) - index)]
+
+    def search(self, start: Pos, goal: Pos) -> Optional[List[Pos]]:
+        """Node-level A*; returns the nodes passed on the way, or None if unreachable.
+
+        The result starts with `start` and ends with `goal`, with the junctions
+        in between, so consecutive entries are joined by one corridor.
+        """
+        self.expanded_nodes = 0
+        if start not in self.neighbours or goal not in self.neighbours:
+            return None
+        if start == goal:
+            return [start]
+
+        gi, gj = goal
+
+        def heuristic(pos: Pos) -> float:
+            return math.sqrt((pos[1] - gj) ** 2 + (pos[0] - gi) ** 2)
+
+        # Where the goal can be entered from, and at what extra cost
+        exits: Dict[Pos, int] = {}
+        for node, cost in self._anchors(goal):
+            exits[node] = min(cost, exits.get(node, cost))
+        best = math.inf
+        if start in self.corridor and goal in self.corridor:
+            (k1, i1), (k2, i2) = self.corridor[start], self.corridor[goal]
+            if k1 == k2:
+                best = abs(i1 - i2)  # same corridor, no node in between
+
+        counter = itertools.count()
+        g: Dict[Pos, int] = {}
+        parent: Dict[Pos, Optional[Pos]] = {}
+        open_heap = []
+        for node, cost in self._anchors(start):
+            if cost < g.get(node, math.inf):
+                g[node] = cost
+                parent[node] = None
+                h = heuristic(node)
+                heapq.heappush(open_heap, (cost + h, h, next(counter), node))
+        closed = set()
+        via: Optional[Pos] = None  # last node before the goal
+
+        while open_heap:
+            f, _, _, q = heapq.heappop(open_heap)
+            if f >= best:
+                break
+            if q in closed:
+                continue
+            closed.add(q)
+            self.expanded_nodes += 1
+
+            if q in exits and g[q] + exits[q] < best:
+                best = g[q] + exits[q]
+                via = q
+
+            for node, weight, _ in self.adjacent[q]:
+                new_g = g[q] + weight
+                if node not in closed and new_g < g.get(node, math.inf):
+                    g[node] = new_g
+                    parent[node] = q
+                    h = heuristic(node)
+                    heapq.heappush(open_heap, (new_g + h, h, next(counter), node))
+
+        if best == math.inf:
+            return None
+        route = [goal]
+        node = parent[via] if via == goal else via
+        while node is not None:
+            route.append(node)
+            node = parent[node]
+        if route[-1] != start:
+            route.append(start)
+        route.reverse()
+        return route
+
+    def _segment(self, a: Pos, b: Pos) -> List[Pos]:
+        """Cells strictly between two points joined by a corridor (or adjacent)."""
+        if a in self.corridor and b in self.corridor and self.corridor[a][0] == self.corridor[b][0]:
+            k, i1 = self.corridor[a]
+            i2 = self.corridor[b][1]
+            cells = self.edges[k][2]
+            return cells[i1 + 1:i2] if i1 < i2 else cells[i2 + 1:i1][::-1]
+        if a in self.corridor:
+            # From a corridor cell out to the node b at one end of it
+            k, index = self.corridor[a]
+            start_node, end_node, cells = self.edges[k]
+            # A corridor looping back to its own node leaves by the nearer end
+            if end_node == b and (start_node != b or len(cells) - index <= index + 1):
+                return cells[index + 1:]
+            return cells[:index][::-1]
+        if b in self.corridor:
+            return self._segment(b, a)[::-1]
+        # Node to node: the shortest corridor that joins them
+        best = None
+        for node, weight, k in self.adjacent[a]:
+            if node == b and (best is None or weight < best[0]):
+                best = (weight, k)
+        start_node, _, cells = self.edges[best[1]]
+        return cells if start_node == a else cells[::-1]
+
+    def path(self, start: Pos, goal: Pos) -> List[Pos]:
+        """Cells from start up to (not including) goal, goal-side first like Game.path."""
+        route = self.search(start, goal)
+        if route is None or len(route) < 2:
+            return []
+        cells = [start]
+        for a, b in zip(route, route[1:]):
+            cells.extend(self._segment(a, b))
+            if b != goal:
+                cells.append(b)
+        cells.reverse()
+        return cells
+
+    def stats(self) -> dict:
+        return {'cells': len(self.neighbours), 'nodes': len(self.nodes), 'edges': len(self.edges)}
+
+
+def check(pairs: int, seed: int) -> bool:
+    """Compare path lengths and expansions with Game.a_star on random pairs."""
+    import random
+
+    from pacman import MAZE, Game
+
+    graph = JunctionGraph(MAZE)
+    game = Game(headless=True)
+    stats = graph.stats()
+    print(f"{stats['cells']} walkable cells -> {stats['nodes']} nodes, {stats['edges']} corridor edges")
+
+    rng = random.Random(seed)
+    cells = [cell for row in game.array for cell in row if not cell.is_wall]
+    full = compressed = mismatches = 0
+    for _ in range(pairs):
+        a, b = rng.choice(cells), rng.choice(cells)
+        game.a_star(a, b)
+        full += game.expanded_nodes
+        path = graph.path((a.i, a.j), (b.i, b.j))
+        compressed += graph.expanded_nodes
+        steps = [(c.i, c.j) for c in reversed([game.array[i][j] for i, j in path])] + [(b.i, b.j)]
+        walkable = all(q in graph.neighbours[p] for p, q in zip(steps, steps[1:]))
+        if len(path) != len(game.path) or (path and not walkable):
+            mismatches += 1
+
+    print(f"{pairs} pairs: {full / pairs:.1f} cells expanded by A*, "
+          f"{compressed / pairs:.1f} nodes by the junction graph")
+    if mismatches:
+        print(f"{mismatches} paths differ in length from Game.a_star or are not walkable")
+        return False
+    print("all path lengths match Game.a_star")
+    return True
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=2000, help="random start/goal pairs")
+    parser.add_argument("--seed", type=int, default=1, help="seed for picking pairs")
+    args = parser.parse_args()
+    if not check(args.pairs, args.seed):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
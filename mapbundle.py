@@ -0,0 +1,244 @@
+"""
+Maps loaded from text files and compiled into a memory-mapped bundle.
+
+A map file (maps/<name>.txt) holds one row of tiles per line, in the MAP
+alphabet ('1' wall, '2' pellet, '3' power pellet, '0' empty, '-' tunnel),
+plus '@key values' lines for the spawn cells and the ghost house and '#'
+comments. Compiling it gives:
+
+    tiles      one byte per cell, the tile character
+    walls      a bitmap, one bit per cell
+    mask       one byte per cell; bit d is set when the neighbour in
+               DIRECTIONS[d] is on the board and not a wall
+    teleports  pairs of '-' cells facing each other across the board
+    spawns     Pac-Man and ghost start cells, and the ghost house cells
+
+The bundle is written next to the game as pacman_map_<name>_<hash>.bin,
+keyed by a hash of the map file, and memory-mapped on later startups.
+
+    python mapbundle.py [classic]
+
+compiles a map and prints what it contains.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+
+MAP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "maps")
+
+# (di, dj) in the same order as Game.get_successors: up, left, down, right
+DIRECTIONS = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+# Mask bit for a (dir_x, dir_y) move; standing still needs no bit
+STEP_BITS = {(0, -1): 1, (-1, 0): 2, (0, 1): 4, (1, 0): 8, (0, 0): 0}
+
+SPAWNS = ['pacman', 'blinky', 'pinky', 'inky', 'clyde']
+TILES = set('0123-')
+
+_MAGIC = b"PMMB"
+_VERSION = 1
+# magic, version, rows, cols, teleport pairs, house cells, sha1 of the map file
+_HEADER = struct.Struct("<4sHHHHH20s")
+_PAIR = struct.Struct("<II")
+_CELL = struct.Struct("<HH")
+
+Pos = Tuple[int, int]
+
+
+class MapBundle:
+    """A compiled map; the big sections are views into the mapped file."""
+
+    def __init__(self, name: str, rows: int, cols: int, tiles, walls, mask,
+                 teleports: Dict[int, int], spawns: Dict[str, Pos], house: List[Pos],
+                 digest: str, buffer: Optional[mmap.mmap] = None):
+        self.name = name
+        self.rows = rows
+        self.cols = cols
+        self.tiles = tiles          # rows * cols tile characters, as bytes
+        self.walls = walls          # bitmap, bit (i * cols + j)
+        self.mask = mask            # rows * cols neighbour masks
+        self.teleports = teleports  # cell id -> cell id, both ways
+        self.spawns = spawns
+        self.house = house
+        self.digest = digest
+        self._buffer = buffer
+        # Rows as strings, for code that takes a MAP-style grid
+        self.grid = [bytes(tiles[i * cols:(i + 1) * cols]).decode() for i in range(rows)]
+
+    def is_wall(self, i: int, j: int) -> bool:
+        v = i * self.cols + j
+        return bool(self.walls[v >> 3] & (1 << (v & 7)))
+
+    def tile(self, i: int, j: int) -> str:
+        return chr(self.tiles[i * self.cols + j])
+
+    # ------------------------------------------------------------------
+    # Compiling
+    # ------------------------------------------------------------------
+    @classmethod
+    def compile(cls, text: str, name: str = "map") -> "MapBundle":
+        meta: Dict[str, List[int]] = {}
+        rows: List[str] = []
+        for number, line in enumerate(text.splitlines(), 1):
+            line = line.rstrip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('@'):
+                key, *values = line[1:].split()
+                if key == 'name':
+                    name = values[0]
+                else:
+                    meta[key] = [int(v) for v in values]
+                continue
+            if set(line) - TILES:
+                raise ValueError(f"line {number}: unknown tiles {sorted(set(line) - TILES)}")
+            rows.append(line)
+        if not rows or any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError("map rows must all have the same length")
+        n_rows, n_cols = len(rows), len(rows[0])
+
+        tiles = bytearray("".join(rows).encode())
+        walls = bytearray((n_rows * n_cols + 7) // 8)
+        mask = bytearray(n_rows * n_cols)
+        for i, row in enumerate(rows):
+            for j, tile in enumerate(row):
+                v = i * n_cols + j
+                if tile == '1':
+                    walls[v >> 3] |= 1 << (v & 7)
+                for d, (di, dj) in enumerate(DIRECTIONS):
+                    ni, nj = i + di, j + dj
+                    if 0 <= ni < n_rows and 0 <= nj < n_cols and rows[ni][nj] != '1':
+                        mask[v] |= 1 << d
+
+        teleports = {}
+        for i, row in enumerate(rows):
+            if row[0] == '-' and row[-1] == '-':
+                teleports[i * n_cols] = i * n_cols + n_cols - 1
+        for j in range(n_cols):
+            if rows[0][j] == '-' and rows[-1][j] == '-':
+                teleports[j] = (n_rows - 1) * n_cols + j
+        teleports.update({b: a for a, b in list(teleports.items())})
+
+        spawns = {}
+        for key in SPAWNS:
+            if len(meta.get(key, ())) != 2:
+                raise ValueError(f"map needs '@{key} row col'")
+            spawns[key] = tuple(meta[key])
+        house = []
+        if 'house' in meta:
+            top, left, bottom, right = meta['house']
+            house = [(i, j) for i in range(top, bottom + 1) for j in range(left, right + 1)
+                     if i < n_rows and j < n_cols]
+
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        return cls(name, n_rows, n_cols, bytes(tiles), bytes(walls), bytes(mask),
+                   teleports, spawns, house, digest)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, path: str):
+        pairs = [(a, b) for a, b in self.teleports.items() if a < b]
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, self.rows, self.cols, len(pairs),
+                                 len(self.house), bytes.fromhex(self.digest)))
+            f.write(self.tiles)
+            f.write(self.walls)
+            f.write(self.mask)
+            for pair in pairs:
+                f.write(_PAIR.pack(*pair))
+            for key in SPAWNS:
+                f.write(_CELL.pack(*self.spawns[key]))
+            for cell in self.house:
+                f.write(_CELL.pack(*cell))
+            f.write(self.name.encode())
+
+    @classmethod
+    def load(cls, path: str, digest: str) -> Optional["MapBundle"]:
+        """Memory-map a saved bundle; None if it is missing or for another file."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return None
+
+        if len(buffer) < _HEADER.size:
+            buffer.close()
+            return None
+        magic, version, rows, cols, n_pairs, n_house, saved = _HEADER.unpack_from(buffer)
+        n = rows * cols
+        sizes = [n, (n + 7) // 8, n, _PAIR.size * n_pairs, _CELL.size * (len(SPAWNS) + n_house)]
+        if (magic != _MAGIC or version != _VERSION or saved.hex() != digest
+                or len(buffer) < _HEADER.size + sum(sizes)):
+            buffer.close()
+            return None
+
+        view = memoryview(buffer)
+        offset = _HEADER.size
+        sections = []
+        for size in sizes:
+            sections.append(view[offset:offset + size])
+            offset += size
+        tiles, walls, mask, pair_data, cell_data = sections
+
+        teleports = {}
+        for a, b in _PAIR.iter_unpack(pair_data):
+            teleports[a] = b
+            teleports[b] = a
+        cells = list(_CELL.iter_unpack(cell_data))
+        spawns = dict(zip(SPAWNS, cells))
+        name = bytes(view[offset:]).decode()
+        return cls(name, rows, cols, tiles, walls, mask, teleports, spawns,
+                   cells[len(SPAWNS):], digest, buffer)
+
+    @classmethod
+    def load_or_compile(cls, map_path: str, directory: str) -> "MapBundle":
+        """Use the cached bundle for this map file if present, else compile and save it."""
+        with open(map_path) as f:
+            text = f.read()
+        digest = hashlib.sha1(text.encode()).hexdigest()
+        stem = os.path.splitext(os.path.basename(map_path))[0]
+        path = os.path.join(directory, f"pacman_map_{stem}_{digest[:12]}.bin")
+        bundle = cls.load(path, digest)
+        if bundle is not None:
+            return bundle
+        bundle = cls.compile(text, stem)
+        try:
+            bundle.save(path)
+        except OSError:
+            # Read-only install: keep the in-memory bundle
+            return bundle
+        return cls.load(path, digest) or bundle
+
+
+def map_path(name: str) -> str:
+    """maps/<name>.txt, or `name` itself when it is a path to a file."""
+    return name if os.path.isfile(name) else os.path.join(MAP_DIR, f"{name}.txt")
+
+
+def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("name", nargs="?", default="classic", help="map name or path")
+    args = parser.parse_args()
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    t0 = time.perf_counter()
+    bundle = MapBundle.load_or_compile(map_path(args.name), directory)
+    elapsed = time.perf_counter() - t0
+    walls = sum(bin(byte).count('1') for byte in bundle.walls)
+    print(f"{bundle.name}: {bundle.rows}x{bundle.cols}, {walls} walls, "
+          f"{len(bundle.teleports) // 2} teleport pairs, {len(bundle.house)} house cells "
+          f"({'mapped' if bundle._buffer is not None else 'in memory'}, {elapsed * 1000:.1f} ms)")
+    for key, (i, j) in bundle.spawns.items():
+        print(f"  {key:8} row {i}, col {j}")
+
+
+if __name__ == "__main__":
+    main()
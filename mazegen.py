@@ -0,0 +1,149 @@
+"""
+Maze generator for large boards, for stress tests and custom levels.
+
+Corridors are one cell wide and run between walls on the even rows and
+columns, like the stock board. A randomized depth-first search carves a
+perfect maze, then most dead ends are knocked through to make loops (a
+Pac-Man board has none), and a few open rooms can be cut in. Cells use the
+MAP alphabet: '1' wall, '2' pellet, '3' power pellet, '0' empty.
+
+    python mazegen.py 1001 1001 --seed 3 --out maps/big.txt
+
+writes a map file that the game can load (gameplay.map = "big"): level() opens
+a ghost house in the middle, puts the ghosts in it and Pac-Man just below,
+and adds the @-lines for them. A 1001x1001 board takes about two seconds,
+2001x2001 about ten.
+"""
+
+import random
+from typing import List, Optional, Tuple
+
+WALL, PELLET, BONUS, EMPTY = ord('1'), ord('2'), ord('3'), ord('0')
+
+
+def generate(rows: int, cols: int, seed: Optional[int] = None,
+             braid: float = 0.9, rooms: int = 0) -> List[str]:
+    """A rows x cols board as a list of strings.
+
+    `braid` is the share of dead ends opened up into loops, `rooms` the
+    number of open rectangles carved in afterwards.
+    """
+    if rows < 3 or cols < 3:
+        raise ValueError("a maze needs at least 3 rows and 3 columns")
+    rng = random.Random(seed)
+    grid = bytearray([WALL]) * (rows * cols)
+    # Maze nodes sit on odd rows and columns, two cells apart
+    steps = (-2 * cols, 2 * cols, -2, 2)
+
+    def inside(v: int, step: int) -> bool:
+        i, j = divmod(v + step, cols)
+        return 0 < i < rows - 1 and 0 < j < cols - 1 and (step not in (-2, 2) or i == v // cols)
+
+    start = cols + 1
+    grid[start] = PELLET
+    stack = [start]
+    while stack:
+        v = stack[-1]
+        options = [step for step in steps if inside(v, step) and grid[v + step] == WALL]
+        if not options:
+            stack.pop()
+            continue
+        step = rng.choice(options)
+        grid[v + step // 2] = grid[v + step] = PELLET
+        stack.append(v + step)
+
+    # Open dead ends: a node with a single way out gets a second one
+    for i in range(1, rows - 1, 2):
+        for j in range(1, cols - 1, 2):
+            v = i * cols + j
+            if grid[v] == WALL:
+                continue
+            exits = [step for step in steps if grid[v + step // 2] != WALL]
+            if len(exits) != 1 or rng.random() >= braid:
+                continue
+            walls = [step for step in steps
+                     if inside(v, step) and grid[v + step // 2] == WALL and grid[v + step] != WALL]
+            if walls:
+                grid[v + rng.choice(walls) // 2] = PELLET
+
+    for _ in range(rooms):
+        height = rng.randint(3, max(3, min(rows - 2, 9)))
+        width = rng.randint(3, max(3, min(cols - 2, 15)))
+        top = rng.randint(1, max(1, rows - 1 - height))
+        left = rng.randint(1, max(1, cols - 1 - width))
+        for i in range(top, min(top + height, rows - 1)):
+            grid[i * cols + left:i * cols + min(left + width, cols - 1)] = (
+                bytes([EMPTY]) * (min(left + width, cols - 1) - left))
+
+    # Power pellets on the node nearest each corner
+    last_i, last_j = rows - 3 + rows % 2, cols - 3 + cols % 2  # last odd index inside
+    for i, j in ((1, 1), (1, last_j), (last_i, 1), (last_i, last_j)):
+        if grid[i * cols + j] == PELLET:
+            grid[i * cols + j] = BONUS
+
+    return [grid[i * cols:(i + 1) * cols].decode() for i in range(rows)]
+
+
+def house_box(rows: int, cols: int) -> Tuple[int, int, int, int]:
+    """Top, left, bottom, right of a 3x5 ghost house around the middle node."""
+    # Odd indices are maze nodes, so the box always takes in a corridor
+    i = min(rows // 2 | 1, rows - 2)
+    j = min(cols // 2 | 1, cols - 2)
+    return max(1, i - 1), max(1, j - 2), min(rows - 2, i + 1), min(cols - 2, j + 2)
+
+
+def level(board: List[str], name: str) -> str:
+    """Map file text for a generated board, with a ghost house and spawn lines."""
+    rows, cols = len(board), len(board[0])
+    top, left, bottom, right = house_box(rows, cols)
+    board = list(board)
+    for i in range(top, bottom + 1):
+        board[i] = board[i][:left] + '0' * (right - left + 1) + board[i][right + 1:]
+    middle_i, middle_j = (top + bottom) // 2, (left + right) // 2
+    # Pac-Man starts on the nearest open cell below the house, as on the stock board
+    below = min(rows - 2, bottom + 2)
+    outside = [(i, j) for i in range(rows) for j in range(cols)
+               if board[i][j] != '1' and not (top <= i <= bottom and left <= j <= right)]
+    if not outside:
+        raise ValueError("board too small for Pac-Man outside the ghost house")
+    pacman = min(outside, key=lambda c: (abs(c[0] - below) + abs(c[1] - middle_j), c))
+    lines = [f"@name {name}", "@pacman %d %d" % pacman,
+             f"@blinky {top} {middle_j}", f"@pinky {middle_i} {middle_j}",
+             f"@inky {middle_i} {max(left, middle_j - 1)}",
+             f"@clyde {middle_i} {min(right, middle_j + 1)}",
+             f"@house {top} {left} {bottom} {right}"]
+    return "\n".join(lines + board) + "\n"
+
+
+def main():
+    import argparse
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("rows", type=int)
+    parser.add_argument("cols", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--braid", type=float, default=0.9, help="share of dead ends opened up")
+    parser.add_argument("--rooms", type=int, default=0, help="open rectangles to carve")
+    parser.add_argument("--out", help="write the map file here instead of printing it")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    board = generate(args.rows, args.cols, args.seed, args.braid, args.rooms)
+    elapsed = time.perf_counter() - t0
+    name = (os.path.splitext(os.path.basename(args.out))[0] if args.out
+            else f"maze_{args.rows}x{args.cols}_{args.seed}")
+    text = level(board, name)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+        walkable = sum(len(row) - row.count('1') for row in board)
+        print(f"{args.rows}x{args.cols} board, {walkable} walkable cells, "
+              f"generated in {elapsed:.2f}s -> {args.out}")
+    else:
+        print(text, end="")
+
+
+if __name__ == "__main__":
+    main()
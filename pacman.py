@@ -3,19 +3,40 @@ Pacman Game - Python/Pygame Port
 Original Processing code converted to Python with same gameplay
 """
 
+import time
+
+# Startup timing starts before the heavy imports
+STARTUP = {'start': time.perf_counter()}
+
 import pygame
+import heapq
+import itertools
 import math
 import random
 import json
-from typing import List, Optional
+from functools import lru_cache, wraps
+from typing import Dict, List, Optional, Tuple
 import os
 
-# Initialize Pygame
-pygame.init()
+from flowfield import FlowField
+from hpa import HierarchicalGraph
+from incremental import IncrementalPlanner
+from junctions import JunctionGraph
+from mapbundle import STEP_BITS, MapBundle, map_path
+from pellets import PelletStore
+from planner_pool import GridSnapshot, PlannerPool
+from profiler import FrameProfiler
+from routing import RoutingTable
+from spatial import SpatialHash
+from timeslice import SearchBudget, SlicedSearch
+from timestep import FixedTimestep
 
 # ==========================================
-# Load Configuration from JSON
+# Configuration, loaded on first use
 # ==========================================
+# Importing this module does no I/O: the settings below are read from the
+# JSON file the first time one of them is used (through the module
+# __getattr__ from other modules, or configure() inside this one).
 def load_config(config_path="pacman_config.json"):
     """Load configuration from JSON file."""
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -24,287 +45,729 @@ def load_config(config_path="pacman_config.json"):
     with open(config_file, 'r') as f:
         return json.load(f)
 
-CONFIG = load_config()
-
-# Display settings
-SC = CONFIG["display"]["scale"]
-WIDTH = CONFIG["display"]["width"]
-HEIGHT = CONFIG["display"]["height"]
-FPS = CONFIG["display"]["fps"]
-TITLE = CONFIG["display"]["title"]
-ROWS = HEIGHT // SC
-COLS = WIDTH // SC
-
-# Colors (convert lists to tuples)
-BACKGROUND = tuple(CONFIG["colors"]["background"])
-WALL_COLOR = tuple(CONFIG["colors"]["wall"])
-PATH_COLOR = tuple(CONFIG["colors"]["path"])
-YELLOW = tuple(CONFIG["colors"]["pacman"])
-FOOD_COLOR = tuple(CONFIG["colors"]["food"])
-BLINKY_COLOR = tuple(CONFIG["colors"]["blinky"])
-PINKY_COLOR = tuple(CONFIG["colors"]["pinky"])
-INKY_COLOR = tuple(CONFIG["colors"]["inky"])
-CLYDE_COLOR = tuple(CONFIG["colors"]["clyde"])
-WEAK_COLOR = tuple(CONFIG["colors"]["weak"])
-WEAK_ALPHA_COLOR = tuple(CONFIG["colors"]["weak"]) + (100,)
-
-# Gameplay settings
-PACMAN_SPEED = CONFIG["gameplay"]["pacman_speed"]
-GHOST_SPEED = CONFIG["gameplay"]["ghost_speed"]
-GHOST_WEAK_SPEED = CONFIG["gameplay"]["ghost_weak_speed"]
-WEAK_DURATION = CONFIG["gameplay"]["weak_duration"]
-SHOW_GHOST_PATHS = CONFIG["gameplay"]["show_ghost_paths"]
-
-# Scoring
-FOOD_POINTS = CONFIG["scoring"]["food_points"]
-BONUS_POINTS = CONFIG["scoring"]["bonus_points"]
-GHOST_POINTS = CONFIG["scoring"]["ghost_points"]
-
-# Game map
+
+def settings_from(config: dict) -> Dict[str, object]:
+    """Module-level settings derived from a loaded config."""
+    display, colors, gameplay = config["display"], config["colors"], config["gameplay"]
+    pathfinding = config.get("pathfinding", {})  # optional section
+    maze = MapBundle.load_or_compile(map_path(gameplay.get("map", "classic")),
+                                     os.path.dirname(os.path.abspath(__file__)))
+    return {
+        'CONFIG': config,
+        # Game map: compiled from maps/<name>.txt
+        'MAZE': maze,
+        'MAP': maze.grid,
+        # Display settings
+        'SC': display["scale"],
+        # The window fits the map
+        'WIDTH': maze.cols * display["scale"],
+        'HEIGHT': maze.rows * display["scale"],
+        'FPS': display["fps"],
+        'TITLE': display["title"],
+        'USE_BOARD_IMAGE': display.get("board_image", False),
+        'USE_DIRTY_RECTS': display.get("dirty_rects", False),
+        'TICK_RATE': display.get("tick_rate", display["fps"]),
+        'GAME_SPEED': display.get("speed", 1.0),
+        'MAX_FRAME_SKIP': display.get("max_frame_skip", 5),
+        'INTERPOLATE': display.get("interpolate", True),
+        'ROWS': maze.rows,
+        'COLS': maze.cols,
+        # Colors (convert lists to tuples)
+        'BACKGROUND': tuple(colors["background"]),
+        'WALL_COLOR': tuple(colors["wall"]),
+        'PATH_COLOR': tuple(colors["path"]),
+        'YELLOW': tuple(colors["pacman"]),
+        'FOOD_COLOR': tuple(colors["food"]),
+        'BLINKY_COLOR': tuple(colors["blinky"]),
+        'PINKY_COLOR': tuple(colors["pinky"]),
+        'INKY_COLOR': tuple(colors["inky"]),
+        'CLYDE_COLOR': tuple(colors["clyde"]),
+        'WEAK_COLOR': tuple(colors["weak"]),
+        'WEAK_ALPHA_COLOR': tuple(colors["weak"]) + (100,),
+        # Gameplay settings
+        'PACMAN_SPEED': gameplay["pacman_speed"],
+        'GHOST_SPEED': gameplay["ghost_speed"],
+        'GHOST_WEAK_SPEED': gameplay["ghost_weak_speed"],
+        'WEAK_DURATION': gameplay["weak_duration"],
+        'SHOW_GHOST_PATHS': gameplay["show_ghost_paths"],
+        # Pathfinding settings
+        'PATHFINDING': pathfinding,
+        'USE_ROUTING_TABLE': pathfinding.get("routing_table", False),
+        'USE_INCREMENTAL': pathfinding.get("incremental", False),
+        'USE_JUNCTION_GRAPH': pathfinding.get("junction_graph", False),
+        'USE_FLOW_FIELD': pathfinding.get("flow_field", False),
+        'USE_HPA': pathfinding.get("hpa", False),
+        'USE_PLANNER_POOL': pathfinding.get("planner_pool", False),
+        'SEARCH_BUDGET': pathfinding.get("search_budget", 0),
+        # Profiling settings (optional section)
+        'PROFILING': config.get("profiling", {}),
+        # Scoring
+        'FOOD_POINTS': config["scoring"]["food_points"],
+        'BONUS_POINTS': config["scoring"]["bonus_points"],
+        'GHOST_POINTS': config["scoring"]["ghost_points"],
+    }
+
+
+# Bound by configure(); declared here for readers and type checkers
+CONFIG: dict
+MAZE: MapBundle
 # '0' = free, '1' = wall, '2' = food, '3' = bonus, '-' = teleport
-MAP = [
-    ['1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '3', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '3', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '0', '0', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '0', '0', '0', '0', '0', '0', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['-', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '0', '0', '0', '0', '0', '0', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '-'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '0', '0', '0', '0', '0', '0', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '2', '1', '1', '1', '1', '2', '1'],
-    ['1', '3', '2', '2', '1', '1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1', '1', '2', '2', '3', '1'],
-    ['1', '1', '1', '2', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '2', '1', '1', '1'],
-    ['1', '1', '1', '2', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '2', '1', '1', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '1', '1', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1', '1', '2', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '2', '1'],
-    ['1', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '2', '1'],
-    ['1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1', '1']
-]
+MAP: List[str]
+SC: int
+WIDTH: int
+HEIGHT: int
+FPS: int
+TITLE: str
+USE_BOARD_IMAGE: bool
+USE_DIRTY_RECTS: bool
+TICK_RATE: float
+GAME_SPEED: float
+MAX_FRAME_SKIP: int
+INTERPOLATE: bool
+ROWS: int
+COLS: int
+BACKGROUND: tuple
+WALL_COLOR: tuple
+PATH_COLOR: tuple
+YELLOW: tuple
+FOOD_COLOR: tuple
+BLINKY_COLOR: tuple
+PINKY_COLOR: tuple
+INKY_COLOR: tuple
+CLYDE_COLOR: tuple
+WEAK_COLOR: tuple
+WEAK_ALPHA_COLOR: tuple
+PACMAN_SPEED: float
+GHOST_SPEED: float
+GHOST_WEAK_SPEED: float
+WEAK_DURATION: int
+SHOW_GHOST_PATHS: bool
+PATHFINDING: dict
+USE_ROUTING_TABLE: bool
+USE_INCREMENTAL: bool
+USE_JUNCTION_GRAPH: bool
+USE_FLOW_FIELD: bool
+USE_HPA: bool
+USE_PLANNER_POOL: bool
+SEARCH_BUDGET: int
+PROFILING: dict
+FOOD_POINTS: int
+BONUS_POINTS: int
+GHOST_POINTS: int
+
+
+@lru_cache(maxsize=None)
+def configure() -> dict:
+    """Load the config and bind the settings as module globals, once per process.
+
+    Settings a caller already assigned (e.g. `pacman.SHOW_GHOST_PATHS = True`
+    before the first game) are kept.
+    """
+    config = load_config()
+    namespace = globals()
+    for name, value in settings_from(config).items():
+        namespace.setdefault(name, value)
+    startup_mark('config')
+    return config
+
+
+def __getattr__(name: str):
+    # PEP 562: `pacman.SC` or `from pacman import SC` loads the config on demand
+    if name in __annotations__:
+        configure()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def per_map(build):
+    """Cache what `build` makes from the current MAZE, once per map digest.
+
+    The getters below read the settings as plain globals, which only exist
+    once configure() has run; and a caller may assign another MAZE between
+    games, so one cached value per process would go stale.
+    """
+    cache = {}
+
+    @wraps(build)
+    def getter():
+        configure()
+        if MAZE.digest not in cache:
+            cache[MAZE.digest] = build()
+        return cache[MAZE.digest]
+
+    getter.cache_clear = cache.clear
+    return getter
+
+
+@per_map
+def get_routing_table() -> RoutingTable:
+    """Load the all-pairs routing table for MAZE, building it on first use."""
+    return RoutingTable.load_or_build(MAZE, os.path.dirname(os.path.abspath(__file__)))
+
+
+@lru_cache(maxsize=None)
+def get_profiler() -> FrameProfiler:
+    """The frame profiler for this process, kept across restarts."""
+    configure()
+    return FrameProfiler(PROFILING.get("output") or None, show_hud=PROFILING.get("hud", False))
+
+
+@per_map
+def get_junction_graph() -> JunctionGraph:
+    """MAZE compiled to junctions and corridor edges, built on first use."""
+    return JunctionGraph(MAZE)
+
+
+@per_map
+def get_hpa_graph() -> HierarchicalGraph:
+    """MAP cut into 8x8 clusters for hierarchical search, built on first use."""
+    return HierarchicalGraph(MAP, cluster_size=8)
+
+
+@per_map
+def get_planner_pool() -> PlannerPool:
+    """Background workers for ghost A*, searching a snapshot of MAZE; kept across restarts."""
+    grid = GridSnapshot(MAZE.rows, MAZE.cols, bytes(MAZE.mask))
+    return PlannerPool(grid, PATHFINDING.get("planner_workers", 2),
+                       PATHFINDING.get("planner_processes", False))
+
+
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Pacman", "Image")
+
+
+@lru_cache(maxsize=None)
+def load_image(filename: str, size: Optional[int] = None) -> Optional[pygame.Surface]:
+    """An image from IMAGE_DIR, scaled to size x size; None if it is missing."""
+    path = os.path.join(IMAGE_DIR, filename)
+    if not os.path.exists(path):
+        return None
+    image = pygame.image.load(path)
+    if size is not None:
+        image = pygame.transform.scale(image, (size, size))
+    return image
+
+
+@lru_cache(maxsize=None)
+def load_board_image() -> Optional[pygame.Surface]:
+    """The board background, from the first of the known places it is found in."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    possible_paths = [
+        os.path.join(IMAGE_DIR, "PacmanBoard.png"),
+        os.path.join(here, "Image", "PacmanBoard.png"),
+        os.path.join(here, "Sketch", "Image", "PacmanBoard.png"),
+    ]
+    for img_path in possible_paths:
+        if os.path.exists(img_path):
+            return pygame.image.load(img_path)
+    return None
+
+
+def startup_mark(phase: str):
+    """Note that a startup phase ended; only the first time counts."""
+    if phase not in STARTUP:
+        STARTUP[phase] = time.perf_counter()
+
+
+def startup_report() -> str:
+    """Time spent in each phase from the start of the import to the first frame."""
+    phases = list(STARTUP)
+    parts = [f"{b} {(STARTUP[b] - STARTUP[a]) * 1000:.1f} ms" for a, b in zip(phases, phases[1:])]
+    total = (STARTUP[phases[-1]] - STARTUP[phases[0]]) * 1000
+    return f"startup: {', '.join(parts)} (total {total:.1f} ms)"
 
 
 class Cell:
+    # Search scratch state (f, g, parent) lives in flat arrays on Game,
+    # indexed by id, so a cell only holds what never changes
+    __slots__ = ('i', 'j', 'id', 'is_wall')
+    
     def __init__(self, i: int, j: int):
         self.i = i
         self.j = j
-        self.f = float('inf')
-        self.g = 0
-        self.h = 0
-        self.parent: Optional['Cell'] = None
+        self.id = i * COLS + j
         self.is_wall = False
 
-    def reset_cell(self):
-        self.f = float('inf')
-        self.g = 0
-        self.h = 0
-        self.parent = None
 
+class InputSource:
+    """Where Pac-Man's direction changes come from, polled once per tick."""
+
+    def next_direction(self, game: 'Game') -> Optional[Tuple[int, int]]:
+        """Return a new (dir_x, dir_y) for Pac-Man, or None to keep going."""
+        return None
+
+    def next_input_tick(self, game: 'Game') -> Optional[int]:
+        """First tick from game.tick on whose poll may return a direction; None if never.
+
+        Lets the event engine (event_engine.py) skip polls. A subclass that
+        overrides next_direction but not this one is polled every tick.
+        """
+        if type(self).next_direction is InputSource.next_direction:
+            return None
+        return game.tick
+
+
+class KeyboardInput(InputSource):
+    """Arrow keys from the pygame event queue; also handles quit and restart."""
+
+    def next_direction(self, game: 'Game') -> Optional[Tuple[int, int]]:
+        direction = None
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_UP:
+                    direction = (0, -1)
+                elif event.key == pygame.K_RIGHT:
+                    direction = (1, 0)
+                elif event.key == pygame.K_DOWN:
+                    direction = (0, 1)
+                elif event.key == pygame.K_LEFT:
+                    direction = (-1, 0)
+                elif event.key == pygame.K_F3 and game.profiler is not None:
+                    game.profiler.show_hud = not game.profiler.show_hud
+                elif event.key == pygame.K_RIGHTBRACKET and game.timestep is not None:
+                    game.show_speed(game.timestep.faster())
+                elif event.key == pygame.K_LEFTBRACKET and game.timestep is not None:
+                    game.show_speed(game.timestep.slower())
+                elif event.key == pygame.K_RETURN and game.game_over:
+                    # Restart game
+                    game.restart()
+                    direction = None
+        return direction
+
+
+class MazeRenderer:
+    """Pre-rendered maze layers.
+
+    The static layer (walls, paths and grid, or the board image) is drawn
+    once and shared between games. The pellet layer starts as a copy of it
+    with every pellet on top and is patched one tile at a time as pellets
+    are eaten, so a frame only has to blit it.
+    """
+    
+    static_layers = {}
+    
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.static = self.static_layer(game)
+        self.pellets = self.static.copy()
+        game.draw_coins(self.pellets)
+        self.erased: List[pygame.Rect] = []
+
+    @classmethod
+    def static_layer(cls, game: 'Game') -> pygame.Surface:
+        key = 'image' if USE_BOARD_IMAGE and game.background else 'walls'
+        layer = cls.static_layers.get(key)
+        if layer is None:
+            layer = pygame.Surface((WIDTH, HEIGHT))
+            layer.fill(BACKGROUND)
+            if key == 'image':
+                layer.blit(pygame.transform.scale(game.background, (WIDTH, HEIGHT)), (0, 0))
+            else:
+                game.draw_walls(layer)
+            if pygame.display.get_surface() is not None:
+                layer = layer.convert()
+            cls.static_layers[key] = layer
+        return layer
+
+    def erase_pellet(self, cell: Cell):
+        tile = pygame.Rect(cell.j * SC, cell.i * SC, SC, SC)
+        self.pellets.blit(self.static, tile, tile)
+        self.erased.append(tile)
+
+    def draw(self, surface: pygame.Surface):
+        surface.blit(self.pellets, (0, 0))
+        self.erased.clear()
+
+    def restore(self, surface: pygame.Surface, rects: List[pygame.Rect]) -> List[pygame.Rect]:
+        """Repaint the maze under `rects` and any erased pellets; return what changed."""
+        changed = rects + self.erased
+        for rect in changed:
+            surface.blit(self.pellets, rect, rect)
+        self.erased = []
+        return changed
+
+
+class SpriteCache:
+    """Transformed sprites and overlay text, built once and then only blitted.
+
+    Keeps hit and miss counts so profiling can tell whether a frame had to
+    build anything.
+    """
 
-class Game:
     def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(TITLE)
-        self.clock = pygame.time.Clock()
+        self.surfaces = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = self.surfaces[key] = build()
+        else:
+            self.hits += 1
+        return surface
+
+    def preload(self, game: 'Game'):
+        """Build every Pac-Man orientation and the weak/recovering ghosts up front."""
+        if game.pacman_image:
+            for direction in ((1, 0), (-1, 0), (0, -1), (0, 1), (0, 0)):
+                self.pacman(game.pacman_image, *direction)
+        self.disc(WEAK_COLOR, (SC + 4) // 2)
+        self.disc(WEAK_ALPHA_COLOR, (SC + 4) // 2)
+
+    def pacman(self, image: pygame.Surface, dir_x: int, dir_y: int) -> pygame.Surface:
+        if dir_x == 1:  # Right
+            key, build = 'right', lambda: image
+        elif dir_x == -1:  # Left
+            key, build = 'left', lambda: pygame.transform.flip(image, True, False)
+        elif dir_y == -1:  # Up
+            key, build = 'up', lambda: pygame.transform.rotate(image, 90)
+        elif dir_y == 1:  # Down
+            key, build = 'down', lambda: pygame.transform.rotate(image, -90)
+        else:
+            key, build = 'right', lambda: image
+        return self.get(('pacman', key), build)
+
+    def disc(self, color: tuple, radius: int) -> pygame.Surface:
+        """A filled circle centred at (radius, radius); RGBA colors are translucent."""
+        def build():
+            surface = pygame.Surface((radius * 2 + 1, radius * 2 + 1), pygame.SRCALPHA)
+            pygame.draw.circle(surface, color, (radius, radius), radius)
+            return surface
+        return self.get(('disc', color, radius), build)
+
+    def text(self, message: str, size: int, color: tuple) -> pygame.Surface:
+        return self.get(('text', message, size, color),
+                        lambda: pygame.font.Font(None, size).render(message, True, color))
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'surfaces': len(self.surfaces)}
+
+
+class Game:
+    def __init__(self, headless: bool = False, input_source: Optional[InputSource] = None):
+        configure()
+        self.headless = headless
+        self.input_source = input_source or (InputSource() if headless else KeyboardInput())
         
-        # Load background image
+        # Game logic only until a screen is attached: no images, no frame clock
+        self.screen = None
+        self.clock = None
+        self.renderer: Optional[MazeRenderer] = None
+        self.sprites: Optional[SpriteCache] = None
         self.background = None
-        # Try multiple paths for the image
-        data_dir = os.path.join(os.path.dirname(__file__), "Pacman", "Image")
-        possible_paths = [
-            os.path.join(data_dir, "PacmanBoard.png"),
-            os.path.join(os.path.dirname(__file__), "Image", "PacmanBoard.png"),
-            os.path.join(os.path.dirname(os.path.abspath(__file__)), "Sketch", "Image", "PacmanBoard.png"),
-        ]
-        for img_path in possible_paths:
-            if os.path.exists(img_path):
-                self.background = pygame.image.load(img_path)
-                break
-        
-        # Load ghost images
         self.ghost_images = {}
-        ghost_size = SC + 4
-        ghost_files = {
-            'blinky': 'Blinky.png',
-            'pinky': 'Pinky.png',
-            'inky': 'Inky.png',
-            'clyde': 'Clyde.png'
-        }
-        for name, filename in ghost_files.items():
-            img_path = os.path.join(data_dir, filename)
-            if os.path.exists(img_path):
-                img = pygame.image.load(img_path)
-                img = pygame.transform.scale(img, (ghost_size, ghost_size))
-                self.ghost_images[name] = img
-            else:
-                self.ghost_images[name] = None
-        
-        # Load Pacman image
-        pacman_size = 24  # Slightly larger than SC
-        pacman_path = os.path.join(data_dir, 'pacman.png')
-        if os.path.exists(pacman_path):
-            self.pacman_image = pygame.image.load(pacman_path)
-            self.pacman_image = pygame.transform.scale(self.pacman_image, (pacman_size, pacman_size))
-        else:
-            self.pacman_image = None
+        self.pacman_image = None
         
         # Initialize grid
+        self.maze = MAZE
         self.array: List[List[Cell]] = []
-        self.food: List[Cell] = []
-        self.bonus_food: List[Cell] = []
+        self.food = PelletStore.from_map(MAP, '2')
+        self.bonus_food = PelletStore.from_map(MAP, '3')
         self.path: List[Cell] = []
+        self.expanded_nodes = 0
+        
+        # A* scratch state by cell id. An entry only counts when its stamp
+        # equals the current generation, so starting a search is O(1).
+        self.generation = 0
+        self.stamp = [0] * (ROWS * COLS)
+        self.closed_stamp = [0] * (ROWS * COLS)
+        self.g_score = [0] * (ROWS * COLS)
+        self.f_score = [0.0] * (ROWS * COLS)
+        self.parent: List[Optional[Cell]] = [None] * (ROWS * COLS)
         
         for i in range(ROWS):
             row = []
             for j in range(COLS):
                 cell = Cell(i, j)
-                if MAP[i][j] == '1':
-                    cell.is_wall = True
-                elif MAP[i][j] == '2':
-                    self.food.append(cell)
-                elif MAP[i][j] == '3':
-                    self.bonus_food.append(cell)
+                cell.is_wall = MAZE.is_wall(i, j)
                 row.append(cell)
             self.array.append(row)
+        # Cells by id, and (mask bit, id offset) per neighbour in successor order
+        self.cells = [cell for row in self.array for cell in row]
+        self.steps = ((1, -COLS), (2, -1), (4, COLS), (8, 1))
+        
+        # Precomputed next-hop table, used instead of A* when enabled
+        self.routing = get_routing_table() if USE_ROUTING_TABLE else None
+        # Junction graph searched instead of the cell grid when enabled
+        self.junctions = get_junction_graph() if USE_JUNCTION_GRAPH else None
+        # Cluster-level graph (HPA*), the same search used on large boards
+        self.hpa = get_hpa_graph() if USE_HPA else None
+        # Ghost A* on background workers instead of inside update(), when enabled
+        self.planners = get_planner_pool() if USE_PLANNER_POOL else None
+        # A* expansions per tick shared between the ghosts, when set
+        self.search_budget = SearchBudget(SEARCH_BUDGET) if SEARCH_BUDGET else None
+        # One BFS from Pac-Man shared by every ghost chasing him, when enabled
+        self.flow = FlowField(MAZE) if USE_FLOW_FIELD else None
+        # Per-frame timings and search counts, only when profiling is enabled
+        self.profiler = get_profiler() if PROFILING.get("enabled", False) else None
         
         # Initialize Pacman
         self.pacman = PacMan(self)
         
         # Initialize Ghosts
-        self.blinky = Blinky(self, 13, 13, BLINKY_COLOR)
-        self.pinky = Pinky(self, 14, 13, PINKY_COLOR)
-        self.inky = Inky(self, 14, 12, INKY_COLOR)
-        self.clyde = Clyde(self, 14, 14, CLYDE_COLOR)
+        spawns = MAZE.spawns
+        self.blinky = Blinky(self, *spawns['blinky'], BLINKY_COLOR)
+        self.pinky = Pinky(self, *spawns['pinky'], PINKY_COLOR)
+        self.inky = Inky(self, *spawns['inky'], INKY_COLOR)
+        self.clyde = Clyde(self, *spawns['clyde'], CLYDE_COLOR)
         
         self.ghosts = [self.blinky, self.pinky, self.inky, self.clyde]
+        # Ghosts bucketed by tile for the collision test; see track_ghosts()
+        self.spatial: Optional[SpatialHash] = None
+        # Tiles around Pac-Man within which ghosts replan every tile
+        self.wake_radius: Optional[int] = None
+        self.coasted = 0  # ghost updates that skipped planning, for stats
         
         self.running = True
         self.game_over = False
         self.won = False
+        self.caught_by: Optional[str] = None
+        self.tick = 0
+        
+        # Dirty-rectangle bookkeeping: what the sprites covered last frame
+        # and what needs pushing to the display this frame (None = everything)
+        self.sprite_rects: List[pygame.Rect] = []
+        self.dirty: Optional[List[pygame.Rect]] = None
+        
+        # Fixed-timestep loop state, set by run(); sprites are drawn `alpha`
+        # of the way from their previous tick position to the current one
+        self.timestep: Optional[FixedTimestep] = None
+        self.alpha = 1.0
+        
+        if not headless:
+            pygame.init()
+            screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption(TITLE)
+            startup_mark('display')
+            self.clock = pygame.time.Clock()
+            self.attach_screen(screen)
+
+    def attach_screen(self, screen: pygame.Surface):
+        """Render into `screen`; also used to draw into off-screen surfaces."""
+        self.screen = screen
+        self.load_images()
+        self.renderer = MazeRenderer(self)
+        self.sprites = SpriteCache()
+        self.sprites.preload(self)
+
+    def load_images(self):
+        # Decoded and scaled once per process, so restarts reuse them
+        self.background = load_board_image() if USE_BOARD_IMAGE else None
+        ghost_size = SC + 4
+        self.ghost_images = {name: load_image(f"{name.capitalize()}.png", ghost_size)
+                             for name in ('blinky', 'pinky', 'inky', 'clyde')}
+        self.pacman_image = load_image('pacman.png', 24)  # Slightly larger than SC
+        startup_mark('assets')
+
+    def track_ghosts(self, wake_radius: Optional[int] = None):
+        """Find colliding ghosts through a spatial hash instead of testing them all.
+
+        Worth it with many ghosts (see arena.py); call again after replacing
+        self.ghosts. With `wake_radius`, only the ghosts the hash finds within
+        that many tiles of Pac-Man replan each tile; the rest walk on along
+        their current route until it runs out (see Ghost.coast), so planning
+        costs grow with the crowd around Pac-Man rather than with the board.
+        """
+        self.wake_radius = wake_radius
+        self.spatial = SpatialHash(SC, COLS)
+        for ghost in self.ghosts:
+            self.spatial.insert(ghost)
+
+    def restart(self):
+        timestep = self.timestep
+        self.__init__(self.headless, self.input_source)
+        # Same loop and speed after a restart
+        self.timestep = timestep
 
     def heuristic(self, a: Cell, b: Cell) -> float:
         return math.sqrt((a.j - b.j) ** 2 + (a.i - b.i) ** 2)
 
+    def flow_to_pacman(self) -> FlowField:
+        """The shared flow field, re-pointed if Pac-Man entered a new tile."""
+        cell = self.pacman.current_cell
+        self.flow.update(cell.i, cell.j)
+        return self.flow
+
     def get_successors(self, cell: Cell) -> List[Cell]:
-        successors = []
-        directions = [(-1, 0), (0, -1), (1, 0), (0, 1)]  # up, left, down, right
-        
-        for di, dj in directions:
-            ni, nj = cell.i + di, cell.j + dj
-            if 0 <= ni < ROWS and 0 <= nj < COLS:
-                neighbor = self.array[ni][nj]
-                if not neighbor.is_wall:
-                    successors.append(neighbor)
-        return successors
+        """Walkable neighbours, up, left, down, right, read off the cell's mask."""
+        mask = self.maze.mask[cell.id]
+        cells, v = self.cells, cell.id
+        return [cells[v + offset] for bit, offset in self.steps if mask & bit]
 
     def reset_parents(self):
-        for i in range(ROWS):
-            for j in range(COLS):
-                self.array[i][j].reset_cell()
+        """Start a new search generation; every older entry now reads as unset."""
+        self.generation += 1
 
     def a_star(self, start: Cell, end: Cell):
-        open_list: List[Cell] = []
-        closed_list: List[Cell] = []
+        """A* over the grid using a binary heap with lazy deletion.
+
+        Leaves the result in self.path in the same shape as before: the cell
+        next to `end` first, walking back through parents to `start`.
+        """
         self.path = []
+        self.expanded_nodes = 0
         
         self.reset_parents()
+
+        # Already there: no path, same as an exhausted search
+        if start is end:
+            return
+
+        # Heap entries are (f, h, order, cell); ties on f prefer the cell
+        # closer to the goal, then insertion order.
+        generation = self.generation
+        stamp, closed, g_score, f_score, parent = (
+            self.stamp, self.closed_stamp, self.g_score, self.f_score, self.parent)
+        counter = itertools.count()
+        open_heap = [(0.0, 0.0, next(counter), start)]
+        stamp[start.id] = generation
+        g_score[start.id] = 0
+        f_score[start.id] = 0.0
+        parent[start.id] = None
         
-        open_list.append(start)
-        start.f = 0
-        
-        while open_list:
-            # Find cell with lowest f
-            q = min(open_list, key=lambda c: c.f)
-            open_list.remove(q)
-            
-            successors = self.get_successors(q)
-            
-            for s in successors:
-                if s not in closed_list:
-                    if s == end:
-                        s.parent = q
-                        self.get_path(q)
-                        return
-                    
-                    new_g = q.g + 1
-                    new_h = self.heuristic(s, end)
-                    new_f = new_g + new_h
-                    
-                    if s.f == float('inf') or s.f > new_f:
-                        open_list.append(s)
-                        s.f = new_f
-                        s.g = new_g
-                        s.h = new_h
-                        s.parent = q
-            
-            closed_list.append(q)
+        while open_heap:
+            f, _, _, q = heapq.heappop(open_heap)
+            
+            # Skip stale entries left behind when a cell was re-pushed
+            if closed[q.id] == generation or f > f_score[q.id]:
+                continue
+            closed[q.id] = generation
+            self.expanded_nodes += 1
+            
+            new_g = g_score[q.id] + 1
+            for s in self.get_successors(q):
+                if s is end:
+                    parent[s.id] = q
+                    self.get_path(q)
+                    return
+                
+                sid = s.id
+                if stamp[sid] == generation and new_g >= g_score[sid]:
+                    continue
+                
+                # Better route found: (re)open the cell, even if it was closed
+                closed[sid] = 0
+                stamp[sid] = generation
+                g_score[sid] = new_g
+                h = self.heuristic(s, end)
+                f_score[sid] = new_g + h
+                parent[sid] = q
+                heapq.heappush(open_heap, (new_g + h, h, next(counter), s))
 
     def get_path(self, q: Cell):
+        parent = self.parent
         temp = q
         self.path.append(temp)
-        while temp.parent is not None:
-            self.path.append(temp.parent)
-            temp = temp.parent
+        while parent[temp.id] is not None:
+            temp = parent[temp.id]
+            self.path.append(temp)
 
-    def draw_coins(self):
+    def draw_coins(self, surface: Optional[pygame.Surface] = None):
+        surface = self.screen if surface is None else surface
         offset_x = SC // 2
         offset_y = SC // 2
         
-        for cell in self.food:
-            pygame.draw.circle(self.screen, FOOD_COLOR, 
-                             (cell.j * SC + offset_x, cell.i * SC + offset_y), 3)
+        for i, j in self.food:
+            pygame.draw.circle(surface, FOOD_COLOR, 
+                             (j * SC + offset_x, i * SC + offset_y), 3)
         
-        for cell in self.bonus_food:
-            pygame.draw.circle(self.screen, FOOD_COLOR, 
-                             (cell.j * SC + offset_x, cell.i * SC + offset_y), 8)
+        for i, j in self.bonus_food:
+            pygame.draw.circle(surface, FOOD_COLOR, 
+                             (j * SC + offset_x, i * SC + offset_y), 8)
+
+    def pellet_eaten(self, cell: Cell):
+        """Called after a pellet is cleared from food or bonus_food."""
+        if self.renderer is not None:
+            self.renderer.erase_pellet(cell)
+
+    def step(self):
+        """Advance one tick; to the profiler, each call is a frame of its own."""
+        if self.profiler is not None:
+            self.profiler.frame()
+        self.run_tick()
+
+    def run_tick(self):
+        """Poll the input source, then update the game."""
+        direction = self.input_source.next_direction(self)
+        if direction is not None:
+            self.pacman.change_dir(*direction)
+        if self.profiler is not None:
+            self.profiler.mark('input')
         
-        if len(self.food) == 0 and len(self.bonus_food) == 0:
-            self.won = True
-            self.game_over = True
+        if not self.game_over:
+            self.update()
 
     def run(self):
+        """Logic at TICK_RATE (times the speed), drawing at up to FPS."""
+        self.timestep = FixedTimestep(TICK_RATE, FPS, GAME_SPEED, MAX_FRAME_SKIP)
+        if GAME_SPEED != 1.0:
+            self.show_speed(GAME_SPEED)
         while self.running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_UP:
-                        self.pacman.change_dir(0, -1)
-                    elif event.key == pygame.K_RIGHT:
-                        self.pacman.change_dir(1, 0)
-                    elif event.key == pygame.K_DOWN:
-                        self.pacman.change_dir(0, 1)
-                    elif event.key == pygame.K_LEFT:
-                        self.pacman.change_dir(-1, 0)
-                    elif event.key == pygame.K_RETURN and self.game_over:
-                        # Restart game
-                        self.__init__()
-            
-            if not self.game_over:
-                self.update()
+            # A profiler frame is one pass of this loop: every tick it ran, then the draw
+            if self.profiler is not None:
+                self.profiler.frame()
+            timestep = self.timestep
+            for _ in range(timestep.begin_frame()):
+                self.remember_positions()
+                self.run_tick()
+                if not self.running:
+                    break
+            if not timestep.should_draw():
+                continue
             
+            self.alpha = timestep.alpha if INTERPOLATE else 1.0
             self.draw()
-            pygame.display.flip()
+            if self.profiler is not None:
+                self.profiler.mark('draw')
+            self.present()
+            if self.profiler is not None:
+                self.profiler.mark('present')
             self.clock.tick(FPS)
         
+        print(self.timestep.report())
+        if self.profiler is not None:
+            self.profiler.close()
         pygame.quit()
 
+    def remember_positions(self):
+        """Keep where the sprites are before a tick, to interpolate from."""
+        for sprite in [self.pacman] + self.ghosts:
+            sprite.prev_x, sprite.prev_y = sprite.x, sprite.y
+
+    def draw_position(self, sprite) -> Tuple[int, int]:
+        """Pixel position to draw a moving sprite at for the current alpha."""
+        x, y = sprite.x, sprite.y
+        if self.alpha < 1.0:
+            dx, dy = x - sprite.prev_x, y - sprite.prev_y
+            # More than a tile in one tick is a teleport: don't sweep across the board
+            if abs(dx) <= SC and abs(dy) <= SC:
+                x -= dx * (1.0 - self.alpha)
+                y -= dy * (1.0 - self.alpha)
+        return int(x), int(y)
+
+    def show_speed(self, speed: float):
+        pygame.display.set_caption(TITLE if speed == 1.0 else f"{TITLE} (x{speed:g})")
+
     def update(self):
+        self.tick += 1
+        
+        profiler = self.profiler
+        if self.planners is not None:
+            self.adopt_plans()
+        
         # Update Pacman
         self.pacman.update()
+        if profiler is not None:
+            profiler.mark('pacman')
+        
+        # All pellets eaten
+        if len(self.food) == 0 and len(self.bonus_food) == 0:
+            self.won = True
+            self.game_over = True
+            return
         
         # Handle ghost power-up state
         if self.pacman.is_invincible:
@@ -317,84 +780,155 @@ class Game:
                     ghost.make_normal()
         
         # Check collisions with ghosts
-        for ghost in self.ghosts:
+        nearby = (self.ghosts if self.spatial is None
+                  else self.spatial.near(self.pacman.x, self.pacman.y, SC + 10))
+        for ghost in nearby:
             if (abs(self.pacman.x - ghost.x) < SC + 10 and 
                 abs(self.pacman.y - ghost.y) < SC + 10):
                 if self.pacman.is_invincible and ghost.is_affected_by:
                     ghost.retreat()
                 else:
-                    print(f"Caught by {ghost.__class__.__name__}")
+                    self.caught_by = ghost.__class__.__name__
+                    if not self.headless:
+                        print(f"Caught by {self.caught_by}")
                     self.game_over = True
                     return
+        if profiler is not None:
+            profiler.mark('update')
         
         # Update ghosts
+        budget = self.search_budget
+        if budget is not None:
+            budget.begin(len(self.ghosts))
+        awake = None
+        if self.wake_radius is not None and self.spatial is not None:
+            awake = {id(ghost) for ghost in
+                     self.spatial.near(self.pacman.x, self.pacman.y, self.wake_radius * SC)}
         for ghost in self.ghosts:
-            ghost.search()
+            if budget is not None:
+                budget.turn()
+                # Between tile centres an unfinished search still gets its share
+                if ghost.pending_search is not None and (ghost.x % SC or ghost.y % SC):
+                    ghost.continue_search()
+            if awake is not None and id(ghost) not in awake and ghost.coast():
+                self.coasted += 1
+            else:
+                ghost.search()
+            if profiler is not None:
+                profiler.mark(ghost.ghost_name)
+        if self.spatial is not None:
+            self.spatial.update(self.ghosts)
+
+    def adopt_plans(self):
+        """Hand finished background plans to their ghosts."""
+        for plan in self.planners.collect(self.tick):
+            ghost = plan.ghost
+            route = [self.cells[v] for v in plan.path]
+            # Planned from where the ghost was; it may have walked on since
+            try:
+                cursor = route.index(ghost.current_cell)
+            except ValueError:
+                cursor = -1
+            if cursor < 0 and route:
+                # Left the route already: keep the old one, and ask again at
+                # the next tile even if the target has not moved
+                self.planners.discarded += 1
+                ghost.plan_target = None
+                continue
+            ghost.route_seq = plan.seq
+            ghost.route = route
+            ghost.route_length = len(route)
+            ghost.cursor = cursor
+            if self.profiler is not None:
+                self.profiler.searched(ghost.ghost_name, plan.expanded)
 
     def draw(self):
-        self.screen.fill(BACKGROUND)
-        
-        # Draw background
-        # Use custom wall drawing instead of image
-        self.draw_walls()
-        
-        # Draw food
-        self.draw_coins()
+        # Maze and remaining food, pre-rendered. In dirty-rect mode only the
+        # areas the sprites covered last frame and eaten pellets are repainted;
+        # the first frame after a (re)start and the game-over overlay are full.
+        full = not USE_DIRTY_RECTS or self.dirty is None or self.game_over
+        if full:
+            self.renderer.draw(self.screen)
+            changed = None
+        else:
+            changed = self.renderer.restore(self.screen, self.sprite_rects)
         
         # Draw Pacman
-        self.pacman.draw()
+        sprites = [self.pacman.draw()]
         
         # Draw ghosts
+        if SHOW_GHOST_PATHS:
+            for ghost in self.ghosts:
+                sprites.extend(ghost.draw_path())
         for ghost in self.ghosts:
-            ghost.draw()
+            sprites.append(ghost.draw())
+        
+        # Profiler overlay, restored with the sprites next frame
+        if self.profiler is not None and self.profiler.show_hud:
+            sprites.append(self.profiler.draw_hud(self.screen))
+        
+        self.sprite_rects = sprites
+        self.dirty = None if full else changed + self.sprite_rects
         
         # Game over message
         if self.game_over:
-            font = pygame.font.Font(None, 74)
             if self.won:
-                text = font.render("You Win!", True, (100, 255, 150))
+                text = self.sprites.text("You Win!", 74, (100, 255, 150))
             else:
-                text = font.render("End Game", True, (255, 100, 100))
+                text = self.sprites.text("End Game", 74, (255, 100, 100))
             text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2))
             self.screen.blit(text, text_rect)
             
-            font_small = pygame.font.Font(None, 36)
-            restart_text = font_small.render("Enter to Restart", True, (255, 220, 50))
+            restart_text = self.sprites.text("Enter to Restart", 36, (255, 220, 50))
             restart_rect = restart_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 50))
             self.screen.blit(restart_text, restart_rect)
 
-    def draw_walls(self):
+    def present(self):
+        """Push the frame to the display: only the dirty rects when possible."""
+        if self.dirty is None:
+            pygame.display.flip()
+            # Start tracking from this full frame on
+            self.dirty = []
+            if 'first_frame' not in STARTUP:
+                startup_mark('first_frame')
+                if PROFILING.get("startup_report", False):
+                    print(startup_report())
+        else:
+            pygame.display.update(self.dirty)
+
+    def draw_walls(self, surface: Optional[pygame.Surface] = None):
         """Fallback wall drawing if image not found"""
+        surface = self.screen if surface is None else surface
         for i in range(ROWS):
             for j in range(COLS):
-                if MAP[i][j] == '1':
+                if MAZE.is_wall(i, j):
                     # Draw dark wall block
-                    pygame.draw.rect(self.screen, WALL_COLOR,
+                    pygame.draw.rect(surface, WALL_COLOR,
                                    (j * SC, i * SC, SC, SC))
                 else:
                     # Draw light path
-                    pygame.draw.rect(self.screen, PATH_COLOR,
+                    pygame.draw.rect(surface, PATH_COLOR,
                                    (j * SC, i * SC, SC, SC))
                     # Draw subtle grid lines
-                    pygame.draw.rect(self.screen, (140, 150, 165),
+                    pygame.draw.rect(surface, (140, 150, 165),
                                    (j * SC, i * SC, SC, SC), 1)
 
 
 class PacMan:
     def __init__(self, game: Game):
         self.game = game
-        self.x = 12 * SC
-        self.y = 23 * SC
+        self.i, self.j = game.maze.spawns['pacman']
+        self.x = self.j * SC
+        self.y = self.i * SC
+        self.prev_x, self.prev_y = self.x, self.y
         self.dir_x = -1
         self.dir_y = 0
         self.new_dir_x = -1
         self.new_dir_y = 0
         self.speed = PACMAN_SPEED
-        self.i = 23
-        self.j = 12
         self.is_invincible = False
         self.countdown = 600
-        self.current_cell = game.array[23][12]
+        self.current_cell = game.array[self.i][self.j]
 
     def update(self):
         # Snap to grid when close enough (fixes floating point precision issues)
@@ -408,9 +942,8 @@ class PacMan:
             self.j = int(self.x) // SC
             
             # Eat food
-            current = self.game.array[self.i][self.j]
-            if current in self.game.food:
-                self.game.food.remove(current)
+            if self.game.food.clear(self.i, self.j):
+                self.game.pellet_eaten(self.game.array[self.i][self.j])
             
             # Check bonus food
             if self.check_bonus():
@@ -418,19 +951,22 @@ class PacMan:
                 self.countdown = 600
             
             # Teleport
-            if MAP[self.i][self.j] == '-' and self.j == 0:
-                self.x = 27 * SC
-                self.j = 27
-            elif MAP[self.i][self.j] == '-' and self.j == 27:
-                self.x = 0
-                self.j = 0
+            maze = self.game.maze
+            partner = maze.teleports.get(self.i * COLS + self.j)
+            if partner is not None:
+                self.i, self.j = divmod(partner, COLS)
+                self.x = self.j * SC
+                self.y = self.i * SC
+            # Which neighbours are open, one bit per direction
+            mask = maze.mask[self.i * COLS + self.j]
             
             # Check next position
             next_x = self.j + self.dir_x
             next_y = self.i + self.dir_y
             
             if 0 <= next_y < ROWS and 0 <= next_x < COLS:
-                if MAP[next_y][next_x] == '1':
+                bit = STEP_BITS[self.dir_x, self.dir_y]
+                if mask & bit != bit:
                     self.dir_x = 0
                     self.dir_y = 0
             
@@ -439,7 +975,8 @@ class PacMan:
             new_y = self.i + self.new_dir_y
             
             if 0 <= new_y < ROWS and 0 <= new_x < COLS:
-                if MAP[new_y][new_x] != '1':
+                bit = STEP_BITS[self.new_dir_x, self.new_dir_y]
+                if mask & bit == bit:
                     self.dir_x = self.new_dir_x
                     self.dir_y = self.new_dir_y
             
@@ -456,67 +993,73 @@ class PacMan:
         self.x += self.dir_x * self.speed
         self.y += self.dir_y * self.speed
 
-    def draw(self):
+    def draw(self) -> pygame.Rect:
         offset_x = SC // 2
         offset_y = SC // 2
         pacman_size = 24
         
+        x, y = self.game.draw_position(self)
+        
         if self.game.pacman_image:
-            # Rotate image based on direction
-            img = self.game.pacman_image
-            if self.dir_x == 1:  # Right
-                img = self.game.pacman_image
-            elif self.dir_x == -1:  # Left
-                img = pygame.transform.flip(self.game.pacman_image, True, False)
-            elif self.dir_y == -1:  # Up
-                img = pygame.transform.rotate(self.game.pacman_image, 90)
-            elif self.dir_y == 1:  # Down
-                img = pygame.transform.rotate(self.game.pacman_image, -90)
-            
-            self.game.screen.blit(img, 
-                                 (int(self.x) + offset_x - pacman_size // 2,
-                                  int(self.y) + offset_y - pacman_size // 2))
+            # Pre-rotated image for the current direction
+            img = self.game.sprites.pacman(self.game.pacman_image, self.dir_x, self.dir_y)
+            return self.game.screen.blit(img, 
+                                        (x + offset_x - pacman_size // 2,
+                                         y + offset_y - pacman_size // 2))
         else:
             # Fallback to yellow circle
-            pygame.draw.circle(self.game.screen, YELLOW, 
-                              (int(self.x) + offset_x, int(self.y) + offset_y), 12)
+            return self.game.screen.blit(self.game.sprites.disc(YELLOW, 12),
+                                         (x + offset_x - 12, y + offset_y - 12))
 
     def change_dir(self, dir_x: int, dir_y: int):
         self.new_dir_x = dir_x
         self.new_dir_y = dir_y
 
     def check_bonus(self) -> bool:
-        current = self.game.array[self.i][self.j]
-        if current in self.game.bonus_food:
+        if self.game.bonus_food.clear(self.i, self.j):
             for ghost in self.game.ghosts:
                 ghost.is_affected_by = True
-            self.game.bonus_food.remove(current)
+            self.game.pellet_eaten(self.game.array[self.i][self.j])
             return True
         return False
 
 
 class Ghost:
+    incremental = False  # keep search state between plans (see incremental.py)
+    
     def __init__(self, game: Game, i: int, j: int, color: tuple, ghost_name: str = 'ghost'):
         self.game = game
         self.x = j * SC
         self.y = i * SC
+        self.prev_x, self.prev_y = self.x, self.y
         self.i = i
         self.j = j
-        self.speed = GHOST_SPEED
+        self.normal_speed = GHOST_SPEED
+        self.weak_speed = GHOST_WEAK_SPEED
+        self.speed = self.normal_speed
         self.dir_x = 1
         self.dir_y = 0
         self.color = color
         self.ghost_name = ghost_name
         self.current_cell = game.array[i][j] if i < len(game.array) and j < len(game.array[0]) else None
         self.cell_to_follow = self.get_random_cell()
-        self.searching_list: List[Cell] = []
+        # Planned route, goal-side first like Game.path (shared, never copied);
+        # route[cursor] is the cell the ghost is walking from
+        self.route: List[Cell] = []
+        self.cursor = -1
+        self.route_length = 0
+        self.follows_flow = False  # steering by Game.flow instead of the route
+        # Background planning: latest query sent, and the query the route came from
+        self.plan_seq = 0
+        self.route_seq = 0
+        self.plan_target: Optional[Cell] = None
+        self.plan_tick = 0
+        # Time-sliced search still in progress (see timeslice.py)
+        self.pending_search: Optional[SlicedSearch] = None
+        self.planner = IncrementalPlanner(game.array) if USE_INCREMENTAL and self.incremental else None
         
         # Ghost house cells
-        self.ghost_house_cells: List[Cell] = []
-        for k in range(13, 16):
-            for l in range(11, 17):
-                if k < ROWS and l < COLS:
-                    self.ghost_house_cells.append(game.array[k][l])
+        self.ghost_house_cells: List[Cell] = [game.array[k][l] for k, l in game.maze.house]
         
         self.is_weak = False
         self.is_recovering = False
@@ -539,35 +1082,54 @@ class Ghost:
                 self.dir_x, self.dir_y = 0, 0
                 return
             
-            # Determine direction from searching list
-            up = self.game.array[self.i - 1][self.j] if self.i > 0 else None
-            left = self.game.array[self.i][self.j - 1] if self.j > 0 else None
-            down = self.game.array[self.i + 1][self.j] if self.i < ROWS - 1 else None
-            right = self.game.array[self.i][self.j + 1] if self.j < COLS - 1 else None
-            
-            if up and up in self.searching_list:
-                self.dir_x, self.dir_y = 0, -1
-            elif left and left in self.searching_list:
-                self.dir_x, self.dir_y = -1, 0
-            elif down and down in self.searching_list:
-                self.dir_x, self.dir_y = 0, 1
-            elif right and right in self.searching_list:
-                self.dir_x, self.dir_y = 1, 0
+            routing = self.game.routing
+            if routing is not None:
+                step = routing.next_direction((self.i, self.j),
+                                              (self.cell_to_follow.i, self.cell_to_follow.j))
+                if step:
+                    self.dir_y, self.dir_x = step
+                
+                # Teleport through the tunnel when the route leaves the board
+                partner = self.game.maze.teleports.get(self.i * COLS + self.j)
+                if partner is not None and not (0 <= self.i + self.dir_y < ROWS
+                                                and 0 <= self.j + self.dir_x < COLS):
+                    self.i, self.j = divmod(partner, COLS)
+                    self.x = self.j * SC
+                    self.y = self.i * SC
+            elif self.follows_flow:
+                step = self.game.flow.next_direction(self.i, self.j)
+                if step:
+                    self.dir_y, self.dir_x = step
+            elif self.cursor > 0:
+                current = self.game.array[self.i][self.j]
+                # Reached the next cell without a replan: move the cursor on
+                if self.route[self.cursor - 1] is current:
+                    self.cursor -= 1
+                if self.cursor > 0 and self.route[self.cursor] is current:
+                    next_cell = self.route[self.cursor - 1]
+                    self.dir_x, self.dir_y = next_cell.j - self.j, next_cell.i - self.i
+                    planners = self.game.planners
+                    if planners is not None:
+                        planners.route_steps += 1
+                        if self.route_seq != self.plan_seq and self.plan_tick < self.game.tick:
+                            # Still on the old plan, a tick or more after asking for a new one
+                            planners.outdated += 1
             
             # Check for wall before moving
             next_i = self.i + self.dir_y
             next_j = self.j + self.dir_x
             if 0 <= next_i < ROWS and 0 <= next_j < COLS:
-                if MAP[next_i][next_j] == '1':
+                bit = STEP_BITS[self.dir_x, self.dir_y]
+                if self.game.maze.mask[self.i * COLS + self.j] & bit != bit:
                     self.dir_x, self.dir_y = 0, 0
             else:
                 self.dir_x, self.dir_y = 0, 0
         
         # Adjust speed when weak
         if (self.is_weak or self.is_recovering) and self.is_affected_by:
-            self.speed = GHOST_WEAK_SPEED
+            self.speed = self.weak_speed
         else:
-            self.speed = GHOST_SPEED
+            self.speed = self.normal_speed
         
         # Recovery countdown
         if self.is_recovering:
@@ -582,40 +1144,34 @@ class Ghost:
         self.x += self.dir_x * self.speed
         self.y += self.dir_y * self.speed
 
-    def draw(self):
+    def draw(self) -> pygame.Rect:
         offset_x = SC // 2
         offset_y = SC // 2
         ghost_size = SC + 4
+        x, y = self.game.draw_position(self)
         
         # Get ghost image
         ghost_img = self.game.ghost_images.get(self.ghost_name)
         
         if self.is_weak or self.is_recovering:
-            # Draw blue circle for weak/recovering state
-            if self.is_recovering:
-                # Create a surface with alpha for semi-transparency
-                surface = pygame.Surface((ghost_size, ghost_size), pygame.SRCALPHA)
-                pygame.draw.circle(surface, (*WEAK_COLOR, 100), 
-                                 (ghost_size // 2, ghost_size // 2), ghost_size // 2)
-                self.game.screen.blit(surface, 
-                                     (int(self.x) + offset_x - ghost_size // 2,
-                                      int(self.y) + offset_y - ghost_size // 2))
-            else:
-                pygame.draw.circle(self.game.screen, WEAK_COLOR,
-                                 (int(self.x) + offset_x, int(self.y) + offset_y), ghost_size // 2)
+            # Blue circle for weak state, semi-transparent while recovering
+            color = WEAK_ALPHA_COLOR if self.is_recovering else WEAK_COLOR
+            sprite = self.game.sprites.disc(color, ghost_size // 2)
         elif ghost_img:
             # Draw ghost image
-            self.game.screen.blit(ghost_img, 
-                                 (int(self.x) + offset_x - ghost_size // 2,
-                                  int(self.y) + offset_y - ghost_size // 2))
+            return self.game.screen.blit(ghost_img, 
+                                        (x + offset_x - ghost_size // 2,
+                                         y + offset_y - ghost_size // 2))
         else:
             # Fallback to colored circle if image not found
-            pygame.draw.circle(self.game.screen, self.color,
-                             (int(self.x) + offset_x, int(self.y) + offset_y), ghost_size // 2)
+            sprite = self.game.sprites.disc(self.color, ghost_size // 2)
+        return self.game.screen.blit(sprite,
+                                     (x + offset_x - ghost_size // 2,
+                                      y + offset_y - ghost_size // 2))
 
-    def draw_path(self):
-        if len(self.searching_list) < 2:
-            return
+    def draw_path(self) -> List[pygame.Rect]:
+        if self.cursor < 1:
+            return []
         
         offset_x = SC // 2
         offset_y = SC // 2
@@ -627,14 +1183,16 @@ class Ghost:
         else:
             color = self.color
         
-        points = [(cell.j * SC + offset_x, cell.i * SC + offset_y) for cell in self.searching_list]
+        points = [(cell.j * SC + offset_x, cell.i * SC + offset_y)
+                  for cell in self.route[:self.cursor + 1]]
         
         # Replace last point with ghost position
         if len(points) > 1:
-            points[-1] = (int(self.x) + offset_x, int(self.y) + offset_y)
+            x, y = self.game.draw_position(self)
+            points[-1] = (x + offset_x, y + offset_y)
         
-        for i in range(len(points) - 1):
-            pygame.draw.line(self.game.screen, color, points[i], points[i + 1], 3)
+        return [pygame.draw.line(self.game.screen, color, points[i], points[i + 1], 3)
+                for i in range(len(points) - 1)]
 
     def make_weak(self):
         if not self.is_weak and self.is_affected_by:
@@ -654,7 +1212,7 @@ class Ghost:
 
     def get_random_cell(self) -> Cell:
         i, j = 0, 0
-        while MAP[i][j] == '1':
+        while self.game.maze.is_wall(i, j):
             i = random.randint(0, ROWS - 1)
             j = random.randint(0, COLS - 1)
         return self.game.array[i][j]
@@ -676,15 +1234,7 @@ class Ghost:
         root = self.game.array[i][j]
         
         for _ in range(n):
-            positions = []
-            directions = [(-1, 0), (0, -1), (1, 0), (0, 1)]
-            
-            for di, dj in directions:
-                ni, nj = root.i + di, root.j + dj
-                if 0 <= ni < ROWS and 0 <= nj < COLS:
-                    cell = self.game.array[ni][nj]
-                    if not cell.is_wall:
-                        positions.append(cell)
+            positions = self.game.get_successors(root)
             
             if initial in positions:
                 positions.remove(initial)
@@ -698,6 +1248,134 @@ class Ghost:
         
         return root
 
+    def plan_route(self):
+        """Plan from current_cell to cell_to_follow.
+
+        With the routing table, or the flow field when chasing Pac-Man's own
+        tile, the next step is looked up in update(), so a path is only walked
+        out when it is going to be drawn.
+        """
+        routing = self.game.routing
+        self.follows_flow = (routing is None and self.game.flow is not None
+                             and self.cell_to_follow is self.game.pacman.current_cell)
+        if self.follows_flow:
+            flow = self.game.flow_to_pacman()
+            self.route_length = flow.distance(self.current_cell.i, self.current_cell.j)
+            if SHOW_GHOST_PATHS:
+                self.route = [self.game.array[i][j]
+                              for i, j in flow.path(self.current_cell.i, self.current_cell.j)]
+                self.cursor = len(self.route) - 1
+            return
+        if routing is None:
+            if self.planner is not None:
+                self.route = self.planner.plan(self.current_cell, self.cell_to_follow)
+                expanded = self.planner.expanded
+            elif self.game.junctions is not None:
+                path = self.game.junctions.path((self.current_cell.i, self.current_cell.j),
+                                                (self.cell_to_follow.i, self.cell_to_follow.j))
+                self.route = [self.game.array[i][j] for i, j in path]
+                expanded = self.game.junctions.expanded_nodes
+            elif self.game.hpa is not None:
+                path = self.game.hpa.path((self.current_cell.i, self.current_cell.j),
+                                          (self.cell_to_follow.i, self.cell_to_follow.j))
+                self.route = [self.game.array[i][j] for i, j in path]
+                expanded = self.game.hpa.expanded_nodes
+            elif self.game.planners is not None:
+                # Searched in the background; the route is replaced by
+                # Game.adopt_plans once the plan arrives. A query already on
+                # its way to the same target is waited for, not repeated.
+                if self.route_seq == self.plan_seq or self.plan_target is not self.cell_to_follow:
+                    self.plan_target = self.cell_to_follow
+                    self.plan_tick = self.game.tick
+                    self.plan_seq = self.game.planners.submit(
+                        self, self.current_cell.id, self.cell_to_follow.id, self.game.tick)
+                return
+            elif self.game.search_budget is not None:
+                self.plan_sliced()
+                return
+            else:
+                self.game.a_star(self.current_cell, self.cell_to_follow)
+                # a_star builds a new list every call, so the route can be kept as is
+                self.route = self.game.path
+                expanded = self.game.expanded_nodes
+            if self.game.profiler is not None:
+                self.game.profiler.searched(self.ghost_name, expanded)
+            self.route_length = len(self.route)
+            self.cursor = self.route_length - 1
+            return
+        
+        start = (self.current_cell.i, self.current_cell.j)
+        end = (self.cell_to_follow.i, self.cell_to_follow.j)
+        self.route_length = routing.distance(start, end)
+        if SHOW_GHOST_PATHS:
+            self.route = [self.game.array[i][j] for i, j in routing.path(start, end)]
+            self.cursor = len(self.route) - 1
+
+    def plan_sliced(self):
+        """Start or carry on a budgeted search to cell_to_follow.
+
+        Until it finishes, the ghost heads for the cell closest to the target
+        reached so far.
+        """
+        search = self.pending_search
+        if search is None or search.goal != self.cell_to_follow.id:
+            if search is not None:
+                self.game.search_budget.abandoned += 1
+            search = self.pending_search = SlicedSearch(
+                self.game.maze.mask, COLS, self.current_cell.id, self.cell_to_follow.id)
+        self.continue_search()
+        if self.pending_search is not None:
+            self.take_route(search.partial(), search.estimate)
+
+    def continue_search(self):
+        """Spend this ghost's share of the tick's budget on its pending search."""
+        search, budget = self.pending_search, self.game.search_budget
+        expanded = search.advance(budget.allowance)
+        budget.spend(expanded)
+        if self.game.profiler is not None:
+            # One search however many slices it takes
+            self.game.profiler.searched(self.ghost_name, expanded, int(search.slices <= 1))
+        if search.done:
+            self.pending_search = None
+            budget.finished += 1
+            if search.slices > 1:
+                budget.sliced += 1
+            self.take_route(search.path)
+
+    def take_route(self, path: List[int], length: Optional[int] = None):
+        """Follow a path of cell ids planned from where the ghost was."""
+        route = [self.game.cells[v] for v in path]
+        if route:
+            try:
+                cursor = route.index(self.current_cell)
+            except ValueError:
+                # Walked off it since the search started: keep the old route
+                return
+        else:
+            cursor = -1
+        self.route = route
+        self.route_length = len(route) if length is None else length
+        self.cursor = cursor
+
+    def coast(self) -> bool:
+        """Move on without replanning, if the current plan has a way to go.
+
+        Returns False, without moving, when the ghost should search instead:
+        it is weak or recovering, a sliced search is under way, or its route
+        is down to its last step.
+        """
+        if self.is_weak or self.is_recovering or self.pending_search is not None:
+            return False
+        if not (self.follows_flow or self.cursor > 1):
+            return False
+        if self.x % SC == 0 and self.y % SC == 0:
+            i, j = int(self.y) // SC, int(self.x) // SC
+            if not (0 <= i < ROWS and 0 <= j < COLS):
+                return False
+            self.current_cell = self.game.array[i][j]
+        self.update()
+        return True
+
     def search(self):
         """Override in subclasses"""
         pass
@@ -706,6 +1384,8 @@ class Ghost:
 class Blinky(Ghost):
     """Blinky always chases Pacman directly"""
     
+    incremental = True
+    
     def __init__(self, game: Game, i: int, j: int, color: tuple):
         super().__init__(game, i, j, color, 'blinky')
     
@@ -722,7 +1402,7 @@ class Blinky(Ghost):
             self.current_cell = self.game.array[self.i][self.j]
             
             if (self.is_weak or self.is_recovering) and self.is_affected_by:
-                if len(self.searching_list) <= 2:
+                if self.route_length <= 2:
                     if self.is_weak:
                         self.cell_to_follow = self.get_random_cell()
                     elif self.is_recovering:
@@ -731,8 +1411,7 @@ class Blinky(Ghost):
                 # Chase Pacman directly
                 self.cell_to_follow = self.game.pacman.current_cell
             
-            self.game.a_star(self.current_cell, self.cell_to_follow)
-            self.searching_list = self.game.path.copy()
+            self.plan_route()
         
         self.update()
 
@@ -740,9 +1419,12 @@ class Blinky(Ghost):
 class Pinky(Ghost):
     """Pinky tries to ambush Pacman"""
     
+    lookahead = 6         # tiles ahead of Pacman to aim for
+    search_interval = 8   # tiles between retargets
+    
     def __init__(self, game: Game, i: int, j: int, color: tuple):
         super().__init__(game, i, j, color, 'pinky')
-        self.new_search = 8
+        self.new_search = self.search_interval
 
     def search(self):
         if self.x % SC == 0 and self.y % SC == 0:
@@ -760,7 +1442,7 @@ class Pinky(Ghost):
             
             if (self.is_weak or self.is_recovering) and self.is_affected_by:
                 self.new_search = 1
-                if len(self.searching_list) <= 2:
+                if self.route_length <= 2:
                     if self.is_weak:
                         self.cell_to_follow = self.get_random_cell()
                     elif self.is_recovering:
@@ -768,11 +1450,10 @@ class Pinky(Ghost):
             else:
                 # Try to get ahead of Pacman
                 if self.new_search == 0:
-                    self.cell_to_follow = self.get_cell_in_front_of(6)
-                    self.new_search = 8
+                    self.cell_to_follow = self.get_cell_in_front_of(self.lookahead)
+                    self.new_search = self.search_interval
             
-            self.game.a_star(self.current_cell, self.cell_to_follow)
-            self.searching_list = self.game.path.copy()
+            self.plan_route()
         
         self.update()
 
@@ -780,6 +1461,8 @@ class Pinky(Ghost):
 class Inky(Ghost):
     """Inky uses Blinky's position to determine target"""
     
+    incremental = True
+    
     def __init__(self, game: Game, i: int, j: int, color: tuple):
         super().__init__(game, i, j, color, 'inky')
     
@@ -796,7 +1479,7 @@ class Inky(Ghost):
             self.current_cell = self.game.array[self.i][self.j]
             
             if (self.is_weak or self.is_recovering) and self.is_affected_by:
-                if len(self.searching_list) <= 2:
+                if self.route_length <= 2:
                     if self.is_weak:
                         self.cell_to_follow = self.get_random_cell()
                     elif self.is_recovering:
@@ -811,11 +1494,10 @@ class Inky(Ghost):
                 if (0 <= possible_i < ROWS and 0 <= possible_j < COLS and
                     not self.game.array[possible_i][possible_j].is_wall):
                     self.cell_to_follow = self.game.array[possible_i][possible_j]
-                elif len(self.searching_list) <= 2:
+                elif self.route_length <= 2:
                     self.cell_to_follow = self.get_random_cell()
             
-            self.game.a_star(self.current_cell, self.cell_to_follow)
-            self.searching_list = self.game.path.copy()
+            self.plan_route()
         
         self.update()
 
@@ -823,9 +1505,12 @@ class Inky(Ghost):
 class Clyde(Ghost):
     """Clyde searches for tile far from Pacman"""
     
+    lookahead = 12        # tiles ahead of Pacman to aim for
+    search_interval = 10  # tiles between retargets
+    
     def __init__(self, game: Game, i: int, j: int, color: tuple):
         super().__init__(game, i, j, color, 'clyde')
-        self.new_search = 10
+        self.new_search = self.search_interval
 
     def search(self):
         if self.x % SC == 0 and self.y % SC == 0:
@@ -843,7 +1528,7 @@ class Clyde(Ghost):
             
             if (self.is_weak or self.is_recovering) and self.is_affected_by:
                 self.new_search = 1
-                if len(self.searching_list) <= 2:
+                if self.route_length <= 2:
                     if self.is_weak:
                         self.cell_to_follow = self.get_random_cell()
                     elif self.is_recovering:
@@ -851,15 +1536,17 @@ class Clyde(Ghost):
             else:
                 # Get cell far ahead
                 if self.new_search == 0:
-                    self.cell_to_follow = self.get_cell_in_front_of(12)
-                    self.new_search = 10
+                    self.cell_to_follow = self.get_cell_in_front_of(self.lookahead)
+                    self.new_search = self.search_interval
             
-            self.game.a_star(self.current_cell, self.cell_to_follow)
-            self.searching_list = self.game.path.copy()
+            self.plan_route()
         
         self.update()
 
 
+startup_mark('import')
+
+
 if __name__ == "__main__":
     game = Game()
     game.run()
@@ -0,0 +1,63 @@
+"""
+Pellet storage indexed by cell id.
+
+One byte per board cell (id = i * cols + j) says whether a pellet is still
+there, and the number of live pellets is kept alongside, so eating a pellet,
+testing a cell and checking for a cleared board are all O(1). The raw
+buffer can be copied or wrapped (e.g. with numpy.frombuffer) to snapshot
+pellet state without touching any Cell objects.
+"""
+
+from typing import Iterator, Optional, Sequence, Tuple
+
+
+class PelletStore:
+    def __init__(self, rows: int, cols: int, bits: Optional[bytes] = None):
+        self.rows = rows
+        self.cols = cols
+        self.bits = bytearray(bits) if bits is not None else bytearray(rows * cols)
+        if len(self.bits) != rows * cols:
+            raise ValueError(f"expected {rows * cols} bytes, got {len(self.bits)}")
+        self.count = sum(1 for b in self.bits if b)
+
+    @classmethod
+    def from_map(cls, grid: Sequence[Sequence[str]], symbol: str) -> 'PelletStore':
+        """A store with a pellet on every cell of `grid` marked `symbol`."""
+        return cls(len(grid), len(grid[0]), bytes(c == symbol for row in grid for c in row))
+
+    def add(self, i: int, j: int):
+        index = i * self.cols + j
+        if not self.bits[index]:
+            self.bits[index] = 1
+            self.count += 1
+
+    def has(self, i: int, j: int) -> bool:
+        return self.bits[i * self.cols + j] != 0
+
+    def clear(self, i: int, j: int) -> bool:
+        """Remove the pellet at (i, j); return whether there was one."""
+        index = i * self.cols + j
+        if self.bits[index]:
+            self.bits[index] = 0
+            self.count -= 1
+            return True
+        return False
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """(i, j) of every remaining pellet, in row-major order."""
+        cols = self.cols
+        index = self.bits.find(1)
+        while index != -1:
+            yield divmod(index, cols)
+            index = self.bits.find(1, index + 1)
+
+    @property
+    def buffer(self) -> memoryview:
+        """The live pellet flags, one byte per cell id."""
+        return memoryview(self.bits)
+
+    def copy(self) -> 'PelletStore':
+        return PelletStore(self.rows, self.cols, self.bits)
@@ -0,0 +1,219 @@
+"""
+Ghost planning off the game thread: a worker pool searching a grid snapshot.
+
+With pathfinding.planner_pool enabled, a ghost that would run Game.a_star
+inside Game.update hands the query to this pool instead and carries on along
+its previous route. Workers search an immutable snapshot of the board (the
+map bundle's neighbour masks, which never change during a game) with the
+same A* as Game.a_star, so a delivered plan is the route the ghost would
+have computed itself. Every query gets a sequence number; Game.update picks
+up finished plans at the start of each tick and drops any that a newer
+query from the same ghost has overtaken.
+
+Threads keep the game responsive during a long search on a big board (the
+search yields the interpreter lock at the switch interval); processes
+(planner_processes) also run searches truly in parallel.
+
+Metrics: plan latency in milliseconds and ticks, plans dropped as stale or
+because the ghost had already left the planned route, and
+how many steps ghosts took along a route while a newer plan was pending.
+
+    python planner_pool.py [--pairs 500] [--games 20] [--workers 2] [--processes] [--tick-ms 2]
+
+checks the worker search against Game.a_star and reports the metrics over
+headless games.
+"""
+
+import itertools
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from timeslice import SlicedSearch
+
+
+class GridSnapshot(NamedTuple):
+    """What a worker needs to search: neighbour masks as immutable bytes."""
+    rows: int
+    cols: int
+    mask: bytes  # bit 1 up, 2 left, 4 down, 8 right, as in MapBundle.mask
+
+
+def search(grid: GridSnapshot, start: int, goal: int) -> Tuple[List[int], int]:
+    """Game.a_star over cell ids: (path, expanded nodes).
+
+    A time-sliced search (see timeslice.py) run to the end in one go, so the
+    path has the same shape and tie-breaking as Game.path: the cell next to
+    `goal` first, back to `start`; empty when start == goal or unreachable.
+    """
+    query = SlicedSearch(grid.mask, grid.cols, start, goal)
+    query.advance(sys.maxsize)
+    return query.path, query.expanded
+
+
+# Each worker process keeps its own copy of the snapshot
+_grid: Optional[GridSnapshot] = None
+
+
+def _init_worker(grid: GridSnapshot):
+    global _grid
+    _grid = grid
+
+
+def _search_in_worker(start: int, goal: int) -> Tuple[List[int], int]:
+    return search(_grid, start, goal)
+
+
+class Plan(NamedTuple):
+    ghost: object
+    seq: int
+    path: List[int]
+    expanded: int
+
+
+class PlannerPool:
+    def __init__(self, grid: GridSnapshot, workers: int = 2, processes: bool = False):
+        self.grid = grid
+        if processes:
+            self.executor = ProcessPoolExecutor(workers, initializer=_init_worker,
+                                                initargs=(grid,))
+        else:
+            self.executor = ThreadPoolExecutor(workers, thread_name_prefix="planner")
+        self.processes = processes
+        self.sequence = itertools.count(1)
+        # future -> (ghost, seq, submit time, submit tick)
+        self.pending: Dict[Future, Tuple[object, int, float, int]] = {}
+        self.latencies = deque(maxlen=1000)        # seconds, delivered plans
+        self.latency_ticks = deque(maxlen=1000)
+        self.submitted = 0
+        self.delivered = 0
+        self.stale = 0        # dropped: overtaken by a newer query
+        self.discarded = 0    # delivered, but the ghost had left the route
+        self.route_steps = 0  # steps ghosts took along a planned route
+        self.outdated = 0     # ... of which with a newer plan pending
+
+    def submit(self, ghost, start: int, goal: int, tick: int) -> int:
+        """Queue a search for `ghost`; returns the sequence number of the query."""
+        seq = next(self.sequence)
+        if self.processes:
+            future = self.executor.submit(_search_in_worker, start, goal)
+        else:
+            future = self.executor.submit(search, self.grid, start, goal)
+        self.pending[future] = (ghost, seq, time.perf_counter(), tick)
+        self.submitted += 1
+        return seq
+
+    def collect(self, tick: int) -> List[Plan]:
+        """Finished plans that are still the latest for their ghost."""
+        done = [future for future in self.pending if future.done()]
+        plans = []
+        now = time.perf_counter()
+        for future in done:
+            ghost, seq, submitted, submit_tick = self.pending.pop(future)
+            if seq != ghost.plan_seq:
+                self.stale += 1
+                continue
+            path, expanded = future.result()
+            self.latencies.append(now - submitted)
+            self.latency_ticks.append(tick - submit_tick)
+            self.delivered += 1
+            plans.append(Plan(ghost, seq, path, expanded))
+        return plans
+
+    def wait(self):
+        """Block until every queued search has finished."""
+        for future in list(self.pending):
+            future.result()
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+        ticks = sorted(self.latency_ticks)
+
+        def pct(values, q):
+            return values[min(len(values) - 1, int(q * len(values)))] if values else 0
+
+        return {
+            "submitted": self.submitted,
+            "delivered": self.delivered,
+            "stale": self.stale,
+            "discarded": self.discarded,
+            "route_steps": self.route_steps,
+            "outdated_steps": self.outdated,
+            "latency_p50_ms": pct(latencies, 0.5) * 1000,
+            "latency_p95_ms": pct(latencies, 0.95) * 1000,
+            "latency_max_ms": (latencies[-1] if latencies else 0) * 1000,
+            "latency_p95_ticks": pct(ticks, 0.95),
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def check(pairs: int, games: int, workers: int, processes: bool, tick_ms: float,
+          seed: int = 1) -> bool:
+    import random
+
+    import pacman
+    from headless import RandomInput
+
+    random.seed(seed)
+    game = pacman.Game(headless=True)
+    grid = GridSnapshot(game.maze.rows, game.maze.cols, bytes(game.maze.mask))
+    walkable = [cell for cell in game.cells if not cell.is_wall]
+    rng = random.Random(seed)
+    for _ in range(pairs):
+        a, b = rng.choice(walkable), rng.choice(walkable)
+        game.a_star(a, b)
+        path, expanded = search(grid, a.id, b.id)
+        if path != [cell.id for cell in game.path] or expanded != game.expanded_nodes:
+            print(f"search differs from Game.a_star for {(a.i, a.j)} -> {(b.i, b.j)}")
+            return False
+    print(f"search matches Game.a_star on {pairs} pairs")
+
+    pacman.USE_PLANNER_POOL = True
+    pacman.PATHFINDING = dict(pacman.PATHFINDING, planner_workers=workers,
+                              planner_processes=processes)
+    pool = pacman.get_planner_pool()
+    ticks = 0
+    t0 = time.perf_counter()
+    for k in range(games):
+        random.seed(seed + k)
+        game = pacman.Game(headless=True, input_source=RandomInput(seed + k))
+        while not game.game_over and game.tick < 5000:
+            game.step()
+            # Stand-in for the rest of a frame, so the workers get a tick's worth of time
+            time.sleep(tick_ms / 1000)
+        ticks += game.tick
+    elapsed = time.perf_counter() - t0
+    pool.close()
+    stats = pool.stats()
+    print(f"{games} games, {ticks} ticks in {elapsed:.2f}s with "
+          f"{workers} {'processes' if processes else 'threads'}")
+    print(f"plans: {stats['submitted']} queued, {stats['delivered'] - stats['discarded']} used, "
+          f"{stats['stale']} dropped as stale, {stats['discarded']} off the route by the time "
+          f"they arrived; {stats['outdated_steps']} of "
+          f"{stats['route_steps']} route steps taken on an outdated plan")
+    print(f"latency: p50 {stats['latency_p50_ms']:.2f} ms, p95 {stats['latency_p95_ms']:.2f} ms, "
+          f"max {stats['latency_max_ms']:.2f} ms, p95 {stats['latency_p95_ticks']} ticks")
+    return True
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pairs", type=int, default=500, help="pairs checked against Game.a_star")
+    parser.add_argument("--games", type=int, default=20, help="headless games played with the pool")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--processes", action="store_true", help="worker processes, not threads")
+    parser.add_argument("--tick-ms", type=float, default=2.0,
+                        help="idle time per tick, standing in for drawing and the frame clock")
+    args = parser.parse_args()
+    sys.exit(0 if check(args.pairs, args.games, args.workers, args.processes,
+                        args.tick_ms) else 1)
+
+
+if __name__ == "__main__":
+    main()
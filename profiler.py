@@ -0,0 +1,156 @@
+"""
+Frame profiler: per-phase timings, A* counts and frame-time percentiles.
+
+The game calls mark(phase) after each part of a frame (input, Pac-Man, each
+ghost's search, the rest of update, draw, present, waiting on the frame
+clock); the time since the previous mark is charged to that phase. Ghost
+searches report how many nodes they expanded. A frame is one pass of
+Game.run's loop, so the phases of every tick it ran add up with its draw;
+headless Game.step callers get one frame per tick. Every finished frame can be
+appended to a CSV or JSON Lines file and summarized in an on-screen HUD.
+
+When profiling is off Game.profiler is None, so the hot path only pays for a
+few `is not None` checks per frame.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import pygame
+
+GHOSTS = ['blinky', 'pinky', 'inky', 'clyde']
+PHASES = ['input', 'pacman', 'update'] + GHOSTS + ['draw', 'present', 'wait']
+# Phases that are not work done by the game
+IDLE_PHASES = {'wait'}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class FrameProfiler:
+    def __init__(self, output: Optional[str] = None, window: int = 600, show_hud: bool = False):
+        self.clock = time.perf_counter
+        self.show_hud = show_hud
+        self.frames = 0
+        self.last = self.clock()
+        self.phases: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.searches: Dict[str, int] = dict.fromkeys(GHOSTS, 0)
+        self.expanded: Dict[str, int] = dict.fromkeys(GHOSTS, 0)
+        self.work_times = deque(maxlen=window)  # seconds of work per frame
+        self.last_record: Optional[dict] = None
+        self.font = None
+
+        self.output = None
+        self.writer = None
+        if output:
+            self.output = open(output, 'w', newline='')
+            if not output.endswith('.jsonl'):
+                self.writer = csv.DictWriter(self.output, fieldnames=self.fields())
+                self.writer.writeheader()
+
+    @staticmethod
+    def fields() -> List[str]:
+        return (['frame', 'work_ms'] + [f'{phase}_ms' for phase in PHASES]
+                + [f'{name}_searches' for name in GHOSTS]
+                + [f'{name}_expanded' for name in GHOSTS])
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def mark(self, phase: str):
+        """Charge the time since the previous mark to `phase`."""
+        now = self.clock()
+        self.phases[phase] += now - self.last
+        self.last = now
+
+    def searched(self, ghost: str, expanded: int, searches: int = 1):
+        """Count `searches` searches by `ghost`, and the nodes they expanded.
+
+        A search spread over several ticks reports its nodes every tick but
+        counts as a search only on the first.
+        """
+        self.searches[ghost] = self.searches.get(ghost, 0) + searches
+        self.expanded[ghost] = self.expanded.get(ghost, 0) + expanded
+
+    def frame(self):
+        """Close the frame recorded so far and start the next one."""
+        self.mark('wait')
+        if self.frames:
+            self.finish()
+        self.frames += 1
+        for name in self.phases:
+            self.phases[name] = 0.0
+        for name in self.searches:
+            self.searches[name] = 0
+            self.expanded[name] = 0
+
+    def finish(self):
+        work = sum(t for name, t in self.phases.items() if name not in IDLE_PHASES)
+        self.work_times.append(work)
+        record = {'frame': self.frames, 'work_ms': round(work * 1000, 4)}
+        for name, t in self.phases.items():
+            record[f'{name}_ms'] = round(t * 1000, 4)
+        for name in GHOSTS:
+            record[f'{name}_searches'] = self.searches[name]
+            record[f'{name}_expanded'] = self.expanded[name]
+        self.last_record = record
+
+        if self.writer is not None:
+            self.writer.writerow(record)
+        elif self.output is not None:
+            self.output.write(json.dumps(record) + '\n')
+
+    def close(self):
+        if self.frames:
+            self.finish()
+            self.frames = 0
+        if self.output is not None:
+            self.output.close()
+            self.output = self.writer = None
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def percentiles(self) -> Dict[str, float]:
+        """Frame work time percentiles over the window, in milliseconds."""
+        ordered = sorted(self.work_times)
+        if not ordered:
+            return {}
+        return {
+            'p50': percentile(ordered, 0.50) * 1000,
+            'p95': percentile(ordered, 0.95) * 1000,
+            'p99': percentile(ordered, 0.99) * 1000,
+            'max': ordered[-1] * 1000,
+        }
+
+    def hud_lines(self) -> List[str]:
+        stats = self.percentiles()
+        lines = ["frame ms  " + "  ".join(f"{k} {v:.2f}" for k, v in stats.items())]
+        record = self.last_record
+        if record is not None:
+            lines.append("  ".join(f"{name} {record[name + '_ms']:.2f}"
+                                   for name in ('input', 'pacman', 'update', 'draw', 'present')))
+            lines.append("  ".join(f"{name} {record[name + '_ms']:.2f}ms "
+                                   f"{record[name + '_searches']}/{record[name + '_expanded']}"
+                                   for name in GHOSTS))
+        return lines
+
+    def draw_hud(self, surface: pygame.Surface) -> pygame.Rect:
+        """Draw the HUD in the top-left corner; return the area it covers."""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        rendered = [self.font.render(line, True, (255, 255, 255)) for line in self.hud_lines()]
+        width = max(text.get_width() for text in rendered) + 8
+        height = sum(text.get_height() for text in rendered) + 8
+        area = pygame.Rect(0, 0, width, height)
+        surface.fill((0, 0, 0), area)
+        y = 4
+        for text in rendered:
+            surface.blit(text, (4, y))
+            y += text.get_height()
+        return area
@@ -0,0 +1,177 @@
+"""
+Record and replay games: the RNG seed plus every Pac-Man input, by tick.
+
+Ghost targets come from the global `random` module, so a game is fully
+determined by the seed it starts from and the ticks at which Pac-Man was
+turned. A recording stores exactly that, together with the final state, and
+replaying it (headless or in the window) plays the same game again. That
+makes any recorded session a fixed workload for profiling and bisecting.
+
+    python replay.py record game.json [--seed 7]                 # play in the window
+    python replay.py record game.json --headless --input random  # generate one
+    python replay.py play game.json [--headless]                 # verify or watch
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+from headless import DIRECTIONS, RandomInput, ScriptedInput
+from pacman import FPS, Game, InputSource, KeyboardInput
+
+FORMAT_VERSION = 1
+
+
+def state_digest(game: Game) -> str:
+    """Hash of everything that moves, to check that a replay matches."""
+    state = [game.tick, game.pacman.x, game.pacman.y, game.game_over, game.won, game.caught_by]
+    state += [(ghost.x, ghost.y, ghost.is_weak, ghost.is_recovering) for ghost in game.ghosts]
+    digest = hashlib.sha1(repr(state).encode())
+    digest.update(game.food.buffer)
+    digest.update(game.bonus_food.buffer)
+    return digest.hexdigest()
+
+
+def game_result(game: Game) -> dict:
+    return {
+        "ticks": game.tick,
+        "won": game.won,
+        "caught_by": game.caught_by,
+        "pellets_left": len(game.food) + len(game.bonus_food),
+        "digest": state_digest(game),
+    }
+
+
+class RecordingInput(InputSource):
+    """Passes another input source through and logs what it returns.
+
+    Only the first game is recorded: a restart starts a new random stream
+    that the seed alone cannot reproduce.
+    """
+
+    def __init__(self, source: InputSource, seed: int):
+        self.source = source
+        self.seed = seed
+        self.moves: List[Tuple[int, int]] = []  # (tick, index into DIRECTIONS)
+        self.game: Optional[Game] = None
+        self.result: Optional[dict] = None
+
+    def next_direction(self, game: Game) -> Optional[Tuple[int, int]]:
+        if self.game is None:
+            self.game = game
+        recording = self.result is None
+        if recording and game.game_over:
+            self.result = game_result(game)
+            recording = False
+        tick = game.tick
+        direction = self.source.next_direction(game)
+        if recording and direction is not None and game.tick == tick:
+            self.moves.append((tick, DIRECTIONS.index(direction)))
+        return direction
+
+    def save(self, path: str):
+        result = self.result or game_result(self.game)
+        with open(path, "w") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "seed": self.seed,
+                "moves": self.moves,
+                "result": result,
+            }, f, separators=(",", ":"))
+
+
+class ReplayInput(ScriptedInput):
+    """Feeds a recording back; in a window it still answers the close button."""
+
+    def __init__(self, moves: List[Tuple[int, int]]):
+        super().__init__({tick: DIRECTIONS[code] for tick, code in moves})
+
+    def next_direction(self, game: Game) -> Optional[Tuple[int, int]]:
+        if not game.headless:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    game.running = False
+        return super().next_direction(game)
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        recording = json.load(f)
+    if recording.get("version") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported recording version {recording.get('version')}")
+    return recording
+
+
+def replay_game(recording: dict, headless: bool = True) -> Game:
+    """A fresh game set up to play `recording` back."""
+    random.seed(recording["seed"])
+    return Game(headless=headless, input_source=ReplayInput(recording["moves"]))
+
+
+def record(path: str, seed: int, headless: bool, source: str, max_ticks: int):
+    random.seed(seed)
+    if headless:
+        base = RandomInput(seed) if source == "random" else InputSource()
+        recorder = RecordingInput(base, seed)
+        game = Game(headless=True, input_source=recorder)
+        while not game.game_over and game.tick < max_ticks:
+            game.step()
+        recorder.next_direction(game)  # capture the final state
+    else:
+        recorder = RecordingInput(KeyboardInput(), seed)
+        Game(input_source=recorder).run()
+    recorder.save(path)
+    print(f"recorded {len(recorder.moves)} inputs over {recorder.result['ticks']} ticks to {path}")
+
+
+def play(path: str, headless: bool) -> bool:
+    recording = load(path)
+    expected: Dict = recording["result"]
+    game = replay_game(recording, headless)
+    if headless:
+        while not game.game_over and game.tick < expected["ticks"]:
+            game.step()
+    else:
+        while game.running and not (game.game_over or game.tick >= expected["ticks"]):
+            game.step()
+            game.draw()
+            game.present()
+            game.clock.tick(FPS)
+        pygame.quit()
+
+    result = game_result(game)
+    ok = result == expected
+    print(f"replayed {path}: {result['ticks']} ticks, "
+          f"{'won' if result['won'] else 'caught by ' + str(result['caught_by'])}, "
+          f"{'matches' if ok else 'DOES NOT match'} the recording")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="record a new game")
+    rec.add_argument("path")
+    rec.add_argument("--seed", type=int, default=1, help="seed for the game's RNG")
+    rec.add_argument("--headless", action="store_true", help="no window; needs --input")
+    rec.add_argument("--input", choices=["random", "idle"], default="random",
+                     help="Pac-Man input for headless recordings")
+    rec.add_argument("--ticks", type=int, default=5000, help="tick limit for headless recordings")
+    rep = sub.add_parser("play", help="replay a recording and check the final state")
+    rep.add_argument("path")
+    rep.add_argument("--headless", action="store_true", help="no window, as fast as possible")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.path, args.seed, args.headless, args.input, args.ticks)
+    elif not play(args.path, args.headless):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+All-pairs routing table for the static maze.
+
+Every walkable cell gets a node id. For each (source, target) pair the table
+stores the shortest-path distance and the first direction to take, with the
+'-' teleport tunnel treated as a link between the two edges of the board.
+The table is written to a flat binary file keyed by a hash of the map and
+memory-mapped on later startups, so lookups are plain index arithmetic.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import List, Optional, Sequence, Tuple
+
+from mapbundle import MapBundle
+
+# (di, dj) in the same priority order Ghost.update uses: up, left, down, right
+DIRECTIONS = [(-1, 0), (0, -1), (1, 0), (0, 1)]
+
+NO_ROUTE = 0xFFFF
+NO_DIRECTION = 0xFF
+
+_MAGIC = b"PMRT"
+_VERSION = 1
+# magic, version, little-endian flag, rows, cols, node count, sha1 of the map
+_HEADER = struct.Struct("<4sHHHHH20s")
+
+
+def map_hash(grid: Sequence[Sequence[str]]) -> str:
+    """Hash of the map layout, used to key the cached table."""
+    return hashlib.sha1("\n".join("".join(row) for row in grid).encode()).hexdigest()
+
+
+def neighbours(maze: MapBundle, i: int, j: int) -> List[Tuple[int, int, int]]:
+    """Walkable neighbours of (i, j) as (direction, ni, nj), including tunnels."""
+    rows, cols = maze.rows, maze.cols
+    v = i * cols + j
+    bits = maze.mask[v]
+    partner = maze.teleports.get(v)
+    result = []
+    for d, (di, dj) in enumerate(DIRECTIONS):
+        ni, nj = i + di, j + dj
+        if bits & (1 << d):
+            result.append((d, ni, nj))
+        elif partner is not None and not (0 <= ni < rows and 0 <= nj < cols):
+            # Only tunnel cells wrap around, onto the other end of their pair
+            ni, nj = ni % rows, nj % cols
+            if ni * cols + nj == partner:
+                result.append((d, ni, nj))
+    return result
+
+
+class RoutingTable:
+    """Distance and next-hop lookups between any two walkable cells."""
+
+    def __init__(self, rows: int, cols: int, size: int, index, dist, next_dir, digest: str,
+                 buffer: Optional[mmap.mmap] = None):
+        self.rows = rows
+        self.cols = cols
+        self.size = size          # number of walkable cells
+        self.index = index        # rows * cols, node id or -1 for walls
+        self.dist = dist          # n * n, distance or NO_ROUTE
+        self.next_dir = next_dir  # n * n, index into DIRECTIONS or NO_DIRECTION
+        self.digest = digest
+        self._buffer = buffer
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    def node(self, i: int, j: int) -> int:
+        return self.index[i * self.cols + j]
+
+    def distance(self, start: Tuple[int, int], end: Tuple[int, int]) -> int:
+        a, b = self.node(*start), self.node(*end)
+        if a < 0 or b < 0:
+            return NO_ROUTE
+        return self.dist[a * self.size + b]
+
+    def next_direction(self, start: Tuple[int, int], end: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """First (di, dj) step from start toward end, or None if already there."""
+        a, b = self.node(*start), self.node(*end)
+        if a < 0 or b < 0:
+            return None
+        d = self.next_dir[a * self.size + b]
+        return None if d == NO_DIRECTION else DIRECTIONS[d]
+
+    def path(self, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Cells from start up to (not including) end, walked via next hops.
+
+        Returned goal-side first, matching the order of Game.path.
+        """
+        cells = []
+        i, j = start
+        while True:
+            step = self.next_direction((i, j), end)
+            if step is None:
+                break
+            cells.append((i, j))
+            i, j = (i + step[0]) % self.rows, (j + step[1]) % self.cols
+        cells.reverse()
+        return cells
+
+    # ------------------------------------------------------------------
+    # Building and persistence
+    # ------------------------------------------------------------------
+    @classmethod
+    def build(cls, maze: MapBundle) -> "RoutingTable":
+        """BFS from every walkable cell over the grid and tunnel links."""
+        rows, cols = maze.rows, maze.cols
+        index = array('h', [-1]) * (rows * cols)
+        coords = []
+        for i in range(rows):
+            for j in range(cols):
+                if not maze.is_wall(i, j):
+                    index[i * cols + j] = len(coords)
+                    coords.append((i, j))
+        n = len(coords)
+
+        adjacency = [[(d, index[ni * cols + nj]) for d, ni, nj in neighbours(maze, i, j)]
+                     for i, j in coords]
+
+        dist = array('H', [NO_ROUTE]) * (n * n)
+        next_dir = array('B', [NO_DIRECTION]) * (n * n)
+        for target in range(n):
+            # Distances to `target` (the graph is undirected)
+            to_target = [NO_ROUTE] * n
+            to_target[target] = 0
+            queue = deque([target])
+            while queue:
+                u = queue.popleft()
+                for _, v in adjacency[u]:
+                    if to_target[v] == NO_ROUTE:
+                        to_target[v] = to_target[u] + 1
+                        queue.append(v)
+
+            for source in range(n):
+                d = to_target[source]
+                dist[source * n + target] = d
+                if d == NO_ROUTE or d == 0:
+                    continue
+                for direction, v in adjacency[source]:
+                    if to_target[v] == d - 1:
+                        next_dir[source * n + target] = direction
+                        break
+
+        return cls(rows, cols, n, index, dist, next_dir, map_hash(maze.grid))
+
+    def save(self, path: str):
+        n = self.size
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, sys.byteorder == 'little',
+                                 self.rows, self.cols, n, bytes.fromhex(self.digest)))
+            array('h', self.index).tofile(f)
+            array('H', self.dist).tofile(f)
+            array('B', self.next_dir).tofile(f)
+
+    @classmethod
+    def load(cls, path: str, maze: MapBundle) -> Optional["RoutingTable"]:
+        """Memory-map a saved table; None if it is missing or for another map."""
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            try:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return None
+
+        if len(buffer) < _HEADER.size:
+            buffer.close()
+            return None
+        magic, version, little, rows, cols, n, digest = _HEADER.unpack_from(buffer)
+        expected = _HEADER.size + 2 * rows * cols + 3 * n * n
+        if (magic != _MAGIC or version != _VERSION or little != (sys.byteorder == 'little')
+                or digest.hex() != map_hash(maze.grid) or len(buffer) != expected):
+            buffer.close()
+            return None
+
+        view = memoryview(buffer)
+        offset = _HEADER.size
+        index = view[offset:offset + 2 * rows * cols].cast('h')
+        offset += 2 * rows * cols
+        dist = view[offset:offset + 2 * n * n].cast('H')
+        offset += 2 * n * n
+        next_dir = view[offset:offset + n * n]
+        return cls(rows, cols, n, index, dist, next_dir, digest.hex(), buffer)
+
+    @classmethod
+    def load_or_build(cls, maze: MapBundle, directory: str) -> "RoutingTable":
+        """Use the cached table for this map if present, else build and save it."""
+        path = os.path.join(directory, f"pacman_routing_{map_hash(maze.grid)[:12]}.bin")
+        table = cls.load(path, maze)
+        if table is not None:
+            return table
+        table = cls.build(maze)
+        try:
+            table.save(path)
+        except OSError:
+            # Read-only install: keep the in-memory table
+            return table
+        return cls.load(path, maze) or table
@@ -0,0 +1,330 @@
+"""
+Time-sliced ghost A*: searches that stop after a node budget and resume on
+the next tick.
+
+Game.a_star runs to the end however many cells it takes, so on a big board a
+tick where several ghosts replan at once (Pinky and Clyde retarget every few
+tiles, and their counters line up) costs several whole searches. With
+pathfinding.search_budget set, Game.update shares that many expansions per
+tick between the ghosts instead. A search that runs out of its share keeps
+its open list and carries on next tick, and meanwhile the ghost heads for
+the cell closest to the goal found so far. A search that finishes within its
+share returns exactly the path Game.a_star would (same tie-breaking), so a
+budget no search ever reaches plays the same game as no budget at all.
+
+    python timeslice.py [--budget 400] [--rows 151 --cols 151] [--ticks 1500] [--ceiling-ms 8] [--repeats 3]
+
+checks resumed searches against Game.a_star and budgeted stock games against
+unbudgeted ones. On a generated board it then counts the nodes expanded per
+tick with and without the budget, and fails if a budgeted tick expanded more
+than the budget allows or took longer than the ceiling. The budgeted game is
+played --repeats times (the same game every time) and each tick keeps its
+fastest time, so a stall of the machine in one run does not fail the check.
+"""
+
+import heapq
+import itertools
+import math
+from typing import Dict, List, Optional, Tuple
+
+# A budget no search reaches, for counting nodes without changing the game
+UNLIMITED = 10 ** 9
+
+
+class SlicedSearch:
+    """One A* query over cell ids that can be advanced a few nodes at a time.
+
+    Paths have the same shape as Game.path: the cell next to the goal first,
+    back to the start, goal excluded; empty when start == goal or unreachable.
+    planner_pool.search runs one to the end in a single advance.
+    """
+
+    def __init__(self, mask: bytes, cols: int, start: int, goal: int):
+        self.mask, self.cols = mask, cols
+        self.start, self.goal = start, goal
+        self.steps = ((1, -cols), (2, -1), (4, cols), (8, 1))
+        self.g_score: Dict[int, int] = {start: 0}
+        self.f_score: Dict[int, float] = {start: 0.0}
+        self.parent: Dict[int, Optional[int]] = {start: None}
+        self.closed = set()
+        self.counter = itertools.count()
+        self.open_heap = [(0.0, 0.0, next(self.counter), start)]
+        # Reached cell with the smallest heuristic, for the partial path
+        self.best, self.best_h = start, self.distance(start)
+        self.expanded = 0
+        self.slices = 0
+        self.path: List[int] = []
+        self.done = start == goal
+
+    def distance(self, v: int) -> float:
+        """Euclidean distance to the goal in cells, as Game.heuristic."""
+        vi, vj = divmod(v, self.cols)
+        gi, gj = divmod(self.goal, self.cols)
+        return math.sqrt((vj - gj) ** 2 + (vi - gi) ** 2)
+
+    def advance(self, nodes: int) -> int:
+        """Expand up to `nodes` cells; returns how many were expanded."""
+        if self.done:
+            return 0
+        self.slices += 1
+        mask, goal, steps = self.mask, self.goal, self.steps
+        g_score, f_score, parent, closed = self.g_score, self.f_score, self.parent, self.closed
+        open_heap, counter = self.open_heap, self.counter
+        gi, gj = divmod(goal, self.cols)
+        expanded = 0
+
+        while open_heap and expanded < nodes:
+            f, _, _, q = heapq.heappop(open_heap)
+            if q in closed or f > f_score[q]:
+                continue
+            closed.add(q)
+            expanded += 1
+
+            new_g = g_score[q] + 1
+            bits = mask[q]
+            for bit, offset in steps:
+                if not bits & bit:
+                    continue
+                s = q + offset
+                if s == goal:
+                    self.path = self.walk_back(q)
+                    self.done = True
+                    self.expanded += expanded
+                    return expanded
+                if s in g_score and new_g >= g_score[s]:
+                    continue
+                closed.discard(s)
+                g_score[s] = new_g
+                si, sj = divmod(s, self.cols)
+                h = math.sqrt((sj - gj) ** 2 + (si - gi) ** 2)
+                f_score[s] = new_g + h
+                parent[s] = q
+                heapq.heappush(open_heap, (new_g + h, h, next(counter), s))
+                if h < self.best_h:
+                    self.best, self.best_h = s, h
+
+        if not open_heap:
+            # Exhausted: the goal is unreachable
+            self.done = True
+        self.expanded += expanded
+        return expanded
+
+    def walk_back(self, v: int) -> List[int]:
+        path = [v]
+        parent = self.parent
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        return path
+
+    def partial(self) -> List[int]:
+        """Path to the reached cell closest to the goal, in Game.path shape."""
+        return self.walk_back(self.best)
+
+    @property
+    def estimate(self) -> int:
+        """Lower bound on the route length through the best cell so far."""
+        return self.g_score[self.best] + math.ceil(self.best_h)
+
+
+class SearchBudget:
+    """Expansions allowed per tick, shared out between the ghosts in turn.
+
+    Each ghost may use an equal part of what is left for itself and the
+    ghosts after it, so a ghost with nothing to search leaves its part to the
+    rest. Every turn allows at least one node, so searches always progress.
+    """
+
+    def __init__(self, nodes: int):
+        self.nodes = nodes
+        self.left = nodes
+        self.turns = 0
+        self.allowance = 0
+        self.ticks = 0
+        self.spent = 0
+        self.peak = 0         # most nodes spent in one tick
+        self.finished = 0     # searches that completed
+        self.sliced = 0       # ... of which over more than one tick
+        self.abandoned = 0    # dropped unfinished for a new target
+
+    def begin(self, turns: int):
+        """Start a tick with `turns` ghosts to share the budget."""
+        self.peak = max(self.peak, self.nodes - self.left)
+        self.left = self.nodes
+        self.turns = turns
+        self.ticks += 1
+
+    def turn(self):
+        """Move on to the next ghost's share."""
+        self.allowance = max(1, self.left // max(1, self.turns))
+        self.turns -= 1
+
+    def spend(self, nodes: int):
+        self.allowance -= nodes
+        self.left -= nodes
+        self.spent += nodes
+
+    def stats(self) -> dict:
+        return {
+            "ticks": self.ticks,
+            "nodes_per_tick": self.spent / max(1, self.ticks),
+            "peak_nodes": max(self.peak, self.nodes - self.left),
+            "finished": self.finished,
+            "sliced": self.sliced,
+            "abandoned": self.abandoned,
+        }
+
+
+def check_searches(pairs: int, seed: int) -> bool:
+    """Searches resumed in small slices must end exactly like Game.a_star."""
+    import random
+
+    import pacman
+
+    random.seed(seed)
+    game = pacman.Game(headless=True)
+    walkable = [cell for cell in game.cells if not cell.is_wall]
+    rng = random.Random(seed)
+    for _ in range(pairs):
+        a, b = rng.choice(walkable), rng.choice(walkable)
+        game.a_star(a, b)
+        search = SlicedSearch(game.maze.mask, game.maze.cols, a.id, b.id)
+        while not search.done:
+            search.advance(rng.randint(1, 20))
+        if search.path != [cell.id for cell in game.path] or search.expanded != game.expanded_nodes:
+            print(f"sliced search differs from Game.a_star for {(a.i, a.j)} -> {(b.i, b.j)}")
+            return False
+    print(f"sliced searches match Game.a_star on {pairs} pairs")
+    return True
+
+
+def check_parity(games: int, seed: int) -> bool:
+    """A budget no search reaches must not change the game."""
+    import random
+
+    import pacman
+    from headless import RandomInput
+    from replay import state_digest
+
+    traces = []
+    for budget in (0, UNLIMITED):
+        pacman.SEARCH_BUDGET = budget
+        trace = []
+        for k in range(games):
+            random.seed(seed + k)
+            game = pacman.Game(headless=True, input_source=RandomInput(seed + k))
+            while not game.game_over and game.tick < 3000:
+                game.step()
+                trace.append(state_digest(game))
+        traces.append(trace)
+    pacman.SEARCH_BUDGET = 0
+    if traces[0] != traces[1]:
+        tick = next(n for n, (a, b) in enumerate(zip(*traces)) if a != b)
+        print(f"budgeted games differ from plain A* at tick {tick} of the run")
+        return False
+    print(f"parity ok: {games} stock games, {len(traces[0])} ticks")
+    return True
+
+
+def time_updates(budget: int, ghosts: int, ticks: int, seed: int,
+                 repeats: int = 1) -> Tuple[List[float], dict]:
+    """Milliseconds per Game.update on the current board, and SearchBudget.stats().
+
+    The same seeded game is played `repeats` times; each tick keeps its
+    fastest time.
+    """
+    import gc
+    import random
+    import time
+
+    import pacman
+    from arena import new_arena, respawn
+
+    pacman.SEARCH_BUDGET = budget
+    best = [math.inf] * ticks
+    for _ in range(repeats):
+        game = new_arena(ghosts, seed, spatial=False)
+        rng = random.Random(seed + 1)
+        gc.collect()
+        gc.disable()
+        try:
+            for tick in range(ticks):
+                t0 = time.perf_counter()
+                game.step()
+                best[tick] = min(best[tick], (time.perf_counter() - t0) * 1000)
+                if game.game_over:
+                    respawn(game, rng)
+        finally:
+            gc.enable()
+    return best, game.search_budget.stats()
+
+
+def check_ceiling(budget: int, ghosts: int, rows: int, cols: int, ticks: int,
+                  ceiling_ms: float, seed: int, repeats: int = 3) -> bool:
+    """Nodes and time per Game.update on a big board, with and without the budget."""
+    import statistics
+
+    import pacman
+    from arena import arena_map, use_map
+
+    use_map(arena_map(rows, cols, seed), "astar")
+    # Every ghost searches with A*, so the budget is all that bounds a tick
+    pacman.USE_FLOW_FIELD = False
+
+    # A budget no search reaches plays the unbudgeted game (see check_parity)
+    # and still counts the nodes
+    for nodes in (UNLIMITED, budget):
+        samples, stats = time_updates(nodes, ghosts, ticks, seed,
+                                      repeats if nodes != UNLIMITED else 1)
+        ordered = sorted(samples)
+        p99 = ordered[int(0.99 * (len(ordered) - 1))]
+        label = f"budget {nodes}" if nodes != UNLIMITED else "unbudgeted"
+        print(f"{label:12} {stats['nodes_per_tick']:.0f} nodes/tick, peak {stats['peak_nodes']}; "
+              f"{stats['finished']} searches finished, {stats['sliced']} over several ticks, "
+              f"{stats['abandoned']} abandoned")
+        print(f"{'':12} mean {statistics.mean(samples):.2f} ms, "
+              f"stdev {statistics.pstdev(samples):.2f} ms, p99 {p99:.2f} ms, "
+              f"max {ordered[-1]:.2f} ms")
+    pacman.SEARCH_BUDGET = 0
+
+    # Every turn may expand one node, so more ghosts than nodes can go over
+    limit = max(budget, ghosts)
+    if stats['peak_nodes'] > limit:
+        print(f"a budgeted tick expanded {stats['peak_nodes']} nodes, over the {limit} allowed")
+        return False
+    worst = ordered[-1]
+    if worst > ceiling_ms:
+        print(f"worst budgeted update {worst:.2f} ms is over the {ceiling_ms} ms ceiling")
+        return False
+    print(f"budgeted ticks expanded at most {stats['peak_nodes']} of {limit} nodes; "
+          f"worst update {worst:.2f} ms is within the {ceiling_ms} ms ceiling")
+    return True
+
+
+def main():
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=int, default=400, help="A* expansions per tick")
+    parser.add_argument("--pairs", type=int, default=500, help="pairs checked against Game.a_star")
+    parser.add_argument("--games", type=int, default=10, help="stock games played for parity")
+    parser.add_argument("--ghosts", type=int, default=8, help="ghosts on the generated board")
+    parser.add_argument("--rows", type=int, default=151)
+    parser.add_argument("--cols", type=int, default=151)
+    parser.add_argument("--ticks", type=int, default=1500, help="ticks timed on the generated board")
+    parser.add_argument("--ceiling-ms", type=float, default=8.0,
+                        help="worst Game.update allowed with the budget")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="times the budgeted game is timed; each tick keeps its best")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    ok = (check_searches(args.pairs, args.seed)
+          and check_parity(args.games, args.seed)
+          and check_ceiling(args.budget, args.ghosts, args.rows, args.cols, args.ticks,
+                            args.ceiling_ms, args.seed, args.repeats))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Fixed-timestep game loop: logic at a constant tick rate, drawing as fast as
+the display allows.
+
+Wall time since the last frame (times the speed multiplier) goes into an
+accumulator, and the game runs one logic tick for every tick length it
+holds. What is left over, as a fraction of a tick, is how far the picture
+should be drawn between the last two tick states. So the game plays at the
+same pace whatever the frame rate, and a speed of 4 simply runs four ticks
+per frame.
+
+Under load the loop keeps the simulation on time rather than the picture:
+frames are skipped (up to max_frame_skip in a row) while ticks catch up, and
+if the backlog outgrows what a frame may run, the excess is dropped and the
+game slows down instead of spiralling. The counters say how often each
+happened:
+
+    dropped_frames  display frames that went by without a new picture
+    late_ticks      ticks that ran at least a frame after they were due
+    lost_ticks      ticks dropped from the backlog (the game ran slow)
+
+    python timestep.py
+
+runs the loop against synthetic frame times and prints the counters.
+"""
+
+import math
+import time
+from typing import Callable
+
+SPEEDS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0)
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate: float, frame_rate: float, speed: float = 1.0,
+                 max_frame_skip: int = 5, clock: Callable[[], float] = time.perf_counter):
+        self.tick = 1.0 / tick_rate
+        self.frame = 1.0 / frame_rate
+        self.speed = speed
+        self.max_frame_skip = max_frame_skip
+        self.clock = clock
+        self.accumulator = 0.0
+        self.start: float = clock()
+        self.last = self.start
+        self.skipped_in_row = 0
+        self.ticks = 0
+        self.frames = 0
+        self.late_ticks = 0
+        self.lost_ticks = 0
+
+    @property
+    def alpha(self) -> float:
+        """How far past the last tick the picture is, as a fraction of a tick."""
+        return max(0.0, self.accumulator / self.tick)
+
+    @property
+    def dropped_frames(self) -> int:
+        return max(0, int((self.last - self.start) / self.frame) - self.frames)
+
+    def begin_frame(self) -> int:
+        """Bank the time since the last frame; return how many ticks to run now."""
+        now = self.clock()
+        self.accumulator += (now - self.last) * self.speed
+        self.last = now
+
+        # The epsilon keeps float error from pushing a whole tick to the next frame
+        due = int(self.accumulator / self.tick + 1e-9)
+        budget = max(1, math.ceil(self.speed)) * (self.max_frame_skip + 1)
+        if due > budget:
+            # Too far behind to catch up: let the game slow down instead
+            self.lost_ticks += due - budget
+            self.accumulator -= (due - budget) * self.tick
+            due = budget
+        # The oldest ticks were already due a whole frame ago
+        overdue = (self.accumulator - self.frame * self.speed) / self.tick - 1
+        if overdue > 0:
+            self.late_ticks += min(due, math.ceil(overdue))
+
+        self.accumulator -= due * self.tick
+        self.ticks += due
+        return due
+
+    def should_draw(self) -> bool:
+        """False to skip drawing because the ticks ate the frame's time."""
+        if (self.clock() - self.last > self.frame
+                and self.skipped_in_row < self.max_frame_skip):
+            self.skipped_in_row += 1
+            return False
+        self.skipped_in_row = 0
+        self.frames += 1
+        return True
+
+    def faster(self) -> float:
+        self.speed = next((s for s in SPEEDS if s > self.speed), self.speed)
+        return self.speed
+
+    def slower(self) -> float:
+        self.speed = next((s for s in reversed(SPEEDS) if s < self.speed), self.speed)
+        return self.speed
+
+    def report(self) -> str:
+        return (f"{self.ticks} ticks, {self.frames} frames drawn: "
+                f"{self.dropped_frames} frames dropped, {self.late_ticks} ticks late, "
+                f"{self.lost_ticks} ticks lost")
+
+
+def simulate(frame_times, tick_cost: float, speed: float = 1.0,
+             tick_rate: float = 60, frame_rate: float = 60) -> FixedTimestep:
+    """Run the loop on a fake clock: each frame draws for frame_times[n] s."""
+    now = [0.0]
+    loop = FixedTimestep(tick_rate, frame_rate, speed, clock=lambda: now[0])
+    for draw_time in frame_times:
+        now[0] += loop.begin_frame() * tick_cost
+        if loop.should_draw():
+            now[0] += draw_time
+            # Frame clock: wait out the rest of the frame
+            now[0] = max(now[0], loop.last + loop.frame)
+    return loop
+
+
+def main():
+    frames = 600
+    cases = [
+        ("steady", [0.004] * frames, 0.0001, 1.0),
+        ("spikes", [0.1 if n % 100 == 50 else 0.004 for n in range(frames)], 0.0001, 1.0),
+        ("slow draw", [0.03] * frames, 0.0001, 1.0),
+        ("slow ticks", [0.004] * frames, 0.02, 1.0),
+        ("speed x8", [0.004] * frames, 0.0001, 8.0),
+    ]
+    for name, frame_times, tick_cost, speed in cases:
+        loop = simulate(frame_times, tick_cost, speed)
+        seconds = loop.last - loop.start
+        print(f"{name:10} {seconds:5.1f}s  {loop.report()} "
+              f"({loop.ticks / seconds:.0f} ticks/s)")
+
+
+if __name__ == "__main__":
+    main()
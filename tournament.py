@@ -0,0 +1,189 @@
+"""
+Tournament runner: sweep ghost and Pac-Man parameters over many headless games.
+
+Every combination of the --param values is played on --games seeds. Games
+are spread over a process pool and each result is appended to a JSON Lines
+file as soon as it finishes. Running the same command again skips games
+already in that file, so an interrupted sweep resumes where it stopped.
+
+    python tournament.py --param pinky_lookahead=4,6,8 --param ghost_speed=2,2.5 \\
+        --games 200 --out sweep.jsonl
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from collections import Counter, defaultdict
+from multiprocessing import Pool
+from typing import Dict, Iterable, List, Tuple
+
+# Keep pygame's banner out of every worker's output
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from headless import RandomInput, play
+from pacman import Game, InputSource
+
+# Tunable parameters and how they apply to a freshly built game
+PARAMETERS = {
+    "pinky_lookahead": int,
+    "pinky_interval": int,
+    "clyde_lookahead": int,
+    "clyde_interval": int,
+    "ghost_speed": float,
+    "ghost_weak_speed": float,
+    "pacman_speed": float,
+    "turn_interval": int,  # ticks between random Pac-Man turns, 0 = no input
+}
+
+
+def apply_params(game: Game, params: Dict[str, float]):
+    """Override ghost and Pac-Man settings on a new game."""
+    if "pinky_lookahead" in params:
+        game.pinky.lookahead = params["pinky_lookahead"]
+    if "pinky_interval" in params:
+        game.pinky.search_interval = game.pinky.new_search = params["pinky_interval"]
+    if "clyde_lookahead" in params:
+        game.clyde.lookahead = params["clyde_lookahead"]
+    if "clyde_interval" in params:
+        game.clyde.search_interval = game.clyde.new_search = params["clyde_interval"]
+    for ghost in game.ghosts:
+        if "ghost_speed" in params:
+            ghost.normal_speed = ghost.speed = params["ghost_speed"]
+        if "ghost_weak_speed" in params:
+            ghost.weak_speed = params["ghost_weak_speed"]
+    if "pacman_speed" in params:
+        game.pacman.speed = params["pacman_speed"]
+
+
+def parse_param(text: str) -> Tuple[str, List[float]]:
+    name, _, values = text.partition("=")
+    if name not in PARAMETERS or not values:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=V1,V2,... with NAME one of {', '.join(PARAMETERS)}")
+    return name, [PARAMETERS[name](v) for v in values.split(",")]
+
+
+def grid(params: List[Tuple[str, List[float]]]) -> List[Dict[str, float]]:
+    """Every combination of the swept values."""
+    names = [name for name, _ in params]
+    return [dict(zip(names, combo)) for combo in itertools.product(*(v for _, v in params))]
+
+
+def task_key(params: Dict[str, float], seed: int) -> str:
+    return json.dumps({"params": params, "seed": seed}, sort_keys=True)
+
+
+def run_task(task: Tuple[Dict[str, float], int, int]) -> dict:
+    """Worker: play one game with the given parameters and seed."""
+    params, seed, max_ticks = task
+    interval = params.get("turn_interval", 40)
+    source = RandomInput(seed, interval) if interval > 0 else InputSource()
+    result = play(seed, max_ticks, source, setup=lambda game: apply_params(game, params))
+    result["params"] = params
+    return result
+
+
+def load_results(path: str) -> List[dict]:
+    """Results already written by an earlier (possibly interrupted) run."""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                # Last line of a run that was killed mid-write
+                break
+    return results
+
+
+def trim_partial_line(path: str):
+    """Drop a half-written last line so new results start on a fresh line."""
+    if not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def summarize(results: Iterable[dict]) -> List[dict]:
+    """Aggregate per parameter combination."""
+    groups = defaultdict(list)
+    for result in results:
+        groups[json.dumps(result["params"], sort_keys=True)].append(result)
+
+    report = []
+    for key, games in groups.items():
+        n = len(games)
+        report.append({
+            "params": json.loads(key),
+            "games": n,
+            "mean_ticks": sum(g["ticks"] for g in games) / n,
+            "mean_pellets": sum(g["pellets_eaten"] for g in games) / n,
+            "win_rate": sum(g["won"] for g in games) / n,
+            "caught_by": dict(Counter(g["caught_by"] for g in games if g["caught_by"])),
+        })
+    report.sort(key=lambda r: r["mean_ticks"])
+    return report
+
+
+def print_report(report: List[dict]):
+    print(f"{'games':>6}{'ticks':>9}{'pellets':>9}{'win %':>7}  caught by / params")
+    for row in report:
+        caught = " ".join(f"{name}:{count}" for name, count in sorted(row["caught_by"].items()))
+        print(f"{row['games']:6d}{row['mean_ticks']:9.1f}{row['mean_pellets']:9.1f}"
+              f"{row['win_rate'] * 100:7.1f}  {caught}")
+        print(f"{'':31}{json.dumps(row['params'], sort_keys=True)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--param", type=parse_param, action="append", default=[],
+                        help="NAME=V1,V2,... to sweep (repeatable)")
+    parser.add_argument("--games", type=int, default=100, help="games per parameter combination")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the first game")
+    parser.add_argument("--ticks", type=int, default=5000, help="tick limit per game")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--out", default="tournament.jsonl", help="per-game results (JSON Lines)")
+    parser.add_argument("--report", help="also write the aggregated report as JSON")
+    args = parser.parse_args()
+
+    trim_partial_line(args.out)
+    done = {task_key(r["params"], r["seed"]) for r in load_results(args.out)}
+    tasks = [(params, args.seed + k, args.ticks)
+             for params in grid(args.param)
+             for k in range(args.games)
+             if task_key(params, args.seed + k) not in done]
+    total = len(tasks) + len(done)
+    print(f"{total} games, {len(done)} already done, {len(tasks)} to play on {args.workers} workers")
+
+    t0 = time.perf_counter()
+    if tasks:
+        # Small chunks keep workers busy without holding back results
+        chunksize = max(1, min(32, len(tasks) // (args.workers * 8)))
+        with Pool(args.workers) as pool, open(args.out, "a") as out:
+            for finished, result in enumerate(pool.imap_unordered(run_task, tasks, chunksize), 1):
+                out.write(json.dumps(result, sort_keys=True) + "\n")
+                out.flush()
+                if finished % 500 == 0:
+                    rate = finished / (time.perf_counter() - t0)
+                    print(f"  {finished}/{len(tasks)} ({rate:.0f} games/s)")
+    elapsed = time.perf_counter() - t0
+    if tasks:
+        print(f"played {len(tasks)} games in {elapsed:.1f}s ({len(tasks) / elapsed:.1f} games/s)")
+
+    # Only report on the current sweep, even if the file holds older runs
+    wanted = {task_key(params, args.seed + k) for params in grid(args.param) for k in range(args.games)}
+    report = summarize(r for r in load_results(args.out) if task_key(r["params"], r["seed"]) in wanted)
+    print_report(report)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()